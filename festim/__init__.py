@@ -104,7 +104,7 @@ from .materials.materials import Materials
 from .concentration.concentration import Concentration
 from .initial_condition import InitialCondition
 from .concentration.mobile import Mobile
-from .nonlinear_problem import Problem
+from .nonlinear_problem import Problem, SplitProblem
 from .concentration.theta import Theta
 
 from .concentration.traps.trap import Trap
@@ -116,3 +116,9 @@ from .concentration.traps.neutron_induced_trap import NeutronInducedTrap
 from .h_transport_problem import HTransportProblem
 
 from .generic_simulation import Simulation
+
+from .precompilation import precompile
+
+from .continuation import run_continuation
+from .sweep import Sweep, run_ensemble
+from .reduced_order_model import ReducedOrderModel
@@ -1,5 +1,6 @@
 from festim import DirichletBC, BoundaryConditionExpression, k_B
 import fenics as f
+import numpy as np
 import sympy as sp
 
 
@@ -17,6 +18,23 @@ def dc_imp(T, phi, R_p, D_0, E_D, Kr_0=None, E_Kr=None, Kd_0=None, E_Kd=None, P=
     return value
 
 
+def dc_imp_numpy(
+    T, phi, R_p, D_0, E_D, Kr_0=None, E_Kr=None, Kd_0=None, E_Kd=None, P=None
+):
+    """Same as dc_imp with numpy, for arrays of values"""
+    D = D_0 * np.exp(-E_D / k_B / T)
+    value = phi * R_p / D
+    if Kr_0 is not None:
+        Kr = Kr_0 * np.exp(-E_Kr / k_B / T)
+        if Kd_0 is not None:
+            Kd = Kd_0 * np.exp(-E_Kd / k_B / T)
+            value += ((phi + Kd * P) / Kr) ** 0.5
+        else:
+            value += (phi / Kr) ** 0.5
+
+    return value
+
+
 class ImplantationDirichlet(DirichletBC):
     """Subclass of DirichletBC representing an approximation of an implanted
     flux of hydrogen.
@@ -81,6 +99,7 @@ class ImplantationDirichlet(DirichletBC):
         value_BC = BoundaryConditionExpression(
             T,
             dc_imp,
+            vectorised_function=dc_imp_numpy,
             phi=phi,
             R_p=R_p,
             D_0=self.D_0,
@@ -1,5 +1,7 @@
 from festim import BoundaryCondition, k_B
+from festim.helpers import NOT_VECTORISED_ERRORS
 import fenics as f
+import numpy as np
 import sympy as sp
 
 
@@ -85,14 +87,139 @@ class DirichletBC(BoundaryCondition):
         # create a DirichletBC and add it to bcs
         if V.num_sub_spaces() == 0:
             funspace = V
+            collapsed_funspace = V
         else:  # if only one field, use subspace
             funspace = V.sub(self.field)
+            collapsed_funspace = funspace.collapse()
+        value = self.expression
+        if isinstance(self.expression, VectorisedExpression):
+            value = self.create_boundary_values(collapsed_funspace, surface_markers)
         for surface in self.surfaces:
-            bci = f.DirichletBC(funspace, self.expression, surface_markers, surface)
+            bci = f.DirichletBC(funspace, value, surface_markers, surface)
             self.dirichlet_bc.append(bci)
 
+    def create_boundary_values(self, V, surface_markers):
+        """Creates the function holding the values of self.expression at
+        the boundary degrees of freedom, computed with numpy each time the
+        time of self.expression is set
 
-class BoundaryConditionTheta(f.UserExpression):
+        Args:
+            V (fenics.FunctionSpace): the function space of the field (not
+                a subspace)
+            surface_markers (fenics.MeshFunction): the surface markers
+
+        Returns:
+            fenics.Function: the boundary values
+        """
+        values = f.Function(V)
+        if f.MPI.size(f.MPI.comm_world) == 1:
+            dofs = set()
+            for surface in self.surfaces:
+                bci = f.DirichletBC(V, values, surface_markers, surface)
+                dofs.update(bci.get_boundary_values().keys())
+            dofs = np.array(sorted(dofs), dtype=int)
+        else:
+            # the boundary dofs owned by a process can be on the facets of
+            # another process
+            dofs = np.arange(values.vector().local_size())
+        self.expression.attach_boundary_values(values, dofs)
+        return values
+
+
+class VectorisedExpression(f.UserExpression):
+    """Base class of the boundary conditions expressions evaluated in
+    Python.
+    Point evaluations go through eval() or eval_cell(). Once boundary values
+    are attached, they are computed with numpy at all the boundary degrees
+    of freedom each time the time t is set (see
+    festim.update_expressions), so that the fenics.DirichletBC doesn't
+    call back Python at every application.
+    The temperature is read when t is set: it must be updated (or
+    restored) before festim.update_expressions is called, which
+    HTransportProblem.update does. Otherwise, update_boundary_values()
+    has to be called explicitly.
+
+    Attributes:
+        boundary_values (fenics.Function): the function holding the values
+            at the boundary degrees of freedom
+        boundary_dofs (numpy.ndarray): the local boundary degrees of freedom
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._t = 0
+        self._interpolations = {}
+        self.boundary_values = None
+        self.boundary_dofs = None
+
+    @property
+    def t(self):
+        return self._t
+
+    @t.setter
+    def t(self, value):
+        self._t = value
+        self.update_boundary_values()
+
+    def attach_boundary_values(self, boundary_values, boundary_dofs):
+        """Sets the function holding the boundary values and computes them
+
+        Args:
+            boundary_values (fenics.Function): the function
+            boundary_dofs (numpy.ndarray): the local degrees of freedom to
+                compute
+        """
+        self.boundary_values = boundary_values
+        self.boundary_dofs = boundary_dofs
+        self.update_boundary_values()
+
+    def update_boundary_values(self):
+        """Computes the boundary values, to be called when the time or the
+        temperature have changed"""
+        if self.boundary_values is None:
+            return
+        V = self.boundary_values.function_space()
+        values = self.boundary_values.vector().get_local()
+        values[self.boundary_dofs] = self.compute_values(V, self.boundary_dofs)
+        self.boundary_values.vector().set_local(values)
+        self.boundary_values.vector().apply("insert")
+
+    def compute_values(self, V, dofs):
+        """Computes the expression at degrees of freedom
+
+        Args:
+            V (fenics.FunctionSpace): the function space
+            dofs (numpy.ndarray): the local degrees of freedom
+
+        Returns:
+            numpy.ndarray: the values
+        """
+        raise NotImplementedError
+
+    def values_at_dofs(self, u, V, dofs):
+        """Interpolates a function on V and returns its values at degrees
+        of freedom. The interpolation functions are only allocated once.
+
+        Args:
+            u (fenics.Constant, fenics.Expression, fenics.Function): the
+                function
+            V (fenics.FunctionSpace): the function space
+            dofs (numpy.ndarray): the local degrees of freedom
+
+        Returns:
+            numpy.ndarray or float: the values (a float if u is a
+                fenics.Constant)
+        """
+        if isinstance(u, f.Constant):
+            return float(u)
+        if id(u) not in self._interpolations:
+            self._interpolations[id(u)] = f.Function(V)
+        interpolation = self._interpolations[id(u)]
+        interpolation.interpolate(u)
+        return interpolation.vector().get_local()[dofs]
+
+
+class BoundaryConditionTheta(VectorisedExpression):
     """Creates an Expression for converting dirichlet bcs in the case
     of chemical potential conservation
 
@@ -111,6 +238,7 @@ class BoundaryConditionTheta(f.UserExpression):
         self._mesh = vm.mesh()
         self._T = T
         self._materials = materials
+        self._material_indices = None
 
     def eval_cell(self, value, x, ufc_cell):
         cell = f.Cell(self._mesh, ufc_cell.index)
@@ -125,23 +253,49 @@ class BoundaryConditionTheta(f.UserExpression):
         elif material.solubility_law == "henry":
             value[0] = (c / S + f.DOLFIN_EPS) ** 0.5
 
+    def compute_values(self, V, dofs):
+        if self._material_indices is None:
+            self._material_indices = self._materials.dof_material_indices(self._vm, V)
+        material_indices = self._material_indices[dofs]
+        if isinstance(self._bci, VectorisedExpression):
+            c = self._bci.compute_values(V, dofs)
+        else:
+            c = self.values_at_dofs(self._bci, V, dofs)
+        c = np.broadcast_to(c, dofs.shape)
+        T = np.broadcast_to(self.values_at_dofs(self._T, V, dofs), dofs.shape)
+
+        values = np.full(dofs.shape, np.nan)
+        for index, material in enumerate(self._materials):
+            mask = material_indices == index
+            S = material.S_0 * np.exp(-material.E_S / k_B / T[mask])
+            if material.solubility_law == "sievert":
+                values[mask] = c[mask] / S
+            elif material.solubility_law == "henry":
+                values[mask] = (c[mask] / S + f.DOLFIN_EPS) ** 0.5
+        return values
+
     def value_shape(self):
         return ()
 
 
-class BoundaryConditionExpression(f.UserExpression):
+class BoundaryConditionExpression(VectorisedExpression):
     """ "[summary]"
 
     Args:
         T (fenics.Function): the temperature
         eval_function ([type]): [description]
+        vectorised_function (callable, optional): same as eval_function but
+            for numpy arrays, used to compute the values at the boundary
+            degrees of freedom. If None, eval_function is used. Defaults to
+            None.
     """
 
-    def __init__(self, T, eval_function, **kwargs):
+    def __init__(self, T, eval_function, vectorised_function=None, **kwargs):
         super().__init__()
 
         self._T = T
         self.eval_function = eval_function
+        self.vectorised_function = vectorised_function
         self.prms = kwargs
 
     def eval(self, value, x):
@@ -159,5 +313,32 @@ class BoundaryConditionExpression(f.UserExpression):
         # evaluate at local point
         value[0] = self.eval_function(self._T(x), **new_prms)
 
+    def compute_values(self, V, dofs):
+        # values of the parameters at the dofs
+        new_prms = {}
+        for key, prm_val in self.prms.items():
+            if callable(prm_val):
+                new_prms[key] = self.values_at_dofs(prm_val, V, dofs)
+            else:
+                new_prms[key] = prm_val
+        T = self.values_at_dofs(self._T, V, dofs)
+
+        if self.vectorised_function is not None:
+            values = self.vectorised_function(T, **new_prms)
+            return np.broadcast_to(np.asarray(values, dtype=float), dofs.shape)
+        try:
+            values = np.asarray(self.eval_function(T, **new_prms), dtype=float)
+        except NOT_VECTORISED_ERRORS:
+            # eval_function isn't vectorised (eg. it uses ufl functions)
+            T = np.broadcast_to(T, dofs.shape)
+            values = np.empty(dofs.shape)
+            for i in range(dofs.size):
+                prms_i = {
+                    key: val[i] if isinstance(val, np.ndarray) else val
+                    for key, val in new_prms.items()
+                }
+                values[i] = float(self.eval_function(T[i], **prms_i))
+        return np.broadcast_to(values, dofs.shape)
+
     def value_shape(self):
         return ()
@@ -1,5 +1,6 @@
 from festim import DirichletBC, BoundaryConditionExpression, k_B
 import fenics as f
+import numpy as np
 import sympy as sp
 
 
@@ -8,6 +9,12 @@ def henrys_law(T, H_0, E_H, pressure):
     return H * pressure
 
 
+def henrys_law_numpy(T, H_0, E_H, pressure):
+    """Same as henrys_law with numpy, for arrays of values"""
+    H = H_0 * np.exp(-E_H / k_B / T)
+    return H * pressure
+
+
 class HenrysBC(DirichletBC):
     """Subclass of DirichletBC for Henry's law: cm = H*pressure
 
@@ -29,6 +36,7 @@ class HenrysBC(DirichletBC):
         value_BC = BoundaryConditionExpression(
             T,
             henrys_law,
+            vectorised_function=henrys_law_numpy,
             H_0=self.H_0,
             E_H=self.E_H,
             pressure=pressure,
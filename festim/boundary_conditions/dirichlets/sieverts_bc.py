@@ -1,5 +1,6 @@
 from festim import DirichletBC, BoundaryConditionExpression, k_B
 import fenics as f
+import numpy as np
 import sympy as sp
 
 
@@ -8,6 +9,12 @@ def sieverts_law(T, S_0, E_S, pressure):
     return S * pressure**0.5
 
 
+def sieverts_law_numpy(T, S_0, E_S, pressure):
+    """Same as sieverts_law with numpy, for arrays of values"""
+    S = S_0 * np.exp(-E_S / k_B / T)
+    return S * pressure**0.5
+
+
 class SievertsBC(DirichletBC):
     """Subclass of DirichletBC for Sievert's law
 
@@ -29,6 +36,7 @@ class SievertsBC(DirichletBC):
         value_BC = BoundaryConditionExpression(
             T,
             sieverts_law,
+            vectorised_function=sieverts_law_numpy,
             S_0=self.S_0,
             E_S=self.E_S,
             pressure=pressure,
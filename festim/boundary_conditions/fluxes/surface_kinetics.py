@@ -56,6 +56,9 @@ class SurfaceKinetics(FluxBC):
     Attributes:
         previous_solutions (list): list containing solutions (fenics.Function or ufl.Indexed)
             on each surface for "previous" timestep
+        second_previous_solutions (list): list containing solutions
+            (fenics.Function or ufl.Indexed) on each surface two timesteps
+            before, only used by the "bdf2" time scheme
         test_functions (list): list containing test functions (fenics.TestFunction or ufl.Indexed)
             for each surface
         post_processing_solutions (list): list containing solutions (fenics.Function or ufl.Indexed)
@@ -112,10 +115,13 @@ class SurfaceKinetics(FluxBC):
 
         self.solutions = [None] * len(self.surfaces)
         self.previous_solutions = [None] * len(self.surfaces)
+        self.second_previous_solutions = [None] * len(self.surfaces)
         self.test_functions = [None] * len(self.surfaces)
         self.post_processing_solutions = [None] * len(self.surfaces)
 
-    def create_form(self, solute, solute_prev, solute_test_function, T, ds, dt):
+    def create_form(
+        self, solute, solute_prev, solute_test_function, T, ds, dt, solute_prev_2=None
+    ):
         """
         Creates the general form associated with the surface species
 
@@ -128,6 +134,9 @@ class SurfaceKinetics(FluxBC):
             T (festim.Temperature): the temperature of the simulation
             ds (fenics.Measure): the ds measure of the sim
             dt (festim.Stepsize): the step-size
+            solute_prev_2 (fenics.Function or ufl.Indexed, optional): mobile
+                solution two timesteps before, only used by the "bdf2" time
+                scheme. Defaults to None.
         """
 
         lambda_IS = self.lambda_IS
@@ -155,19 +164,16 @@ class SurfaceKinetics(FluxBC):
 
             if dt is not None:
                 # Surface concentration form
-                self.form += (
-                    (self.solutions[i] - self.previous_solutions[i])
-                    / dt.value
-                    * self.test_functions[i]
-                    * ds(surf)
+                d_surf = dt.time_difference(
+                    self.solutions[i],
+                    self.previous_solutions[i],
+                    self.second_previous_solutions[i],
                 )
+                self.form += d_surf / dt.value * self.test_functions[i] * ds(surf)
                 # Flux to solute species
+                d_solute = dt.time_difference(solute, solute_prev, solute_prev_2)
                 self.form += (
-                    lambda_IS
-                    * (solute - solute_prev)
-                    / dt.value
-                    * solute_test_function
-                    * ds(surf)
+                    lambda_IS * d_solute / dt.value * solute_test_function * ds(surf)
                 )
 
             self.form += -(J_vs + J_bs - J_sb) * self.test_functions[i] * ds(surf)
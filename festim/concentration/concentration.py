@@ -13,14 +13,24 @@ class Concentration:
         previous_solution (fenics.Function or ufl.Indexed): Solution for
             "previous" timestep
         test_function (fenics.TestFunction or ufl.Indexed): test function
+
+    Attributes:
+        second_previous_solution (fenics.Function or ufl.Indexed): Solution
+            two timesteps before, only used by the "bdf2" time scheme
+        F_linear (ufl.Form): the terms of the formulation that are linear
+            in the solution (time derivative, diffusion, detrapping)
+        F_nonlinear (ufl.Form): the other terms of the formulation
     """
 
     def __init__(self, solution=None, previous_solution=None, test_function=None):
         self.solution = solution
         self.previous_solution = previous_solution
         self.test_function = test_function
+        self.second_previous_solution = None
         self.sub_expressions = []
         self.F = None
+        self.F_linear = 0
+        self.F_nonlinear = 0
         self.post_processing_solution = None  # used for post treatment
 
     def initialise(self, V, value, label=None, time_step=None):
@@ -36,6 +36,8 @@ class Mobile(Concentration):
                 to False.
         """
         self.F = 0
+        self.F_linear = 0
+        self.F_nonlinear = 0
         self.create_diffusion_form(materials, mesh, T, dt=dt, traps=traps, soret=soret)
         self.create_source_form(mesh.dx)
         self.create_fluxes_form(T, mesh.ds, dt)
@@ -58,7 +60,10 @@ class Mobile(Concentration):
         """
 
         F = 0
+        F_linear = 0
+        F_nonlinear = 0
         for material in materials:
+            F_material = 0
             D_0 = material.D_0
             E_D = material.E_D
             c_0, c_0_n = self.get_concentration_for_a_given_material(material, T)
@@ -72,15 +77,16 @@ class Mobile(Concentration):
                 dx = mesh.dx(subdomain)
                 # transient form
                 if dt is not None:
-                    F += ((c_0 - c_0_n) / dt.value) * self.test_function * dx
-                D = D_0 * exp(-E_D / k_B / T.T)
+                    dc_0 = dt.time_difference(c_0, c_0_n, self.second_previous_solution)
+                    F_material += (dc_0 / dt.value) * self.test_function * dx
+                D = D_0 * T.boltzmann_factor(E_D)
                 if mesh.type == "cartesian":
-                    F += dot(D * grad(c_0), grad(self.test_function)) * dx
+                    F_material += dot(D * grad(c_0), grad(self.test_function)) * dx
                     if soret:
                         Q = material.Q
                         if callable(Q):
                             Q = Q(T.T)
-                        F += (
+                        F_material += (
                             dot(
                                 D * Q * c_0 / (k_B * T.T**2) * grad(T.T),
                                 grad(self.test_function),
@@ -91,13 +97,15 @@ class Mobile(Concentration):
                 # see https://fenicsproject.discourse.group/t/method-of-manufactured-solution-cylindrical/7963
                 elif mesh.type == "cylindrical":
                     r = SpatialCoordinate(mesh.mesh)[0]
-                    F += r * dot(D * grad(c_0), grad(self.test_function / r)) * dx
+                    F_material += (
+                        r * dot(D * grad(c_0), grad(self.test_function / r)) * dx
+                    )
 
                     if soret:
                         Q = material.Q
                         if callable(Q):
                             Q = Q(T.T)
-                        F += (
+                        F_material += (
                             r
                             * dot(
                                 D * Q * c_0 / (k_B * T.T**2) * grad(T.T),
@@ -108,7 +116,7 @@ class Mobile(Concentration):
 
                 elif mesh.type == "spherical":
                     r = SpatialCoordinate(mesh.mesh)[0]
-                    F += (
+                    F_material += (
                         D
                         * r
                         * r
@@ -120,7 +128,7 @@ class Mobile(Concentration):
                         Q = material.Q
                         if callable(Q):
                             Q = Q(T.T)
-                        F += (
+                        F_material += (
                             D
                             * r
                             * r
@@ -130,6 +138,11 @@ class Mobile(Concentration):
                             )
                             * dx
                         )
+            F += F_material
+            if self.is_linear_for_a_given_material(material):
+                F_linear += F_material
+            else:
+                F_nonlinear += F_material
 
         # add the trapping terms
         F_trapping = 0
@@ -151,7 +164,7 @@ class Mobile(Concentration):
                     c_m, _ = self.get_concentration_for_a_given_material(mat, T)
                     F_trapping += (
                         -k_0
-                        * exp(-E_k / k_B / T.T)
+                        * T.boltzmann_factor(E_k)
                         * c_m
                         * (density - trap.solution)
                         * self.test_function
@@ -159,15 +172,18 @@ class Mobile(Concentration):
                     )
                     F_trapping += (
                         p_0
-                        * exp(-E_p / k_B / T.T)
+                        * T.boltzmann_factor(E_p)
                         * trap.solution
                         * self.test_function
                         * dx(mat.id)
                     )
         F += -F_trapping
+        F_nonlinear += -F_trapping
 
         self.F_diffusion = F
         self.F += F
+        self.F_linear += F_linear
+        self.F_nonlinear += F_nonlinear
 
     def create_source_form(self, dx):
         """Creates the variational form for the volumetric source term parts.
@@ -194,6 +210,7 @@ class Mobile(Concentration):
 
         self.F_source = F_source
         self.F += F_source
+        self.F_nonlinear += F_source
         self.sub_expressions += expressions_source
 
     def create_fluxes_form(self, T, ds, dt=None):
@@ -217,6 +234,7 @@ class Mobile(Concentration):
                             T,
                             ds,
                             dt,
+                            solute_prev_2=self.second_previous_solution,
                         )
                         F += bc.form
                     else:
@@ -228,10 +246,23 @@ class Mobile(Concentration):
 
         self.F_fluxes = F
         self.F += F
+        self.F_nonlinear += F
         self.sub_expressions += expressions_fluxes
 
     def get_concentration_for_a_given_material(self, material, T):
         return self.solution, self.previous_solution
 
+    def is_linear_for_a_given_material(self, material):
+        """Returns True if the concentration in a given material is linear
+        in self.solution
+
+        Args:
+            material (festim.Material): the material
+
+        Returns:
+            bool: True if linear, else False
+        """
+        return True
+
     def mobile_concentration(self):
         return self.solution
@@ -12,6 +12,7 @@ class Theta(Mobile):
         super().__init__()
         self.S = None
         self.F = None
+        self.post_processing_solver = None
 
     def initialise(self, V, value, label=None, time_step=None):
         """Assign a value to self.previous_solution
@@ -66,6 +67,18 @@ class Theta(Mobile):
             c_0_n = self.previous_solution**2 * S_n
         return c_0, c_0_n
 
+    def is_linear_for_a_given_material(self, material):
+        """Returns True if the concentration in a given material is linear
+        in self.solution (Sievert's law), False for Henry's law
+
+        Args:
+            material (festim.Material): the material
+
+        Returns:
+            bool: True if linear, else False
+        """
+        return material.solubility_law != "henry"
+
     def mobile_concentration(self):
         """Returns the hydrogen concentration as c=theta*K_S or c=theta**2*K_H
         This is needed when adding robin BCs (eg RecombinationFlux).
@@ -85,17 +98,27 @@ class Theta(Mobile):
         """Converts the post_processing_solution from theta to mobile
         concentration.
         c = theta * S.
-        The attribute post_processing_solution is fenics.Product (if self.S is
-        festim.ArheniusCoeff)
+        The solver is created once. In a discontinuous function space the
+        mass matrix is block diagonal: it is factorised cell by cell and
+        only the right hand side is assembled (locally) at each call.
         """
-        problem = f.LinearVariationalProblem(
-            a=f.lhs(self.form_post_processing),
-            L=f.rhs(self.form_post_processing),
-            u=self.post_processing_solution,
-            bcs=[],
-        )
-        solver = f.LinearVariationalSolver(problem)
-        solver.solve()
+        if self.post_processing_solver is None:
+            a = f.lhs(self.form_post_processing)
+            L = f.rhs(self.form_post_processing)
+            V = self.post_processing_solution.function_space()
+            if V.ufl_element().family() == "Discontinuous Lagrange":
+                self.post_processing_solver = f.LocalSolver(a, L)
+                self.post_processing_solver.factorize()
+            else:
+                problem = f.LinearVariationalProblem(
+                    a=a, L=L, u=self.post_processing_solution, bcs=[]
+                )
+                self.post_processing_solver = f.LinearVariationalSolver(problem)
+
+        if isinstance(self.post_processing_solver, f.LocalSolver):
+            self.post_processing_solver.solve_local_rhs(self.post_processing_solution)
+        else:
+            self.post_processing_solver.solve()
 
     def create_form_post_processing(self, V, materials, dx):
         """Creates a variational formulation for c = theta * S or theta**2 * S
@@ -120,3 +143,4 @@ class Theta(Mobile):
 
         self.form_post_processing = F
         self.post_processing_solution = f.Function(V)
+        self.post_processing_solver = None
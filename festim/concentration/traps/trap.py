@@ -1,5 +1,6 @@
 from festim import Concentration, k_B, Material, Theta, RadioactiveDecay
 from fenics import *
+import numpy as np
 import sympy as sp
 
 
@@ -47,6 +48,7 @@ class Trap(Concentration):
         self.materials = materials
 
         self.density = []
+        self.constant_densities = []
         self.make_density(density)
         self.sources = []
 
@@ -104,6 +106,8 @@ class Trap(Concentration):
                             name="density_{}_{}".format(self.id, i),
                         )
                     )
+                    if sp.Symbol("t") not in sp.sympify(density).free_symbols:
+                        self.constant_densities.append(self.density[-1])
 
     def create_form(self, mobile, materials, T, dx, dt=None):
         """Creates the general form associated with the trap
@@ -118,6 +122,8 @@ class Trap(Concentration):
                 Defaults to None.
         """
         self.F = 0
+        self.F_linear = 0
+        self.F_nonlinear = 0
         self.create_trapping_form(mobile, materials, T, dx, dt)
         if self.sources is not None:
             self.create_source_form(dx)
@@ -142,10 +148,15 @@ class Trap(Concentration):
 
         expressions_trap = []
         F_trapping = 0  # initialise the form
+        F_linear = 0
+        F_nonlinear = 0
 
         if dt is not None:
             # d(c_t)/dt in trapping equation
-            F_trapping += ((solution - prev_solution) / dt.value) * test_function * dx
+            dc_t = dt.time_difference(
+                solution, prev_solution, self.second_previous_solution
+            )
+            F_trapping += (dc_t / dt.value) * test_function * dx
         else:
             # if the sim is steady state and
             # if a trap is not defined in one subdomain
@@ -153,20 +164,10 @@ class Trap(Concentration):
             for mat in materials:
                 if mat not in self.materials:
                     F_trapping += solution * test_function * dx(mat.id)
+        F_linear += F_trapping
 
         for i, mat in enumerate(self.materials):
-            if type(self.k_0) is list:
-                k_0 = self.k_0[i]
-                E_k = self.E_k[i]
-                p_0 = self.p_0[i]
-                E_p = self.E_p[i]
-                density = self.density[i]
-            else:
-                k_0 = self.k_0
-                E_k = self.E_k
-                p_0 = self.p_0
-                E_p = self.E_p
-                density = self.density[0]
+            k_0, E_k, p_0, E_p, density = self.get_properties(i)
 
             # add the density to the list of
             # expressions to be updated
@@ -180,22 +181,173 @@ class Trap(Concentration):
             c_0, c_0_n = mobile.get_concentration_for_a_given_material(mat, T)
 
             # k(T)*c_m*(n - c_t) - p(T)*c_t
-            F_trapping += (
+            F_trap = (
                 -k_0
-                * exp(-E_k / k_B / T.T)
+                * T.boltzmann_factor(E_k)
                 * c_0
                 * (density - solution)
                 * test_function
                 * dx(mat.id)
             )
-            F_trapping += (
-                p_0 * exp(-E_p / k_B / T.T) * solution * test_function * dx(mat.id)
+            F_detrap = (
+                p_0 * T.boltzmann_factor(E_p) * solution * test_function * dx(mat.id)
             )
+            F_trapping += F_trap
+            F_trapping += F_detrap
+            F_nonlinear += F_trap
+            F_linear += F_detrap
 
         self.F_trapping = F_trapping
         self.F += self.F_trapping
+        self.F_linear += F_linear
+        self.F_nonlinear += F_nonlinear
         self.sub_expressions += expressions_trap
 
+    def get_properties(self, i):
+        """Returns the trap properties in the i-th material of
+        self.materials
+
+        Args:
+            i (int): the index of the material in self.materials
+
+        Returns:
+            tuple: k_0, E_k, p_0, E_p, density
+        """
+        if type(self.k_0) is list:
+            return self.k_0[i], self.E_k[i], self.p_0[i], self.E_p[i], self.density[i]
+        return self.k_0, self.E_k, self.p_0, self.E_p, self.density[0]
+
+    def create_condensed_form(self, mobile, materials, T, dx, dt=None):
+        """Eliminates the trap concentration locally. The backward Euler
+        discretisation of d ct/ dt = k c_m (n - c_t) - p c_t is solved for
+        c_t at each quadrature point:
+        c_t = (c_t_n + dt k c_m n) / (1 + dt (k c_m + p))
+        (c_t = k c_m n / (k c_m + p) at steady state) and the trapping rate
+        (c_t - c_t_n)/dt is added to the mobile equation.
+        self.solution is recovered from this expression with
+        recover_condensed_solution().
+
+        Args:
+            mobile (festim.Mobile): the mobile concentration of the simulation
+            materials (festim.Materials): the materials of the simulation
+            T (festim.Temperature): the temperature of the simulation
+            dx (fenics.Measure): the dx measure of the sim
+            dt (festim.Stepsize, optional): If None assuming steady state.
+                Defaults to None.
+
+        Raises:
+            NotImplementedError: if the trap has sources
+        """
+        if self.sources:
+            raise NotImplementedError("Traps with sources cannot be condensed")
+        if not all(isinstance(mat, Material) for mat in self.materials):
+            self.make_materials(materials)
+
+        prev_solution = self.previous_solution
+        v = TestFunction(self.solution.function_space())
+
+        expressions_trap = []
+        F = 0
+        form_recovery = 0
+        form_weights = 0
+        for i, mat in enumerate(self.materials):
+            k_0, E_k, p_0, E_p, density = self.get_properties(i)
+            expressions_trap.append(density)
+
+            if isinstance(mobile, Theta) and mat.solubility_law == "henry":
+                raise NotImplementedError(
+                    "Henry law of solubility is not implemented with traps"
+                )
+
+            c_0, _ = mobile.get_concentration_for_a_given_material(mat, T)
+            k = k_0 * T.boltzmann_factor(E_k)
+            p = p_0 * T.boltzmann_factor(E_p)
+            if dt is not None:
+                c_t = (prev_solution + dt.value * k * c_0 * density) / (
+                    1 + dt.value * (k * c_0 + p)
+                )
+                F += (
+                    (c_t - prev_solution) / dt.value * mobile.test_function * dx(mat.id)
+                )
+            else:
+                c_t = k * c_0 * density / (k * c_0 + p)
+            form_recovery += c_t * v * dx(mat.id)
+            form_weights += v * dx(mat.id)
+
+        self.F = F
+        self.form_recovery = form_recovery
+        self.recovery_weights = assemble(form_weights).get_local()
+        self.sub_expressions += expressions_trap
+
+    def recover_condensed_solution(self):
+        """Computes self.solution from the condensed expression of c_t
+        with a lumped (diagonal) L2 projection, which is a local operation
+        """
+        values = assemble(self.form_recovery).get_local()
+        weights = self.recovery_weights
+        solution = np.zeros_like(values)
+        mask = weights > 0
+        solution[mask] = values[mask] / weights[mask]
+        self.solution.vector().set_local(solution)
+        self.solution.vector().apply("insert")
+
+    def create_nodal_properties(self, V, volume_markers):
+        """Creates the arrays of trap properties at the nodes of V, used to
+        integrate the trapping kinetics pointwise. At the interface between
+        two materials, the properties of the last material of
+        self.materials are used.
+        The densities that don't depend on time are interpolated once, the
+        other ones are interpolated at each call of nodal_rates in
+        preallocated functions.
+
+        Args:
+            V (fenics.FunctionSpace): the CG1 function space of the traps
+            volume_markers (fenics.MeshFunction): the volume markers
+        """
+        dofmap = V.dofmap()
+        nb_owned_dofs = dofmap.ownership_range()[1] - dofmap.ownership_range()[0]
+        markers = volume_markers.array()
+
+        self.nodal_properties = {
+            key: np.zeros(nb_owned_dofs) for key in ["k_0", "E_k", "p_0", "E_p"]
+        }
+        self.nodal_density = np.zeros(nb_owned_dofs)
+        self.nodal_densities = []
+        for i, mat in enumerate(self.materials):
+            k_0, E_k, p_0, E_p, density = self.get_properties(i)
+            mat_ids = mat.id if isinstance(mat.id, list) else [mat.id]
+            cells = np.flatnonzero(np.isin(markers, mat_ids))
+            dofs = np.unique([dofmap.cell_dofs(cell) for cell in cells])
+            dofs = dofs[dofs < nb_owned_dofs]
+            for key, value in zip(["k_0", "E_k", "p_0", "E_p"], [k_0, E_k, p_0, E_p]):
+                self.nodal_properties[key][dofs] = value
+            if any(density is constant for constant in self.constant_densities):
+                values = interpolate(density, V).vector().get_local()
+                self.nodal_density[dofs] = values[dofs]
+            else:
+                self.nodal_densities.append((dofs, density, Function(V)))
+            self.sub_expressions.append(density)
+
+    def nodal_rates(self, T_values):
+        """Computes the trapping rate, detrapping rate and density at the
+        nodes
+
+        Args:
+            T_values (numpy.ndarray): the nodal values of the temperature
+
+        Returns:
+            numpy.ndarray, numpy.ndarray, numpy.ndarray: k, p and n at the
+                nodes
+        """
+        prop = self.nodal_properties
+        k = prop["k_0"] * np.exp(-prop["E_k"] / k_B / T_values)
+        p = prop["p_0"] * np.exp(-prop["E_p"] / k_B / T_values)
+        n = self.nodal_density.copy()
+        for dofs, density, density_function in self.nodal_densities:
+            density_function.interpolate(density)
+            n[dofs] = density_function.vector().get_local()[dofs]
+        return k, p, n
+
     def create_source_form(self, dx):
         """Create the source form for the trap
 
@@ -207,5 +359,6 @@ class Trap(Concentration):
                 source.value = source.form(self.solution)
             self.F_source = -source.value * self.test_function * dx(source.volume)
             self.F += self.F_source
+            self.F_nonlinear += self.F_source
             if isinstance(source.value, (Expression, UserExpression)):
                 self.sub_expressions.append(source.value)
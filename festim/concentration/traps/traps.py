@@ -1,5 +1,6 @@
 import festim
 import fenics as f
+import numpy as np
 import warnings
 
 
@@ -18,6 +19,8 @@ class Traps(list):
             super().__init__(self._validate_trap(item) for item in args[0])
 
         self.F = None
+        self.F_linear = None
+        self.F_nonlinear = None
         self.extrinsic_formulations = []
         self.sub_expressions = []
 
@@ -73,11 +76,91 @@ class Traps(list):
 
     def create_forms(self, mobile, materials, T, dx, dt=None):
         self.F = 0
+        self.F_linear = 0
+        self.F_nonlinear = 0
         for trap in self:
             trap.create_form(mobile, materials, T, dx, dt=dt)
             self.F += trap.F
+            self.F_linear += trap.F_linear
+            self.F_nonlinear += trap.F_nonlinear
             self.sub_expressions += trap.sub_expressions
 
+    def create_condensed_forms(self, mobile, materials, T, dx, dt=None):
+        self.F = 0
+        for trap in self:
+            trap.create_condensed_form(mobile, materials, T, dx, dt=dt)
+            self.F += trap.F
+            self.sub_expressions += trap.sub_expressions
+
+    def recover_condensed_traps(self):
+        for trap in self:
+            trap.recover_condensed_solution()
+
+    def create_nodal_properties(self, V, volume_markers):
+        for trap in self:
+            trap.create_nodal_properties(V, volume_markers)
+            self.sub_expressions += trap.sub_expressions
+
+    def integrate_kinetics(self, mobile, T, dt, tolerance=1e-12, maximum_iterations=50):
+        """Integrates the trapping/detrapping kinetics of all the traps over
+        dt at each node with the backward Euler scheme, without diffusion.
+        Each trap concentration is expressed as a function of the new
+        mobile concentration:
+        c_t = (c_t_n + dt k c_m n) / (1 + dt (k c_m + p))
+        and the conservation of hydrogen c_m + sum(c_t) is solved for c_m
+        with a vectorised Newton method. The solutions of the traps are
+        updated in place.
+
+        Args:
+            mobile (fenics.Function): the CG1 mobile concentration, updated
+                in place
+            T (fenics.Function): the CG1 temperature
+            dt (float): the time interval (s)
+            tolerance (float, optional): relative tolerance of the local
+                Newton iterations. Defaults to 1e-12.
+            maximum_iterations (int, optional): maximum number of local
+                Newton iterations. Defaults to 50.
+        """
+        if len(self) == 0:
+            return
+        c_m_n = mobile.vector().get_local()
+        T_values = T.vector().get_local()
+
+        coefficients = []
+        for trap in self:
+            k, p, n = trap.nodal_rates(T_values)
+            c_t_n = trap.solution.vector().get_local()
+            coefficients.append((dt * k, dt * p, n, c_t_n))
+
+        def trap_concentrations(c_m):
+            return [
+                (c_t_n + dtk * n * c_m) / (1 + dtp + dtk * c_m)
+                for dtk, dtp, n, c_t_n in coefficients
+            ]
+
+        # the residual is monotonic in c_m, Newton converges from c_m_n
+        c_m = c_m_n.copy()
+        scale = np.abs(c_m_n) + sum(np.abs(coef[3]) for coef in coefficients)
+        for _ in range(maximum_iterations):
+            residual = c_m - c_m_n
+            derivative = np.ones_like(c_m)
+            for c_t, (dtk, dtp, n, c_t_n) in zip(
+                trap_concentrations(c_m), coefficients
+            ):
+                residual += c_t - c_t_n
+                derivative += (dtk * n * (1 + dtp) - c_t_n * dtk) / (
+                    1 + dtp + dtk * c_m
+                ) ** 2
+            c_m = np.maximum(c_m - residual / derivative, 0)
+            if np.all(np.abs(residual) <= tolerance * scale):
+                break
+
+        mobile.vector().set_local(c_m)
+        mobile.vector().apply("insert")
+        for trap, c_t in zip(self, trap_concentrations(c_m)):
+            trap.solution.vector().set_local(c_t)
+            trap.solution.vector().apply("insert")
+
     def get_trap(self, id):
         for trap in self:
             if trap.id == id:
@@ -0,0 +1,140 @@
+import festim
+import fenics as f
+
+
+def run_continuation(
+    simulation,
+    values,
+    parameter=None,
+    secant_prediction=True,
+    maximum_halvings=5,
+):
+    """Solves an initialised steady state simulation for a sequence of
+    parameter values, using the previous converged solution as initial
+    guess. If the solver does not converge, the parameter step is halved
+    and the next value is reached with intermediate steps of this size
+    (intermediate values are solved but not reported). The step between
+    two values can be halved at most maximum_halvings times.
+    The exports are written for each value.
+
+    Args:
+        simulation (festim.Simulation): the initialised steady state
+            simulation
+        values (list): the parameter values
+        parameter (fenics.Constant or callable, optional): the parameter to
+            vary. If None, the values are used as the time festim.t: the
+            temperature and all the time dependent expressions (boundary
+            conditions, sources...) are evaluated at each value. If a
+            fenics.Constant (eg. a material property), it is assigned each
+            value. If a callable, it is called with each value and must
+            update the simulation. Defaults to None.
+        secant_prediction (bool, optional): if True, the initial guess is
+            extrapolated from the last two converged solutions. Defaults to
+            True.
+        maximum_halvings (int, optional): maximum number of halvings of
+            the parameter step between two values. Defaults to 5.
+
+    Raises:
+        ValueError: if the simulation is transient
+        ValueError: if the solver does not converge with a parameter step
+            halved maximum_halvings times
+
+    Returns:
+        list: the table of results, one dict per value with the parameter
+            value ("parameter"), the number of Newton iterations
+            ("nb_iterations") and the last value of each derived quantity
+            (with its title as key)
+
+    Example::
+
+        my_model.T = F.Temperature(500 + 100 * F.t)
+        my_model.settings = F.Settings(..., transient=False)
+        my_model.initialise()
+        table = F.run_continuation(my_model, values=np.linspace(0, 5, 11))
+    """
+    if simulation.settings.transient:
+        raise ValueError("Continuation is only available for steady state simulations")
+
+    h_transport_problem = simulation.h_transport_problem
+    u = h_transport_problem.u
+    # preallocated copies of the last two converged solutions
+    u_previous = f.Function(u.function_space())
+    u_previous_2 = f.Function(u.function_space())
+
+    def set_parameter(value):
+        if parameter is None:
+            simulation.t = value
+            simulation.T.update(value)
+            festim.update_expressions(h_transport_problem.expressions, value)
+        elif isinstance(parameter, f.Constant):
+            parameter.assign(value)
+        else:
+            parameter(value)
+        # the properties fields can appear in the forms
+        simulation.materials.update_properties()
+
+    def solve(value, previous_values):
+        set_parameter(value)
+        if (
+            secant_prediction
+            and len(previous_values) == 2
+            and previous_values[-1] != previous_values[-2]
+        ):
+            # u = u_previous + ratio * (u_previous - u_previous_2)
+            ratio = (value - previous_values[-1]) / (
+                previous_values[-1] - previous_values[-2]
+            )
+            u.vector().zero()
+            u.vector().axpy(1 + ratio, u_previous.vector())
+            u.vector().axpy(-ratio, u_previous_2.vector())
+        if simulation.settings.pseudo_transient_continuation:
+            nb_it, converged = h_transport_problem.solve_pseudo_transient()
+        else:
+            nb_it, converged = h_transport_problem.solve_once()
+        if not converged:
+            u.assign(u_previous)
+        return nb_it, converged
+
+    table = []
+    previous_values = []
+    for value in values:
+        target = value
+        step = target - previous_values[-1] if previous_values else None
+        nb_iterations = 0
+        nb_halvings = 0
+        while True:
+            nb_it, converged = solve(value, previous_values)
+            nb_iterations += nb_it
+            if converged:
+                u_previous_2.assign(u_previous)
+                u_previous.assign(u)
+                previous_values = (previous_values + [value])[-2:]
+                if value == target:
+                    break
+                # move on to the target with the reduced step, which is
+                # never increased again so that the number of steps is
+                # bounded
+                if abs(target - value) <= abs(step):
+                    value = target
+                else:
+                    value += step
+            else:
+                if not previous_values or nb_halvings == maximum_halvings:
+                    raise ValueError(
+                        "Continuation failed to converge for parameter {}".format(
+                            target
+                        )
+                    )
+                step /= 2
+                value = previous_values[-1] + step
+                nb_halvings += 1
+
+        simulation.run_post_processing()
+        row = {"parameter": target, "nb_iterations": nb_iterations}
+        for export in simulation.exports:
+            if isinstance(export, festim.DerivedQuantities):
+                for quantity in export:
+                    if quantity.data:
+                        row[quantity.title] = quantity.data[-1]
+        table.append(row)
+    return table
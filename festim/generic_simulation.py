@@ -311,6 +311,10 @@ class Simulation:
             )
         if self.settings.transient and self.dt is None:
             raise AttributeError("dt must be provided in transient simulations")
+        if self.settings.transient and self.settings.pseudo_transient_continuation:
+            raise AttributeError(
+                "pseudo_transient_continuation is only available for steady state simulations"
+            )
         if not self.T:
             raise AttributeError("Temperature is not defined")
 
@@ -336,9 +340,13 @@ class Simulation:
         self.exports.V_DG1 = self.V_DG1
 
         # Define temperature
+        self.T.precompute_rates = self.settings.precompute_rates
+        self.T.boltzmann_factors = {}
         if isinstance(self.T, festim.HeatTransferProblem):
             self.T.create_functions(self.materials, self.mesh, self.dt)
         elif isinstance(self.T, festim.Temperature):
+            if isinstance(self.T, festim.TemperatureFromXDMF):
+                self.T.transient = self.settings.transient
             self.T.create_functions(self.mesh)
 
         # Create functions for properties
@@ -418,10 +426,13 @@ class Simulation:
         """
         self.timer = Timer()  # start timer
 
-        if self.settings.transient:
-            self.run_transient()
-        else:
-            self.run_steady()
+        try:
+            if self.settings.transient:
+                self.run_transient()
+            else:
+                self.run_steady()
+        finally:
+            self.T.close()
 
         self.timer.stop()
 
@@ -433,10 +444,6 @@ class Simulation:
         # add final_time to Exports
         self.exports.final_time = self.settings.final_time
 
-        # compute Jacobian before iterating if required
-        if not self.settings.update_jacobian:
-            self.h_transport_problem.compute_jacobian()
-
         #  Time-stepping
         print("Time stepping...")
         while self.t < self.settings.final_time and not np.isclose(
@@ -448,7 +455,11 @@ class Simulation:
         # Solve steady state
         print("Solving steady state problem...")
 
-        nb_iterations, converged = self.h_transport_problem.solve_once()
+        if self.settings.pseudo_transient_continuation:
+            solve = self.h_transport_problem.solve_pseudo_transient
+        else:
+            solve = self.h_transport_problem.solve_once
+        nb_iterations, converged = solve()
 
         # Post processing
         self.run_post_processing()
@@ -467,10 +478,9 @@ class Simulation:
         """Advance the model by one iteration"""
         # Update current time
         self.t += float(self.dt.value)
-        # update temperature
-        self.T.update(self.t)
-        # update H problem
-        self.h_transport_problem.update(self.t, self.dt)
+        # update temperature and H problem, the time is reduced if the step
+        # is rejected
+        self.t = self.h_transport_problem.update(self.t, self.dt)
 
         # Display time
         self.display_time()
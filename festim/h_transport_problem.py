@@ -1,5 +1,6 @@
 from fenics import *
 import festim
+import numpy as np
 
 
 class HTransportProblem:
@@ -16,13 +17,36 @@ class HTransportProblem:
 
     Attributes:
         expressions (list): contains time-dependent fenics.Expressions
+        materials (festim.Materials): the materials, whose properties
+            fields are updated when the temperature changes
         J (ufl.Form): the jacobian of the variational problem
+        F_linear (ufl.Form): the terms of F linear in u, whose matrix is
+            cached if settings.cache_linear_operators is True
+        F_nonlinear (ufl.Form): the other terms of F
         V (fenics.FunctionSpace): the vector-function space for concentrations
         u (fenics.Function): the vector holding the concentrations (c_m, ct1,
             ct2, ...)
         v (fenics.TestFunction): the test function
         u_n (fenics.Function): the "previous" function
-        newton_solver (fenics.NewtonSolver): Newton solver for solving the nonlinear problem
+        u_nm1 (fenics.Function): the function two timesteps before, only
+            used by the "bdf2" time scheme and the error controller
+        u_nm2 (fenics.Function): the function three timesteps before, only
+            used by the "quadratic" newton predictor
+        accepted_stepsizes (list): stepsizes of the accepted time steps
+        u_backup (fenics.Function): preallocated copy of the solution at the
+            beginning of the time step, used to roll back rejected steps
+        nb_rejections (list): number of rejected attempts of each time step
+        u_pseudo_n (fenics.Function): the previous pseudo time step of the
+            pseudo-transient continuation
+        pseudo_stepsize (fenics.Constant): the pseudo time step of the
+            pseudo-transient continuation
+        F_pseudo_transient (ufl.Form): the steady form with the artificial
+            time term of the pseudo-transient continuation
+        newton_solver (fenics.NewtonSolver or fenics.PETScSNESSolver): Newton
+            solver for solving the nonlinear problem
+        problem (festim.Problem or festim.SplitProblem): the nonlinear
+            problem (and its assembler), created once and reused for every
+            solve
         bcs (list): list of fenics.DirichletBC for H transport
     """
 
@@ -33,11 +57,24 @@ class HTransportProblem:
         self.settings = settings
         self.initial_conditions = initial_conditions
 
+        self.materials = None
         self.J = None
+        self.F_linear = None
+        self.F_nonlinear = None
         self.u = None
         self.v = None
         self.u_n = None
+        self.u_nm1 = None
+        self.u_nm2 = None
+        self.accepted_stepsizes = []
+        self.u_backup = None
+        self.nb_rejections = []
+        self.u_pseudo_n = None
+        self.pseudo_stepsize = None
+        self.F_pseudo_transient = None
+        self._residual = None
         self.newton_solver = None
+        self.problem = None
 
         self.boundary_conditions = []
         self.bcs = None
@@ -53,12 +90,28 @@ class HTransportProblem:
     def newton_solver(self, value):
         if value is None:
             self._newton_solver = value
-        elif isinstance(value, NewtonSolver):
+        elif isinstance(value, (NewtonSolver, PETScSNESSolver)):
             if self._newton_solver:
                 print("Settings for the Newton solver will be overwritten")
             self._newton_solver = value
         else:
-            raise TypeError("accepted type for newton_solver is fenics.NewtonSolver")
+            raise TypeError(
+                "accepted type for newton_solver is fenics.NewtonSolver or fenics.PETScSNESSolver"
+            )
+
+    @property
+    def _local_traps(self):
+        # condensed traps and traps integrated with operator splitting are
+        # not part of the function space
+        return (
+            self.settings.condense_traps or self.settings.operator_splitting is not None
+        )
+
+    @property
+    def _nb_trap_fields(self):
+        if self._local_traps:
+            return 0
+        return len(self.traps)
 
     @property
     def _all_surf_kinetics(self):
@@ -78,18 +131,40 @@ class HTransportProblem:
             dt (festim.Stepsize, optional): the stepsize, only needed if
                 self.settings.transient is True. Defaults to None.
         """
+        self.materials = materials
         if self.settings.chemical_pot:
             self.mobile.S = materials.S
             self.mobile.materials = materials
             self.mobile.volume_markers = mesh.volume_markers
             self.mobile.T = self.T
         self.attribute_flux_boundary_conditions()
+        if self.settings.operator_splitting is not None:
+            self.check_operator_splitting()
+        if self._local_traps:
+            self.check_local_traps()
+        if self.settings.newton_predictor not in [None, "linear", "quadratic"]:
+            raise ValueError(
+                "Unknown newton_predictor {}, accepted values are linear and quadratic".format(
+                    self.settings.newton_predictor
+                )
+            )
 
         self.traps.assign_traps_ids()
 
         # Define functions
         self.define_function_space(mesh)
         self.initialise_concentrations()
+        if dt is not None and (
+            dt.scheme == "bdf2"
+            or dt.error_control
+            or self.settings.newton_predictor is not None
+        ):
+            self.define_second_previous_solutions(dt)
+        if dt is not None and (
+            self.settings.newton_predictor == "quadratic"
+            or (dt.scheme == "bdf2" and dt.error_control)
+        ):
+            self.u_nm2 = Function(self.V, name="c_nm2")
         self.traps.make_traps_materials(materials)
         self.traps.initialise_extrinsic_traps(self.V_CG1)
 
@@ -104,10 +179,70 @@ class HTransportProblem:
         # Boundary conditions
         print("Defining boundary conditions")
         self.create_dirichlet_bcs(materials, mesh)
+        self.define_problem()
         if self.settings.transient:
             self.traps.define_variational_problem_extrinsic_traps(mesh.dx, dt, self.T)
             self.traps.define_newton_solver_extrinsic_traps()
 
+    def check_operator_splitting(self):
+        """Checks that the problem can be integrated with operator splitting
+
+        Raises:
+            ValueError: if settings.operator_splitting is not "lie" or
+                "strang" or if the traps are condensed
+            NotImplementedError: if the problem is steady, uses conservation
+                of chemical potential, SurfaceKinetics or traps with sources
+        """
+        if self.settings.operator_splitting not in ["lie", "strang"]:
+            raise ValueError(
+                "Unknown operator_splitting {}, accepted values are lie and strang".format(
+                    self.settings.operator_splitting
+                )
+            )
+        if self.settings.condense_traps:
+            raise ValueError(
+                "operator_splitting and condense_traps cannot be used together"
+            )
+        if not self.settings.transient:
+            raise NotImplementedError(
+                "Operator splitting is only available for transient simulations"
+            )
+        if self.settings.chemical_pot:
+            raise NotImplementedError(
+                "Operator splitting is not implemented with chemical_pot"
+            )
+        if len(self._all_surf_kinetics) > 0:
+            raise NotImplementedError(
+                "Operator splitting is not implemented with SurfaceKinetics"
+            )
+        for trap in self.traps:
+            if trap.sources:
+                raise NotImplementedError(
+                    "Operator splitting is not implemented with sources in traps"
+                )
+
+    def check_local_traps(self):
+        """Checks that the traps can be removed from the function space
+        (with condense_traps or operator_splitting). The local traps are
+        stored in CG1 functions.
+
+        Raises:
+            NotImplementedError: if settings.traps_element_type is not "CG"
+                or if a DirichletBC is set on a trap
+        """
+        if self.settings.traps_element_type != "CG":
+            raise NotImplementedError(
+                "traps_element_type {} is not implemented with condense_traps or operator_splitting".format(
+                    self.settings.traps_element_type
+                )
+            )
+        non_trap_fields = ["T", 0, "0", "solute"]
+        for bc in self.boundary_conditions:
+            if isinstance(bc, festim.DirichletBC) and bc.field not in non_trap_fields:
+                raise NotImplementedError(
+                    "DirichletBC on traps is not implemented with condense_traps or operator_splitting"
+                )
+
     def define_function_space(self, mesh):
         """Creates a suitable function space for H transport problem
 
@@ -118,7 +253,7 @@ class HTransportProblem:
         element_solute, order_solute = "CG", 1
 
         # function space for H concentrations
-        nb_traps = len(self.traps)
+        nb_traps = self._nb_trap_fields
 
         # the number of surfaces where SurfaceKinetics is used
         nb_adsorbed = sum([len(bc.surfaces) for bc in self._all_surf_kinetics])
@@ -157,7 +292,7 @@ class HTransportProblem:
             self.mobile.test_function = self.v
         else:
             conc_list = [self.mobile]
-            if self.traps:
+            if self._nb_trap_fields > 0:
                 conc_list += [*self.traps]
             if len(self._all_surf_kinetics) > 0:
                 conc_list += self._all_surf_kinetics
@@ -177,6 +312,13 @@ class HTransportProblem:
                     concentration.test_function = list(split(self.v))[index]
                     index += 1
 
+        if self._local_traps:
+            # local traps are stored in separate CG1 functions
+            for trap in self.traps:
+                trap.solution = Function(self.V_CG1)
+                trap.previous_solution = Function(self.V_CG1)
+                trap.test_function = None
+
         print("Defining initial values")
         field_to_component = {
             "solute": 0,
@@ -191,7 +333,9 @@ class HTransportProblem:
             value = ini.value
             component = field_to_component[ini.field]
 
-            if self.V.num_sub_spaces() == 0:
+            if component != 0 and self._local_traps:
+                functionspace = self.V_CG1
+            elif self.V.num_sub_spaces() == 0:
                 functionspace = self.V
             else:
                 functionspace = self.V.sub(component).collapse()
@@ -208,7 +352,7 @@ class HTransportProblem:
 
         # assign initial condition for SurfaceKinetics BC
         # iterate through each surface of each SurfaceKinetics
-        index = len(self.traps) + 1
+        index = self._nb_trap_fields + 1
         for bc in self._all_surf_kinetics:
             for i in range(len(bc.previous_solutions)):
                 functionspace = self.V.sub(index).collapse()
@@ -243,6 +387,41 @@ class HTransportProblem:
                     concentration.previous_solution = list(split(self.u_n))[index]
                     index += 1
 
+    def define_second_previous_solutions(self, dt):
+        """Creates self.u_nm1 holding the concentrations two timesteps
+        before (needed by the "bdf2" time scheme and the error controller)
+        and assigns it to the concentrations
+
+        Args:
+            dt (festim.Stepsize): the stepsize
+
+        Raises:
+            NotImplementedError: if the "bdf2" scheme is used with
+                conservation of chemical potential, condensed traps or
+                operator splitting
+        """
+        self.u_nm1 = Function(self.V, name="c_nm1")
+        if dt.scheme != "bdf2":
+            return
+        if self.settings.chemical_pot or self._local_traps:
+            raise NotImplementedError(
+                "The bdf2 scheme is not implemented with chemical_pot, "
+                "condense_traps or operator_splitting"
+            )
+        if self.V.num_sub_spaces() == 0:
+            self.mobile.second_previous_solution = self.u_nm1
+            return
+
+        components = list(split(self.u_nm1))
+        self.mobile.second_previous_solution = components[0]
+        for i, trap in enumerate(self.traps, 1):
+            trap.second_previous_solution = components[i]
+        index = len(self.traps) + 1
+        for bc in self._all_surf_kinetics:
+            for i in range(len(bc.surfaces)):
+                bc.second_previous_solutions[i] = components[index]
+                index += 1
+
     def define_variational_problem(self, materials, mesh, dt=None):
         """Creates the variational problem for hydrogen transport (form,
         Dirichlet boundary conditions)
@@ -259,22 +438,84 @@ class HTransportProblem:
 
         # diffusion + transient terms
 
+        if self._local_traps:
+            # trapping terms are added by the condensed traps forms or
+            # integrated separately with operator splitting
+            traps_in_mobile = None
+        else:
+            traps_in_mobile = self.traps
         self.mobile.create_form(
-            materials, mesh, self.T, dt, traps=self.traps, soret=self.settings.soret
+            materials,
+            mesh,
+            self.T,
+            dt,
+            traps=traps_in_mobile,
+            soret=self.settings.soret,
         )
         F += self.mobile.F
         expressions += self.mobile.sub_expressions
 
+        F_linear = self.mobile.F_linear
+        F_nonlinear = self.mobile.F_nonlinear
+
         # Add traps
-        self.traps.create_forms(self.mobile, materials, self.T, mesh.dx, dt)
-        F += self.traps.F
+        if self.settings.condense_traps:
+            self.traps.create_condensed_forms(
+                self.mobile, materials, self.T, mesh.dx, dt
+            )
+            F += self.traps.F
+            F_nonlinear += self.traps.F
+        elif self.settings.operator_splitting is None:
+            self.traps.create_forms(self.mobile, materials, self.T, mesh.dx, dt)
+            F += self.traps.F
+            F_linear += self.traps.F_linear
+            F_nonlinear += self.traps.F_nonlinear
+        else:
+            self.traps.create_nodal_properties(self.V_CG1, mesh.volume_markers)
         expressions += self.traps.sub_expressions
         self.F = F
+        self.F_linear = F_linear
+        self.F_nonlinear = F_nonlinear
         self.expressions = expressions
 
+        if self.settings.pseudo_transient_continuation:
+            # artificial time term of the pseudo-transient continuation
+            self.u_pseudo_n = Function(self.V, name="c_pseudo_n")
+            self.pseudo_stepsize = Constant(self.settings.pseudo_stepsize)
+            self.F_pseudo_transient = (
+                self.F
+                + inner(self.u - self.u_pseudo_n, self.v)
+                / self.pseudo_stepsize
+                * mesh.dx
+            )
+
     def define_newton_solver(self):
-        """Creates the Newton solver and sets its parameters"""
-        self.newton_solver = NewtonSolver(MPI.comm_world)
+        """Creates the Newton solver and sets its parameters
+
+        Raises:
+            ValueError: if settings.nonlinear_solver is not "newton" or "snes"
+        """
+        if self.settings.nonlinear_solver == "snes":
+            self.define_snes_solver()
+            return
+        elif self.settings.nonlinear_solver != "newton":
+            raise ValueError(
+                "Unknown nonlinear_solver {}, accepted values are newton and snes".format(
+                    self.settings.nonlinear_solver
+                )
+            )
+        if self.settings.preconditioner == "fieldsplit":
+            linear_solver = PETScKrylovSolver()
+            self.define_fieldsplit_preconditioner(linear_solver.ksp())
+            self.newton_solver = NewtonSolver(
+                MPI.comm_world, linear_solver, PETScFactory.instance()
+            )
+        else:
+            self.newton_solver = NewtonSolver(MPI.comm_world)
+            self.newton_solver.parameters["linear_solver"] = self.settings.linear_solver
+            self.newton_solver.parameters["preconditioner"] = (
+                self.settings.preconditioner
+            )
         self.newton_solver.parameters["error_on_nonconvergence"] = False
         self.newton_solver.parameters["absolute_tolerance"] = (
             self.settings.absolute_tolerance
@@ -285,8 +526,109 @@ class HTransportProblem:
         self.newton_solver.parameters["maximum_iterations"] = (
             self.settings.maximum_iterations
         )
-        self.newton_solver.parameters["linear_solver"] = self.settings.linear_solver
-        self.newton_solver.parameters["preconditioner"] = self.settings.preconditioner
+
+    def define_snes_solver(self):
+        """Creates a PETSc SNES solver with line search and sets its
+        parameters. If settings.nonnegative_concentrations is True, a
+        variational inequality solver is used to keep all the
+        concentrations positive.
+        """
+        self.newton_solver = PETScSNESSolver(MPI.comm_world)
+        self.newton_solver.snes().setMonitor(self.record_residual_norm)
+        parameters = self.newton_solver.parameters
+        if self.settings.nonnegative_concentrations:
+            parameters["method"] = "vinewtonrsls"
+            parameters["sign"] = "nonnegative"
+        else:
+            parameters["method"] = "newtonls"
+        parameters["line_search"] = self.settings.line_search
+        parameters["error_on_nonconvergence"] = False
+        parameters["absolute_tolerance"] = self.settings.absolute_tolerance
+        parameters["relative_tolerance"] = self.settings.relative_tolerance
+        parameters["maximum_iterations"] = self.settings.maximum_iterations
+        if self.settings.preconditioner == "fieldsplit":
+            self.define_fieldsplit_preconditioner(self.newton_solver.snes().getKSP())
+            return
+        if self.settings.linear_solver is not None:
+            parameters["linear_solver"] = self.settings.linear_solver
+        parameters["preconditioner"] = self.settings.preconditioner
+
+    def record_residual_norm(self, snes, iteration, residual_norm):
+        """SNES monitor recording the residual norm of each nonlinear
+        iteration in self.problem.residual_norms
+
+        Args:
+            snes (petsc4py.PETSc.SNES): the SNES solver
+            iteration (int): the iteration number
+            residual_norm (float): the l2 norm of the residual
+        """
+        if self.problem is not None:
+            self.problem.residual_norms.append(residual_norm)
+
+    def define_fieldsplit_preconditioner(self, ksp):
+        """Sets a GMRES Krylov solver with a PETSc fieldsplit preconditioner:
+        algebraic multigrid on the (diffusive) solute block and block Jacobi
+        (local ILU) on the trap and adsorbed blocks. If the function space
+        only has the solute field, AMG is used directly.
+
+        Args:
+            ksp (petsc4py.PETSc.KSP): the PETSc Krylov solver to set
+
+        Raises:
+            ImportError: if petsc4py is not installed
+        """
+        try:
+            from petsc4py import PETSc
+        except ImportError:
+            raise ImportError("petsc4py is required for the fieldsplit preconditioner")
+
+        if has_krylov_solver_preconditioner("hypre_amg"):
+            amg = "hypre"
+        else:
+            amg = "gamg"
+
+        prefix = "festim_h_transport_"
+        options = PETSc.Options()
+        ksp.setOptionsPrefix(prefix)
+        ksp.setType("gmres")
+        ksp.setTolerances(rtol=1e-10)
+        pc = ksp.getPC()
+        if self.V.num_sub_spaces() == 0:
+            pc.setType(amg)
+            solute_prefix = prefix
+        else:
+            pc.setType("fieldsplit")
+            pc.setFieldSplitType(PETSc.PC.CompositeType.MULTIPLICATIVE)
+            comm = self.V.mesh().mpi_comm()
+            solute_dofs = self.V.sub(0).dofmap().dofs()
+            other_dofs = np.concatenate(
+                [
+                    self.V.sub(i).dofmap().dofs()
+                    for i in range(1, self.V.num_sub_spaces())
+                ]
+            )
+            pc.setFieldSplitIS(
+                (
+                    "solute",
+                    PETSc.IS().createGeneral(
+                        solute_dofs.astype(PETSc.IntType), comm=comm
+                    ),
+                ),
+                (
+                    "traps",
+                    PETSc.IS().createGeneral(
+                        other_dofs.astype(PETSc.IntType), comm=comm
+                    ),
+                ),
+            )
+            solute_prefix = prefix + "fieldsplit_solute_"
+            options[solute_prefix + "ksp_type"] = "preonly"
+            options[solute_prefix + "pc_type"] = amg
+            options[prefix + "fieldsplit_traps_ksp_type"] = "preonly"
+            options[prefix + "fieldsplit_traps_pc_type"] = "bjacobi"
+        if amg == "hypre":
+            options[solute_prefix + "pc_hypre_type"] = "boomeramg"
+        ksp.setFromOptions()
 
     def attribute_flux_boundary_conditions(self):
         """Iterates through self.boundary_conditions, checks if it's a FluxBC
@@ -319,29 +661,289 @@ class HTransportProblem:
         du = TrialFunction(self.u.function_space())
         self.J = derivative(self.F, self.u, du)
 
+    def define_problem(self):
+        """Creates the nonlinear problem and its assembler. The problem only
+        holds references to the forms and the boundary conditions so it is
+        created once and reused for every time step (and every retry of a
+        time step).
+        If settings.cache_linear_operators is True, a festim.SplitProblem
+        caching the matrix of F_linear is created.
+        With the SNES solver, the residual norms are recorded by the SNES
+        monitor since the line search also assembles residuals.
+        """
+        if self.settings.cache_linear_operators and not isinstance(self.F_linear, int):
+            self.problem = festim.SplitProblem(
+                self.u,
+                self.F_linear,
+                self.F_nonlinear,
+                self.bcs,
+                lagged_jacobian=self.settings.lagged_jacobian,
+                max_contraction_rate=self.settings.max_contraction_rate,
+            )
+        else:
+            if self.J is None:  # Define the Jacobian
+                self.compute_jacobian()
+            self.problem = festim.Problem(
+                self.J,
+                self.F,
+                self.bcs,
+                lagged_jacobian=self.settings.lagged_jacobian,
+                max_contraction_rate=self.settings.max_contraction_rate,
+            )
+        if self.settings.nonlinear_solver == "snes":
+            self.problem.record_residual_norms = False
+
     def update(self, t, dt):
-        """Updates the H transport problem.
+        """Updates the temperature and the H transport problem.
+        If the step is rejected (the solver did not converge or the
+        estimated error is too large), the solutions and the temperature are
+        rolled back to the beginning of the step and the step is solved
+        again with the adapted stepsize.
 
         Args:
-            t (float): the current time (s)
+            t (float): the time at the end of the step (s)
             dt (festim.Stepsize): the stepsize
+
+        Returns:
+            float: the time at the end of the accepted step (s), different
+                from t if the stepsize was reduced
         """
+        t_n = t - float(dt.value)
+        self.backup_solutions()
+        self.update_temperature(t)
         festim.update_expressions(self.expressions, t)
 
-        converged = False
-        u_ = Function(self.u.function_space())
-        u_.assign(self.u)
-        while converged is False:
-            self.u.assign(u_)
-            nb_it, converged = self.solve_once()
-            if dt.adaptive_stepsize is not None or dt.milestones is not None:
-                dt.adapt(t, nb_it, converged)
+        nb_rejections = 0
+        while True:
+            # dt.adapt changes the stepsize after the solve
+            h = float(dt.value)
+            if self.settings.newton_predictor is not None:
+                self.predict(h)
+            nb_it, converged = self.solve_step(h)
+            error = None
+            if converged and dt.error_control:
+                error = self.estimate_local_error(dt)
+            accepted = converged and (error is None or error <= 1)
+            if (
+                dt.adaptive_stepsize is not None
+                or dt.error_control is not None
+                or dt.milestones is not None
+            ):
+                dt.adapt(t, nb_it, converged, error)
+            if accepted:
+                break
+
+            nb_rejections += 1
+            self.rollback()
+            t = t_n + float(dt.value)
+            self.update_temperature(t)
+            festim.update_expressions(self.expressions, t)
+
+        self.nb_rejections.append(nb_rejections)
+        self.accepted_stepsizes.append(h)
+        dt.store_previous_value(h)
 
         # Update previous solutions
         self.update_previous_solutions()
 
         # Solve extrinsic traps formulation
         self.traps.solve_extrinsic_traps()
+        return t
+
+    def backup_solutions(self):
+        """Copies the solution at the beginning of the time step (u, or u_n
+        with operator splitting since it is modified by the Strang
+        splitting) in self.u_backup and backs up the temperature if it
+        depends on time. self.u_backup is only allocated once.
+        The SurfaceKinetics states are components of u and the extrinsic
+        traps densities are only updated once the step is accepted, so they
+        don't need a backup.
+        """
+        if not self.T.is_steady_state():
+            self.T.backup()
+        if self.u_backup is None:
+            self.u_backup = Function(self.u.function_space())
+        if self.settings.operator_splitting is not None:
+            self.u_backup.assign(self.u_n)
+        else:
+            self.u_backup.assign(self.u)
+
+    def rollback(self):
+        """Restores the solutions and the temperature at the beginning of
+        the time step after a step rejection"""
+        if self.settings.operator_splitting is not None:
+            self.u_n.assign(self.u_backup)
+            for trap in self.traps:
+                trap.solution.assign(trap.previous_solution)
+        else:
+            self.u.assign(self.u_backup)
+        if not self.T.is_steady_state():
+            self.T.restore()
+            self.update_properties()
+
+    def update_temperature(self, t):
+        """Updates the temperature and the materials properties fields
+        depending on it. The properties (eg. the solubility with
+        chemical_pot) can appear in the forms so they are updated before
+        the solve.
+
+        Args:
+            t (float): the time (s)
+        """
+        self.T.update(t)
+        if not self.T.is_steady_state():
+            self.update_properties()
+
+    def update_properties(self):
+        """Updates the materials properties fields with the current
+        temperature"""
+        if self.materials is not None:
+            self.materials.update_properties()
+
+    def predict(self, stepsize):
+        """Sets the initial guess self.u of the Newton solver by
+        extrapolating in time the previous accepted solutions, linearly from
+        u_n and u_nm1 or quadratically from u_n, u_nm1 and u_nm2. The order
+        is reduced until enough steps have been accepted.
+        Not used with operator splitting.
+
+        Args:
+            stepsize (float): the stepsize of the step to solve (s)
+        """
+        if self.settings.operator_splitting is not None:
+            return
+        order = {"linear": 1, "quadratic": 2}[self.settings.newton_predictor]
+        order = min(order, len(self.accepted_stepsizes))
+        if order == 0:
+            return
+
+        weights = self.extrapolation_weights(stepsize, order)
+        u = self.u.vector()
+        u.zero()
+        for weight, previous in zip(weights, [self.u_n, self.u_nm1, self.u_nm2]):
+            u.axpy(weight, previous.vector())
+
+    def extrapolation_weights(self, stepsize, order):
+        """Returns the weights of the Lagrange extrapolation at t_n + h of
+        the previous accepted solutions u_n, u_nm1 (and u_nm2)
+
+        Args:
+            stepsize (float): the stepsize h (s)
+            order (int): 1 (linear, from u_n and u_nm1) or 2 (quadratic,
+                from u_n, u_nm1 and u_nm2)
+
+        Returns:
+            list: the weights of u_n, u_nm1 (and u_nm2)
+        """
+        h = stepsize
+        h_1 = self.accepted_stepsizes[-1]
+        if order == 1:
+            return [1 + h / h_1, -h / h_1]
+        h_2 = self.accepted_stepsizes[-2]
+        # extrapolation from t_n, t_n - h_1 and t_n - h_1 - h_2
+        return [
+            (h + h_1) * (h + h_1 + h_2) / (h_1 * (h_1 + h_2)),
+            -h * (h + h_1 + h_2) / (h_1 * h_2),
+            h * (h + h_1) / ((h_1 + h_2) * h_2),
+        ]
+
+    def solve_step(self, stepsize):
+        """Solves the H transport problem over one time step
+
+        Args:
+            stepsize (float): the stepsize (s)
+
+        Returns:
+            int, bool: number of iterations for reaching convergence, True if
+                converged else False
+        """
+        if self.settings.operator_splitting is not None:
+            return self.solve_operator_splitting_step(stepsize)
+        return self.solve_once()
+
+    def estimate_local_error(self, dt):
+        """Estimates the local truncation error of the current step from
+        the difference between the solution and the extrapolation of the
+        previous solutions.
+        With backward Euler, the extrapolation is linear:
+        e = dt / (dt + dt_n) * (u - u_n - dt / dt_n * (u_n - u_nm1))
+        With the "bdf2" scheme, it is quadratic (u_p from u_n, u_nm1 and
+        u_nm2) and the error of the variable stepsize BDF2 is:
+        e = B / (A + B) * (u - u_p)
+        with A = dt (dt + dt_n) (dt + dt_n + dt_nm1) and
+        B = dt**2 (dt + dt_n)**2 / (2 dt + dt_n)
+        With operator splitting, u_n is modified in place by the Strang
+        splitting so the solution at the beginning of the step is read from
+        the backup.
+
+        Args:
+            dt (festim.Stepsize): the stepsize
+
+        Returns:
+            float: the maximum of e normalised by the error tolerance times
+                the maximum of the solution. None if the previous solutions
+                needed by the extrapolation are not known yet.
+        """
+        order = 2 if dt.scheme == "bdf2" else 1
+        if len(self.accepted_stepsizes) < order:
+            return None
+        h = float(dt.value)
+        u = self.u.vector().get_local()
+        if self.settings.operator_splitting is not None:
+            u_n = self.u_backup.vector().get_local()
+        else:
+            u_n = self.u_n.vector().get_local()
+        previous = [u_n, self.u_nm1.vector().get_local()]
+        if order == 2:
+            previous.append(self.u_nm2.vector().get_local())
+
+        weights = self.extrapolation_weights(h, order)
+        prediction = sum(weight * u_i for weight, u_i in zip(weights, previous))
+        h_1 = self.accepted_stepsizes[-1]
+        if order == 1:
+            factor = h / (h + h_1)
+        else:
+            h_2 = self.accepted_stepsizes[-2]
+            A = h * (h + h_1) * (h + h_1 + h_2)
+            B = h**2 * (h + h_1) ** 2 / (2 * h + h_1)
+            factor = B / (A + B)
+        local_error = factor * np.abs(u - prediction)
+        local_error = MPI.max(MPI.comm_world, np.max(local_error, initial=0))
+        scale = dt.error_control["tolerance"] * self.u.vector().norm("linf")
+        if scale == 0:
+            return 0
+        return local_error / scale
+
+    def solve_operator_splitting_step(self, stepsize):
+        """Advances the H transport problem by one time step with operator
+        splitting: the mobile diffusion problem (without trapping) is solved
+        with the Newton solver and the trapping/detrapping kinetics are
+        integrated pointwise on the nodal values.
+        With "lie" splitting, the kinetics are integrated over dt after the
+        diffusion step (first order). With "strang" splitting, they are
+        integrated over dt/2 before and after the diffusion step (second
+        order).
+
+        Args:
+            stepsize (float): the stepsize (s)
+
+        Returns:
+            int, bool: number of iterations of the diffusion step, True if
+                converged else False
+        """
+        strang = self.settings.operator_splitting == "strang"
+        if strang:
+            self.traps.integrate_kinetics(self.u_n, self.T.T, stepsize / 2)
+        self.u.assign(self.u_n)
+        nb_it, converged = self.solve_once()
+        if not converged:
+            return nb_it, converged
+
+        if strang:
+            self.traps.integrate_kinetics(self.u, self.T.T, stepsize / 2)
+        else:
+            self.traps.integrate_kinetics(self.u, self.T.T, stepsize)
+        return nb_it, converged
 
     def solve_once(self):
         """Solves non linear problem
@@ -350,21 +952,99 @@ class HTransportProblem:
             int, bool: number of iterations for reaching convergence, True if
                 converged else False
         """
-        if self.J is None:  # Define the Jacobian
-            du = TrialFunction(self.u.function_space())
-            J = derivative(self.F, self.u, du)
-        else:
-            J = self.J
-        problem = festim.Problem(J, self.F, self.bcs)
+        if self.problem is None:
+            self.define_problem()
+        self.problem.reset_residual_norms()
+        if isinstance(self.problem, festim.SplitProblem):
+            self.problem.check_linear_operator()
 
         begin("Solving nonlinear variational problem.")  # Add message to fenics logs
-        nb_it, converged = self.newton_solver.solve(problem, self.u.vector())
+        nb_it, converged = self.newton_solver.solve(self.problem, self.u.vector())
         end()
 
+        # a lagged Jacobian must be reassembled after a rejected step
+        if not converged:
+            self.problem.jacobian_outdated = True
+
+        if self.settings.condense_traps:
+            self.traps.recover_condensed_traps()
+
         return nb_it, converged
 
+    def solve_pseudo_transient(self, maximum_steps=100, switch_ratio=1e-3):
+        """Solves the steady state problem with pseudo-transient continuation
+        (switched evolution relaxation). Pseudo time steps of the problem
+        with an artificial time term (u - u_pseudo_n) / tau are solved from
+        the current solution. After each pseudo step, tau is multiplied by
+        the ratio of the previous and new steady residual norms, so that it
+        grows as the solution approaches the steady state. Once the steady
+        residual has been reduced by switch_ratio, the steady problem is
+        solved with the Newton solver.
+
+        Args:
+            maximum_steps (int, optional): maximum number of pseudo time
+                steps. Defaults to 100.
+            switch_ratio (float, optional): reduction of the steady residual
+                norm after which the pure Newton solver is used. Defaults to
+                1e-3.
+
+        Returns:
+            int, bool: total number of Newton iterations, True if the steady
+                problem converged else False
+        """
+        du = TrialFunction(self.u.function_space())
+        J_pseudo_transient = derivative(self.F_pseudo_transient, self.u, du)
+        problem = festim.Problem(J_pseudo_transient, self.F_pseudo_transient, self.bcs)
+
+        tau = self.settings.pseudo_stepsize
+        self.pseudo_stepsize.assign(tau)
+        initial_residual = residual = self.steady_residual_norm()
+        nb_it_total = 0
+        for _ in range(maximum_steps):
+            if residual <= switch_ratio * initial_residual:
+                break
+            self.u_pseudo_n.assign(self.u)
+            begin("Solving pseudo-transient step.")  # Add message to fenics logs
+            nb_it, converged = self.newton_solver.solve(problem, self.u.vector())
+            end()
+            nb_it_total += nb_it
+            if not converged:
+                self.u.assign(self.u_pseudo_n)
+                tau /= 10
+            else:
+                new_residual = self.steady_residual_norm()
+                tau *= residual / max(new_residual, DOLFIN_EPS * residual)
+                residual = new_residual
+            self.pseudo_stepsize.assign(tau)
+
+        nb_it, converged = self.solve_once()
+        return nb_it_total + nb_it, converged
+
+    def steady_residual_norm(self):
+        """Computes the l2 norm of the steady residual (with the Dirichlet
+        boundary conditions) at the current solution
+
+        Returns:
+            float: the residual norm
+        """
+        self._residual = assemble(self.F, tensor=self._residual)
+        for bc in self.bcs:
+            bc.apply(self._residual, self.u.vector())
+        return self._residual.norm("l2")
+
     def update_previous_solutions(self):
+        if self.u_nm2 is not None:
+            self.u_nm2.assign(self.u_nm1)
+        if self.u_nm1 is not None:
+            # u_n is modified in place by the Strang splitting
+            if self.settings.operator_splitting is not None:
+                self.u_nm1.assign(self.u_backup)
+            else:
+                self.u_nm1.assign(self.u_n)
         self.u_n.assign(self.u)
+        if self._local_traps:
+            for trap in self.traps:
+                trap.previous_solution.assign(trap.solution)
         self.traps.update_extrinsic_traps_density()
 
     def update_post_processing_solutions(self, exports):
@@ -374,9 +1054,12 @@ class HTransportProblem:
             res = list(self.u.split())
 
         for i, trap in enumerate(self.traps, 1):
-            trap.post_processing_solution = res[i]
+            if self._local_traps:
+                trap.post_processing_solution = trap.solution
+            else:
+                trap.post_processing_solution = res[i]
 
-        index = len(self.traps) + 1
+        index = self._nb_trap_fields + 1
         for bc in self._all_surf_kinetics:
             for i in range(len(bc.post_processing_solutions)):
                 bc.post_processing_solutions[i] = res[index]
@@ -3,6 +3,17 @@ import xml.etree.ElementTree as ET
 from fenics import Expression, UserExpression, Constant
 import sympy as sp
 
+try:
+    from ufl.log import UFLException
+except ImportError:
+    # recent versions of ufl raise built-in exceptions
+    UFLException = ValueError
+
+# errors raised when a Python function of the temperature that isn't
+# vectorised (eg. it uses ufl functions or branches on the value) is called
+# with numpy arrays
+NOT_VECTORISED_ERRORS = (TypeError, ValueError, UFLException)
+
 
 def update_expressions(expressions, t):
     """Update all FEniCS Expression() in expressions.
@@ -3,6 +3,7 @@ import warnings
 import numpy as np
 from festim import k_B, Material, HeatTransferProblem
 import festim
+from festim.helpers import NOT_VECTORISED_ERRORS
 import fenics as f
 from typing import Union
 import warnings
@@ -207,6 +208,44 @@ class Materials(list):
                     raise ValueError("Missing rho in materials")
         # TODO: add check for thermal cond for thermal flux computation
 
+    def dof_material_indices(self, vm, V):
+        """Maps the local degrees of freedom of a function space to the
+        index of their material in the list. A degree of freedom shared by
+        cells of different materials is given one of them.
+
+        Args:
+            vm (fenics.MeshFunction): the volume markers
+            V (fenics.FunctionSpace): the function space (not a subspace)
+
+        Returns:
+            numpy.ndarray: the index of the material of each locally owned
+                degree of freedom, -1 if it isn't in any material
+        """
+        # material index of each cell
+        index_from_id = {}
+        for index, material in enumerate(self):
+            mat_ids = material.id
+            if not isinstance(mat_ids, list):
+                mat_ids = [mat_ids]
+            for mat_id in mat_ids:
+                index_from_id.setdefault(mat_id, index)
+        markers, inverse = np.unique(vm.array(), return_inverse=True)
+        indices = np.array([index_from_id.get(int(m), -1) for m in markers], dtype=int)
+        cell_indices = indices[inverse]
+
+        mesh = vm.mesh()
+        cell_dofs = np.reshape(
+            V.dofmap().entity_closure_dofs(mesh, mesh.topology().dim()),
+            (mesh.num_cells(), -1),
+        )
+        dof_indices = np.repeat(cell_indices, cell_dofs.shape[1])
+        dofs = cell_dofs.ravel()
+        start, end = V.dofmap().ownership_range()
+        owned = dofs < end - start
+        material_indices = np.full(end - start, -1)
+        material_indices[dofs[owned]] = dof_indices[owned]
+        return material_indices
+
     def find_material_from_id(self, mat_id):
         """Returns the material from a given id
 
@@ -300,16 +339,33 @@ class Materials(list):
             vm {fenics.MeshFunction()} -- volume markers
             T {fenics.Function()} -- temperature
         """
-        self.D = ArheniusCoeff(self, vm, T, "D_0", "E_D", degree=2)
+        self.D = ArheniusCoeff(self, vm, T, "D_0", "E_D")
         # all materials have the same properties so only checking the first is enough
         if self[0].S_0 is not None:
-            self.S = ArheniusCoeff(self, vm, T, "S_0", "E_S", degree=2)
+            self.S = ArheniusCoeff(self, vm, T, "S_0", "E_S")
         if self[0].thermal_cond is not None:
-            self.thermal_cond = ThermalProp(self, vm, T, "thermal_cond", degree=2)
-            self.heat_capacity = ThermalProp(self, vm, T, "heat_capacity", degree=2)
-            self.density = ThermalProp(self, vm, T, "rho", degree=2)
+            self.thermal_cond = ThermalProp(self, vm, T, "thermal_cond")
+            self.heat_capacity = ThermalProp(self, vm, T, "heat_capacity")
+            self.density = ThermalProp(self, vm, T, "rho")
         if self[0].Q is not None:
-            self.Q = ThermalProp(self, vm, T, "Q", degree=2)
+            self.Q = ThermalProp(self, vm, T, "Q")
+
+    def update_properties(self):
+        """Updates the properties fields created by create_properties(), to
+        be called when the temperature has changed (before solving since
+        the solubility can appear in the forms with chemical_pot)"""
+        properties = [
+            self.D,
+            self.S,
+            self.thermal_cond,
+            self.heat_capacity,
+            self.density,
+            self.Q,
+        ]
+        for prop in properties:
+            # S can be replaced by solubility_as_function()
+            if isinstance(prop, PropertyField):
+                prop.update()
 
     def solubility_as_function(self, mesh, T):
         """
@@ -367,44 +423,115 @@ class Materials(list):
         self.sievert_marker = sievert
 
 
-class ArheniusCoeff(f.UserExpression):
-    def __init__(self, materials, vm, T, pre_exp, E, **kwargs):
-        super().__init__(kwargs)
-        self._vm = vm
-        self._T = T
+class PropertyField(f.Function):
+    """DG1 field of a material property. Each degree of freedom is mapped
+    once to the index of its material, and the values are computed with
+    numpy from the temperature interpolated on the DG1 space when update()
+    is called.
+
+    Args:
+        materials (festim.Materials): the materials
+        vm (fenics.MeshFunction): the volume markers
+        T (fenics.Function, fenics.Constant, fenics.Expression): the
+            temperature
+
+    Raises:
+        ValueError: if a subdomain of the volume markers has no material
+    """
+
+    def __init__(self, materials, vm, T):
+        for subdomain_id in np.unique(vm.array()):
+            materials.find_material_from_id(int(subdomain_id))
+        V = f.FunctionSpace(vm.mesh(), "DG", 1)
+        super().__init__(V)
         self._materials = materials
-        self._pre_exp = pre_exp
-        self._E = E
+        self._T = T
+        self._T_DG = f.Function(V)
+
+        material_index = materials.dof_material_indices(vm, V)
+        self._dofs = [
+            np.flatnonzero(material_index == j) for j in range(len(materials))
+        ]
+
+        self.update()
+
+    def update(self):
+        """Computes the values of the property, to be called when the
+        temperature has changed"""
+        self._T_DG.interpolate(self._T)
+        T = self._T_DG.vector().get_local()
+        values = np.full(T.size, np.nan)
+        for material, dofs in zip(self._materials, self._dofs):
+            if dofs.size > 0:
+                values[dofs] = self.material_values(material, T[dofs])
+        self.vector().set_local(values)
+        self.vector().apply("insert")
+
+    def material_values(self, material, T):
+        """Computes the property of a material
 
-    def eval_cell(self, value, x, ufc_cell):
-        cell = f.Cell(self._vm.mesh(), ufc_cell.index)
-        subdomain_id = self._vm[cell]
-        material = self._materials.find_material_from_id(subdomain_id)
-        D_0 = getattr(material, self._pre_exp)
-        E_D = getattr(material, self._E)
-        value[0] = D_0 * f.exp(-E_D / k_B / self._T(x))
+        Args:
+            material (festim.Material): the material
+            T (numpy.ndarray): the temperature at the degrees of freedom
 
-    def value_shape(self):
-        return ()
+        Returns:
+            numpy.ndarray: the values of the property
+        """
+        raise NotImplementedError
+
+
+class ArheniusCoeff(PropertyField):
+    """DG1 field of an Arrhenius law pre_exp * exp(-E/k_B/T) (eg. the
+    diffusion coefficient)
+
+    Args:
+        materials (festim.Materials): the materials
+        vm (fenics.MeshFunction): the volume markers
+        T (fenics.Function, fenics.Constant, fenics.Expression): the
+            temperature
+        pre_exp (str): the name of the pre-exponential factor attribute of
+            the materials (eg. "D_0")
+        E (str): the name of the activation energy attribute of the
+            materials (eg. "E_D")
+    """
 
+    def __init__(self, materials, vm, T, pre_exp, E):
+        self._pre_exp = pre_exp
+        self._E = E
+        super().__init__(materials, vm, T)
+
+    def material_values(self, material, T):
+        pre_exp = getattr(material, self._pre_exp)
+        E = getattr(material, self._E)
+        if pre_exp is None:
+            return np.nan
+        return pre_exp * np.exp(-E / k_B / T)
+
+
+class ThermalProp(PropertyField):
+    """DG1 field of a thermal property (eg. the thermal conductivity)
+
+    Args:
+        materials (festim.Materials): the materials
+        vm (fenics.MeshFunction): the volume markers
+        T (fenics.Function, fenics.Constant, fenics.Expression): the
+            temperature
+        key (str): the name of the property attribute of the materials
+            (eg. "thermal_cond")
+    """
 
-class ThermalProp(f.UserExpression):
-    def __init__(self, materials, vm, T, key, **kwargs):
-        super().__init__(kwargs)
-        self._T = T
-        self._vm = vm
-        self._materials = materials
+    def __init__(self, materials, vm, T, key):
         self._key = key
+        super().__init__(materials, vm, T)
 
-    def eval_cell(self, value, x, ufc_cell):
-        cell = f.Cell(self._vm.mesh(), ufc_cell.index)
-        subdomain_id = self._vm[cell]
-        material = self._materials.find_material_from_id(subdomain_id)
+    def material_values(self, material, T):
         attribute = getattr(material, self._key)
-        if callable(attribute):
-            value[0] = attribute(self._T(x))
-        else:
-            value[0] = attribute
-
-    def value_shape(self):
-        return ()
+        if attribute is None:
+            return np.nan
+        if not callable(attribute):
+            return attribute
+        try:
+            return np.asarray(attribute(T), dtype=float)
+        except NOT_VECTORISED_ERRORS:
+            # the property isn't vectorised (eg. it uses ufl functions)
+            return np.array([float(attribute(T_i)) for T_i in T])
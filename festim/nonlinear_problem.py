@@ -1,4 +1,6 @@
 import fenics as f
+import numpy as np
+import ufl
 
 
 class Problem(f.NonlinearProblem):
@@ -11,12 +13,38 @@ class Problem(f.NonlinearProblem):
         J (ufl.Form): the Jacobian form of the variational problem
         F (ufl.Form): the form of the variational problem
         bcs (list): list of fenics.DirichletBC
+        lagged_jacobian (bool, optional): if True, the assembled Jacobian
+            (and therefore its factorization or preconditioner) is reused
+            between Newton iterations and between solves. It is only
+            reassembled when the residual contraction rate exceeds
+            max_contraction_rate or when jacobian_outdated is set to True.
+            Defaults to False.
+        max_contraction_rate (float, optional): maximum ratio between two
+            consecutive residual norms above which the Jacobian is
+            reassembled. Only used if lagged_jacobian is True. Defaults to
+            0.5.
+
+    Attributes:
+        residual_norms (list): the l2 norms of the residuals of the
+            nonlinear iterations since the last call to
+            reset_residual_norms()
+        record_residual_norms (bool): if True, the norm of every assembled
+            residual is appended to residual_norms. Set to False when the
+            nonlinear solver assembles residuals that aren't iterates (eg.
+            line search trials) and records the norms itself
+        jacobian_outdated (bool): if True, the Jacobian will be reassembled
+            at the next call of J()
     """
 
-    def __init__(self, J, F, bcs):
+    def __init__(self, J, F, bcs, lagged_jacobian=False, max_contraction_rate=0.5):
         self.jacobian_form = J
         self.residual_form = F
         self.bcs = bcs
+        self.lagged_jacobian = lagged_jacobian
+        self.max_contraction_rate = max_contraction_rate
+        self.residual_norms = []
+        self.record_residual_norms = True
+        self.jacobian_outdated = True
         self.assembler = f.SystemAssembler(
             self.jacobian_form, self.residual_form, self.bcs
         )
@@ -25,7 +53,178 @@ class Problem(f.NonlinearProblem):
     def F(self, b, x):
         """Assembles the RHS in Ax=b and applies the boundary conditions"""
         self.assembler.assemble(b, x)
+        if self.lagged_jacobian and self.record_residual_norms:
+            self.residual_norms.append(b.norm("l2"))
 
     def J(self, A, x):
         """Assembles the LHS in Ax=b and applies the boundary conditions"""
+        if self.lagged_jacobian and not A.empty() and not self.jacobian_outdated:
+            if not self.contraction_is_too_slow():
+                # leaving A untouched lets PETSc reuse its factorization
+                return
         self.assembler.assemble(A)
+        self.jacobian_outdated = False
+
+    def contraction_is_too_slow(self):
+        """Checks the contraction rate of the last two residuals
+
+        Returns:
+            bool: True if the last residual norm divided by the previous one
+                is above max_contraction_rate, else False
+        """
+        if len(self.residual_norms) < 2 or self.residual_norms[-2] == 0:
+            return False
+        rate = self.residual_norms[-1] / self.residual_norms[-2]
+        return rate > self.max_contraction_rate
+
+    def reset_residual_norms(self):
+        """Empties the history of residual norms, to be called before a new
+        nonlinear solve"""
+        self.residual_norms = []
+
+
+class SplitProblem(Problem):
+    """
+    Nonlinear problem whose form is split into a part linear in the
+    solution u and a nonlinear part:
+    F(u, v) = a(u, v) - L(v) + F_nonlinear(u, v)
+    The matrix of a is assembled once and cached. At each Newton iteration,
+    only L and F_nonlinear (and the Jacobian of F_nonlinear) are assembled
+    and the cached matrix is added. The matrix is reassembled when the
+    coefficients of a (stepsize, temperature, fenics.Constant...) have
+    changed since its assembly, which is checked by
+    check_linear_operator().
+
+    Args:
+        u (fenics.Function): the solution
+        F_linear (ufl.Form): the part of the form linear in u
+        F_nonlinear (ufl.Form or int): the rest of the form (0 if empty)
+        bcs (list): list of fenics.DirichletBC
+        lagged_jacobian (bool, optional): see festim.Problem. Defaults to
+            False.
+        max_contraction_rate (float, optional): see festim.Problem.
+            Defaults to 0.5.
+
+    Attributes:
+        linear_operator (fenics.PETScMatrix): the cached matrix of a
+        linear_operator_outdated (bool): if True, the matrix of a will be
+            reassembled at the next assembly
+        nb_linear_assemblies (int): the number of assemblies of the matrix
+            of a
+    """
+
+    def __init__(
+        self,
+        u,
+        F_linear,
+        F_nonlinear,
+        bcs,
+        lagged_jacobian=False,
+        max_contraction_rate=0.5,
+    ):
+        du = f.TrialFunction(u.function_space())
+        F_linear = ufl.replace(F_linear, {u: du})
+        self.linear_form = ufl.lhs(F_linear)
+        # the residual of the other terms, assembled at each iteration
+        self.residual_form = -ufl.rhs(F_linear)
+        self.jacobian_form = None
+        if not isinstance(F_nonlinear, int):
+            self.residual_form += F_nonlinear
+            self.jacobian_form = f.derivative(F_nonlinear, u, du)
+        self.bcs = bcs
+        self.lagged_jacobian = lagged_jacobian
+        self.max_contraction_rate = max_contraction_rate
+        self.residual_norms = []
+        self.record_residual_norms = True
+        self.jacobian_outdated = True
+
+        self.linear_operator = f.PETScMatrix()
+        self.linear_operator_outdated = True
+        self.nb_linear_assemblies = 0
+        self._linear_product = f.PETScVector()
+
+        # the cached matrix depends on the values of these coefficients
+        self._coefficients = self.linear_form.coefficients()
+        self._always_outdated = not all(
+            isinstance(c, (f.Constant, f.Function)) for c in self._coefficients
+        )
+        self._coefficients_values = None
+        f.NonlinearProblem.__init__(self)
+
+    def coefficients_values(self):
+        """Returns the current values of the coefficients of a
+
+        Returns:
+            list: the values (numpy.ndarray) of each coefficient
+        """
+        values = []
+        for coefficient in self._coefficients:
+            if isinstance(coefficient, f.Function):
+                values.append(coefficient.vector().get_local())
+            else:
+                values.append(coefficient.values())
+        return values
+
+    def check_linear_operator(self):
+        """Marks the cached matrix as outdated if the coefficients of a
+        have changed since its assembly. To be called before each solve.
+        """
+        if self._always_outdated:
+            self.linear_operator_outdated = True
+            return
+        values = self.coefficients_values()
+        changed = self._coefficients_values is None or any(
+            not np.array_equal(old, new)
+            for old, new in zip(self._coefficients_values, values)
+        )
+        # all the processes must agree
+        if f.MPI.max(f.MPI.comm_world, float(changed)) > 0:
+            self.linear_operator_outdated = True
+            self.jacobian_outdated = True
+        self._coefficients_values = values
+
+    def assemble_linear_operator(self):
+        """Assembles the matrix of a if it is outdated"""
+        if self.linear_operator_outdated:
+            f.assemble(self.linear_form, tensor=self.linear_operator)
+            self.linear_operator.init_vector(self._linear_product, 0)
+            self.linear_operator_outdated = False
+            self.nb_linear_assemblies += 1
+
+    def F(self, b, x):
+        """Assembles the RHS in Ax=b and applies the boundary conditions"""
+        self.assemble_linear_operator()
+        if self.residual_form.empty():
+            if b.empty():
+                self.linear_operator.init_vector(b, 0)
+            b.zero()
+        else:
+            f.assemble(self.residual_form, tensor=b)
+        self.linear_operator.mult(x, self._linear_product)
+        b.axpy(1.0, self._linear_product)
+        for bc in self.bcs:
+            bc.apply(b, x)
+        if self.lagged_jacobian and self.record_residual_norms:
+            self.residual_norms.append(b.norm("l2"))
+
+    def J(self, A, x):
+        """Assembles the LHS in Ax=b and applies the boundary conditions"""
+        if self.lagged_jacobian and not A.empty() and not self.jacobian_outdated:
+            if not self.contraction_is_too_slow():
+                # leaving A untouched lets PETSc reuse its factorization
+                return
+        self.assemble_linear_operator()
+        if self.jacobian_form is not None:
+            f.assemble(self.jacobian_form, tensor=A)
+            # the nonzero pattern of the Jacobian of F_nonlinear is not the
+            # one of the linear operator (eg. terms restricted to some
+            # subdomains or components)
+            A.axpy(1.0, self.linear_operator, False)
+        elif A.empty():
+            f.assemble(self.linear_form, tensor=A)
+        else:
+            A.zero()
+            A.axpy(1.0, self.linear_operator, False)
+        for bc in self.bcs:
+            bc.apply(A)
+        self.jacobian_outdated = False
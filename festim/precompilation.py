@@ -0,0 +1,237 @@
+import festim
+import fenics as f
+import argparse
+import runpy
+import time
+
+
+class JITRecorder:
+    """Context manager recording the time spent in each call to the form
+    (FFC) and Expression JIT compilers of dolfin
+
+    Attributes:
+        records (list): list of (kind, compiled object, context, duration)
+            tuples, kind being "form" or "expression"
+        context (str): label attached to the calls made while it is set
+    """
+
+    def __init__(self):
+        self.records = []
+        self.context = None
+        self._patched = []
+
+    def __enter__(self):
+        # dolfin modules holding a reference to the JIT compilers
+        import dolfin.fem.form
+        import dolfin.function.jit
+
+        self._wrap(dolfin.fem.form, "ffc_jit", "form")
+        self._wrap(dolfin.function.jit, "compile_expression", "expression")
+        return self
+
+    def __exit__(self, *args):
+        for module, name, original in self._patched:
+            setattr(module, name, original)
+        self._patched = []
+
+    def _wrap(self, module, name, kind):
+        original = getattr(module, name, None)
+        if original is None:
+            return
+
+        def timed(obj, *args, **kwargs):
+            start = time.perf_counter()
+            result = original(obj, *args, **kwargs)
+            duration = time.perf_counter() - start
+            self.records.append((kind, obj, self.context, duration))
+            return result
+
+        setattr(module, name, timed)
+        self._patched.append((module, name, original))
+
+
+def runtime_forms(simulation):
+    """Returns the forms of an initialised simulation that are only
+    compiled during the time stepping or the post processing
+
+    Args:
+        simulation (festim.Simulation): the initialised simulation
+
+    Returns:
+        dict: the forms (ufl.Form) mapped to their labels
+    """
+    forms = {}
+    h_transport_problem = simulation.h_transport_problem
+    problem = h_transport_problem.problem
+    if isinstance(problem, festim.SplitProblem):
+        forms["H transport linear operator"] = problem.linear_form
+        if not problem.residual_form.empty():
+            forms["H transport residual"] = problem.residual_form
+        if problem.jacobian_form is not None:
+            forms["H transport Jacobian"] = problem.jacobian_form
+    else:
+        forms["H transport residual"] = h_transport_problem.F
+        forms["H transport Jacobian"] = h_transport_problem.J
+
+    if isinstance(simulation.T, festim.HeatTransferProblem):
+        T = simulation.T
+        if T.is_linear():
+            forms["heat transfer operator"] = T.problem.linear_form
+            if not T.problem.residual_form.empty():
+                forms["heat transfer residual"] = T.problem.residual_form
+        else:
+            forms["heat transfer residual"] = T.F
+            forms["heat transfer Jacobian"] = T.J
+
+    for trap in simulation.traps:
+        if isinstance(trap, festim.ExtrinsicTrapBase) and simulation.settings.transient:
+            density = trap.density[0]
+            forms[f"trap {trap.id} density residual"] = trap.form_density
+            forms[f"trap {trap.id} density Jacobian"] = f.derivative(
+                trap.form_density, density, f.TrialFunction(density.function_space())
+            )
+
+    if simulation.settings.chemical_pot:
+        form = simulation.mobile.form_post_processing
+        forms["theta to concentration (lhs)"] = f.lhs(form)
+        forms["theta to concentration (rhs)"] = f.rhs(form)
+
+    return forms
+
+
+def precompile(simulation, verbose=True):
+    """Initialises a simulation and JIT compiles every form and expression
+    it needs (H transport, heat transfer, extrinsic traps, post processing
+    and derived quantities) so that the JIT cache is warm when the
+    simulation is run.
+
+    Args:
+        simulation (festim.Simulation): the simulation
+        verbose (bool, optional): if True, the compile time breakdown is
+            printed. Defaults to True.
+
+    Returns:
+        list: (label, compile time in s) tuples sorted by decreasing
+            compile time
+    """
+    start = time.perf_counter()
+    with JITRecorder() as recorder:
+        recorder.context = "initialise"
+        simulation.initialise()
+
+        forms = runtime_forms(simulation)
+        for label, form in forms.items():
+            recorder.context = label
+            f.Form(form)
+
+        recorder.context = "post processing"
+        simulation.update_post_processing_solutions()
+        for export in simulation.exports:
+            if isinstance(export, festim.DerivedQuantities):
+                compile_derived_quantities(
+                    export, simulation.label_to_function, recorder
+                )
+    total = time.perf_counter() - start
+
+    # forms compiled in initialise are identified by their signature
+    labels = {form.signature(): label for label, form in forms.items()}
+    timings = []
+    for kind, obj, context, duration in recorder.records:
+        if kind == "expression":
+            label = f"Expression {obj}"
+        elif obj.signature() in labels:
+            label = labels[obj.signature()]
+        else:
+            label = f"{context} form"
+        timings.append((label, duration))
+    timings.sort(key=lambda timing: timing[1], reverse=True)
+
+    if verbose:
+        print("Compile time breakdown:")
+        for label, duration in timings:
+            print("{:10.2f} s    {}".format(duration, label))
+        print("{:10.2f} s    total (including initialisation)".format(total))
+    return timings
+
+
+def compile_derived_quantities(derived_quantities, label_to_function, recorder):
+    """Computes once every derived quantity relying on a form so that the
+    forms are compiled. The computed values are not stored.
+
+    Args:
+        derived_quantities (festim.DerivedQuantities): the derived quantities
+        label_to_function (dict): the fields mapped to their post processing
+            solution
+        recorder (JITRecorder): the recorder
+    """
+    no_form_quantities = (
+        festim.MaximumVolume,
+        festim.MinimumVolume,
+        festim.MaximumSurface,
+        festim.MinimumSurface,
+        festim.PointValue,
+    )
+    for quantity in derived_quantities:
+        if isinstance(quantity, no_form_quantities):
+            continue
+        if isinstance(quantity, festim.AdsorbedHydrogen):
+            for surf_funcs in label_to_function[quantity.field]:
+                if quantity.surface in surf_funcs["surfaces"]:
+                    ind = surf_funcs["surfaces"].index(quantity.surface)
+                    quantity.function = surf_funcs["post_processing_solutions"][ind]
+        else:
+            quantity.function = label_to_function[quantity.field]
+        recorder.context = quantity.title
+        quantity.compute()
+
+
+def main(args=None):
+    """Command line entry point: precompiles all the festim.Simulation
+    objects defined in a python script.
+    Code protected by ``if __name__ == "__main__":`` in the script is not
+    executed.
+
+    Args:
+        args (list, optional): the command line arguments. Defaults to None
+            (read from sys.argv).
+    """
+    parser = argparse.ArgumentParser(
+        prog="festim-precompile",
+        description="Fills the JIT cache with the forms and expressions of "
+        "the festim.Simulation objects defined in a script",
+    )
+    parser.add_argument(
+        "script", help="python script defining one or several festim.Simulation"
+    )
+    parser.add_argument(
+        "--name",
+        default=None,
+        help="name of the festim.Simulation to precompile. By default all "
+        "the simulations of the script are precompiled",
+    )
+    args = parser.parse_args(args)
+
+    namespace = runpy.run_path(args.script, run_name="festim_precompile")
+    simulations = {
+        name: value
+        for name, value in namespace.items()
+        if isinstance(value, festim.Simulation)
+    }
+    if args.name is not None:
+        if args.name not in simulations:
+            raise ValueError(
+                "Couldn't find festim.Simulation {} in {}".format(
+                    args.name, args.script
+                )
+            )
+        simulations = {args.name: simulations[args.name]}
+    if not simulations:
+        raise ValueError("No festim.Simulation found in {}".format(args.script))
+
+    for name, simulation in simulations.items():
+        print("Precompiling {}".format(name))
+        precompile(simulation)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+import festim
+import fenics as f
+import numpy as np
+import copy
+
+
+class ReducedOrderModel:
+    """POD-Galerkin reduced order model of a 1D transient H transport
+    simulation, with DEIM hyper-reduction of the trapping nonlinearity.
+
+    The snapshots of the mobile and trap concentrations are collected
+    during a full run (collect_snapshots()), a POD basis is built for each
+    field and a DEIM basis for the trapping rate of each trap (build()).
+    The reduced model (run()) is integrated with the backward Euler scheme
+    with lumped mass and nodal trapping rates: Arrhenius rates are
+    evaluated at the DEIM nodes only, the diffusion operator is projected
+    cell-wise. The derived quantities of the simulation are computed on the
+    reconstructed fields and compared with the full model with
+    compute_errors().
+
+    The trap properties and the temperature are read at each call of
+    run(), so the reduced model can be evaluated for modified trap
+    properties (eg. when fitting a TDS spectrum). The accuracy has to be
+    checked with compute_errors() after a new full run.
+
+    Only serial, cartesian 1D simulations with traps solved as fields, no
+    volumetric sources, time independent DirichletBC on the mobile
+    concentration and a temperature that isn't a HeatTransferProblem are
+    supported.
+
+    Args:
+        simulation (festim.Simulation): the initialised transient
+            simulation (not yet run)
+
+    Attributes:
+        times (list): the times of the snapshots (s)
+        snapshots (list): for each field (mobile then traps), the list of
+            nodal values at each snapshot time
+        temperatures (list): the nodal values of the temperature at each
+            snapshot time
+        bases (list): the POD basis of each field (numpy.ndarray)
+        deim_bases (list): the DEIM basis of the trapping rate of each trap
+        deim_indices (list): the DEIM interpolation nodes of each trap
+        lift (numpy.ndarray): the nodal values of the DirichletBC of the
+            mobile concentration (zero elsewhere)
+        lift_dofs (numpy.ndarray): the degrees of freedom of the
+            DirichletBC, where the modes of the mobile concentration are
+            zero
+        derived_quantities (dict): the derived quantities computed by the
+            last call of run(), mapped to their title, and the times "t"
+        fields (list): the fields (fenics.Function) reconstructed at the
+            last time of run(), mobile then traps
+
+    Example::
+
+        my_model.initialise()
+        rom = F.ReducedOrderModel(my_model)
+        rom.collect_snapshots()
+        rom.build(tolerance=1e-6)
+        results = rom.run()
+        errors = rom.compute_errors()
+    """
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.check_simulation()
+        self.h_transport_problem = simulation.h_transport_problem
+        # the nodal properties are created on copies of the traps so that
+        # the simulation is left untouched
+        self.traps = [copy.copy(trap) for trap in simulation.traps]
+        self.V = self.h_transport_problem.V_CG1
+        self._interpolated = f.Function(self.V)
+
+        self.times = []
+        self.snapshots = [[] for _ in range(len(self.traps) + 1)]
+        self.temperatures = []
+        self.bases = None
+        self.deim_bases = None
+        self.deim_indices = None
+        self.derived_quantities = None
+        self.fields = None
+
+        self.create_lumped_mass()
+        self.create_cells_properties()
+        self.create_lift()
+        for trap in self.traps:
+            trap.sub_expressions = []
+            trap.create_nodal_properties(self.V, simulation.mesh.volume_markers)
+
+    def check_simulation(self):
+        """Checks that the simulation can be reduced
+
+        Raises:
+            NotImplementedError: if the simulation is not supported
+        """
+        simulation = self.simulation
+        settings = simulation.settings
+        if f.MPI.size(f.MPI.comm_world) > 1:
+            raise NotImplementedError("Reduced order models are only serial")
+        if not settings.transient:
+            raise NotImplementedError(
+                "Reduced order models need a transient simulation"
+            )
+        if not isinstance(simulation.mesh, festim.Mesh1D):
+            raise NotImplementedError("Reduced order models are only available in 1D")
+        if simulation.mesh.type != "cartesian":
+            raise NotImplementedError(
+                "Reduced order models are only available in cartesian coordinates"
+            )
+        if settings.chemical_pot or settings.soret:
+            raise NotImplementedError(
+                "Reduced order models are not implemented with chemical_pot or soret"
+            )
+        if settings.condense_traps or settings.operator_splitting is not None:
+            raise NotImplementedError(
+                "Reduced order models need the traps to be solved as fields"
+            )
+        if len(simulation.sources) > 0:
+            raise NotImplementedError(
+                "Reduced order models are not implemented with sources"
+            )
+        if isinstance(simulation.T, festim.HeatTransferProblem):
+            raise NotImplementedError(
+                "Reduced order models are not implemented with HeatTransferProblem"
+            )
+        for trap in simulation.traps:
+            if isinstance(trap, festim.ExtrinsicTrapBase):
+                raise NotImplementedError(
+                    "Reduced order models are not implemented with extrinsic traps"
+                )
+            if trap.sources:
+                raise NotImplementedError(
+                    "Reduced order models are not implemented with trap sources"
+                )
+        for bc in simulation.boundary_conditions:
+            if bc.field == "T":
+                continue
+            if type(bc) is not festim.DirichletBC or bc.field not in [0, "0", "solute"]:
+                raise NotImplementedError(
+                    "Reduced order models only support DirichletBC on the mobile concentration"
+                )
+            if festim.t in getattr(bc.value, "free_symbols", []):
+                raise NotImplementedError(
+                    "Reduced order models only support time independent DirichletBC"
+                )
+
+    def create_lumped_mass(self):
+        """Computes the lumped mass (integral of the test functions)"""
+        v = f.TestFunction(self.V)
+        self.lumped_mass = f.assemble(v * f.dx(domain=self.V.mesh())).get_local()
+
+    def create_cells_properties(self):
+        """Stores the dofs, size and diffusion coefficient properties of each
+        cell"""
+        mesh = self.V.mesh()
+        dofmap = self.V.dofmap()
+        self.cell_dofs = np.array(
+            [dofmap.cell_dofs(cell) for cell in range(mesh.num_cells())]
+        )
+        self.cell_sizes = np.array([cell.volume() for cell in f.cells(mesh)])
+        self.cell_D_0 = np.zeros(mesh.num_cells())
+        self.cell_E_D = np.zeros(mesh.num_cells())
+        markers = self.simulation.mesh.volume_markers.array()
+        for material in self.simulation.materials:
+            ids = material.id if isinstance(material.id, list) else [material.id]
+            cells = np.isin(markers, ids)
+            self.cell_D_0[cells] = float(material.D_0)
+            self.cell_E_D[cells] = float(material.E_D)
+
+    def create_lift(self):
+        """Creates the nodal values of the Dirichlet boundary conditions of
+        the mobile concentration (zero elsewhere)"""
+        self.lift = np.zeros(self.V.dim())
+        dofs = set()
+        for bc in self.simulation.boundary_conditions:
+            if bc.field == "T":
+                continue
+            for surf in bc.surfaces:
+                dirichlet_bc = f.DirichletBC(
+                    self.V, bc.expression, self.simulation.mesh.surface_markers, surf
+                )
+                for dof, value in dirichlet_bc.get_boundary_values().items():
+                    self.lift[dof] = value
+                    dofs.add(dof)
+        self.lift_dofs = np.array(sorted(dofs), dtype=int)
+
+    def nodal_fields(self, u):
+        """Returns the nodal values of the mobile and trap concentrations
+
+        Args:
+            u (fenics.Function): the function holding the concentrations
+
+        Returns:
+            list: the nodal values (numpy.ndarray) of each field
+        """
+        if u.function_space().num_sub_spaces() == 0:
+            functions = [u]
+        else:
+            functions = u.split()[: len(self.traps) + 1]
+        values = []
+        for function in functions:
+            self._interpolated.interpolate(function)
+            values.append(self._interpolated.vector().get_local().copy())
+        return values
+
+    def record(self, u):
+        """Stores the current fields and temperature as a snapshot
+
+        Args:
+            u (fenics.Function): the function holding the concentrations
+        """
+        self.times.append(self.simulation.t)
+        for snapshots, values in zip(self.snapshots, self.nodal_fields(u)):
+            snapshots.append(values)
+        self.temperatures.append(self.simulation.T.T.vector().get_local().copy())
+
+    def collect_snapshots(self):
+        """Runs the full model and stores a snapshot of the initial state
+        and of every time step"""
+        simulation = self.simulation
+        simulation.exports.final_time = simulation.settings.final_time
+        # the timer is started by Simulation.run() and read by iterate()
+        simulation.timer = f.Timer()
+        self.record(self.h_transport_problem.u_n)
+        while simulation.t < simulation.settings.final_time and not np.isclose(
+            simulation.t, simulation.settings.final_time, atol=0
+        ):
+            simulation.iterate()
+            self.record(self.h_transport_problem.u)
+        simulation.timer.stop()
+
+    def trapping_rate(self, trap, c_m, c_t, T_values, t):
+        """Computes the nodal trapping rate k c_m (n - c_t) - p c_t
+
+        Returns:
+            numpy.ndarray: the trapping rate
+        """
+        festim.update_expressions(trap.sub_expressions, t)
+        k, p, n = trap.nodal_rates(T_values)
+        return k * c_m * (n - c_t) - p * c_t
+
+    def build(self, tolerance=1e-8, max_rank=None, deim_tolerance=None):
+        """Builds the POD bases of the fields and the DEIM bases of the
+        trapping rates from the snapshots and projects the operators.
+        The modes of the mobile concentration are computed from the
+        snapshots minus the lift, with zero rows at the DirichletBC degrees
+        of freedom (the initial snapshot may not satisfy the boundary
+        conditions) so that the reduced solution satisfies them exactly.
+
+        Args:
+            tolerance (float, optional): relative energy (singular values)
+                neglected in the POD bases. Defaults to 1e-8.
+            max_rank (int, optional): maximum number of modes of each basis.
+                Defaults to None.
+            deim_tolerance (float, optional): relative energy neglected in
+                the DEIM bases. Defaults to None (same as tolerance).
+        """
+        if deim_tolerance is None:
+            deim_tolerance = tolerance
+
+        self.bases = []
+        for i, snapshots in enumerate(self.snapshots):
+            matrix = np.array(snapshots).T
+            if i == 0:
+                matrix = matrix - self.lift[:, None]
+                matrix[self.lift_dofs] = 0
+            self.bases.append(pod_basis(matrix, tolerance, max_rank))
+
+        self.deim_bases, self.deim_indices = [], []
+        c_m_snapshots = self.snapshots[0]
+        for trap, c_t_snapshots in zip(self.traps, self.snapshots[1:]):
+            rates = [
+                self.trapping_rate(trap, c_m, c_t, T_values, t)
+                for c_m, c_t, T_values, t in zip(
+                    c_m_snapshots, c_t_snapshots, self.temperatures, self.times
+                )
+            ]
+            basis = pod_basis(np.array(rates).T, deim_tolerance, max_rank)
+            self.deim_bases.append(basis)
+            self.deim_indices.append(deim_indices(basis))
+
+        self.project_operators()
+
+    def project_operators(self):
+        """Computes the reduced operators independent of the temperature"""
+        w = self.lumped_mass
+        V_m = self.bases[0]
+        self.mass_operators = [V.T @ (w[:, None] * V) for V in self.bases]
+        self.coupling_operators = [V_m.T @ (w[:, None] * V) for V in self.bases[1:]]
+        self.gradient_basis = V_m[self.cell_dofs[:, 0]] - V_m[self.cell_dofs[:, 1]]
+        self.gradient_lift = (
+            self.lift[self.cell_dofs[:, 0]] - self.lift[self.cell_dofs[:, 1]]
+        )
+        self.deim_operators = []
+        for V, Phi, indices in zip(self.bases[1:], self.deim_bases, self.deim_indices):
+            self.deim_operators.append(
+                V.T @ (w[:, None] * Phi) @ np.linalg.inv(Phi[indices])
+            )
+
+    def run(self, times=None, tolerance=1e-10, maximum_iterations=30):
+        """Integrates the reduced model and computes the derived quantities
+        of the simulation at each time
+
+        Args:
+            times (list, optional): the times (s), starting with the
+                initial time. Defaults to None (snapshot times).
+            tolerance (float, optional): relative tolerance of the Newton
+                solver. Defaults to 1e-10.
+            maximum_iterations (int, optional): maximum number of Newton
+                iterations. Defaults to 30.
+
+        Raises:
+            ValueError: if the Newton solver doesn't converge
+
+        Returns:
+            dict: the derived quantities mapped to their title, and the
+                times "t"
+        """
+        if times is None:
+            times = self.times
+        sizes = [V.shape[1] for V in self.bases]
+        offsets = np.cumsum([0] + sizes)
+        blocks = [slice(offsets[i], offsets[i + 1]) for i in range(len(sizes))]
+
+        initial_fields = [snapshots[0] for snapshots in self.snapshots]
+        initial_fields[0] = initial_fields[0] - self.lift
+        x = np.concatenate([V.T @ c for V, c in zip(self.bases, initial_fields)])
+
+        self.derived_quantities = {"t": []}
+        T = self.simulation.T
+        for t_n, t in zip(times[:-1], times[1:]):
+            dt = t - t_n
+            T.update(t)
+            self.simulation.materials.update_properties()
+            T_values = T.T.vector().get_local()
+            T_cells = T_values[self.cell_dofs].mean(axis=1)
+            D = self.cell_D_0 * np.exp(-self.cell_E_D / festim.k_B / T_cells)
+            d = D / self.cell_sizes
+            stiffness = self.gradient_basis.T @ (d[:, None] * self.gradient_basis)
+            stiffness_lift = self.gradient_basis.T @ (d * self.gradient_lift)
+
+            nodal_rates = []
+            for trap, indices in zip(self.traps, self.deim_indices):
+                festim.update_expressions(trap.sub_expressions, t)
+                rates = trap.nodal_rates(T_values)
+                nodal_rates.append([rate[indices] for rate in rates])
+
+            x_n = x.copy()
+            for _ in range(maximum_iterations):
+                residual, jacobian = self.residual_and_jacobian(
+                    x, x_n, dt, stiffness, stiffness_lift, nodal_rates, blocks
+                )
+                dx = np.linalg.solve(jacobian, -residual)
+                x = x + dx
+                if np.linalg.norm(dx) <= tolerance * max(np.linalg.norm(x), 1e-30):
+                    break
+            else:
+                raise ValueError(
+                    "The reduced order model diverged at t = {:.2e} s".format(t)
+                )
+            self.compute_derived_quantities(x, blocks, t)
+        return self.derived_quantities
+
+    def residual_and_jacobian(
+        self, x, x_n, dt, stiffness, stiffness_lift, nodal_rates, blocks
+    ):
+        """Computes the residual and jacobian of the reduced backward Euler
+        step
+
+        Returns:
+            numpy.ndarray, numpy.ndarray: the residual and the jacobian
+        """
+        V_m = self.bases[0]
+        q_m, q_m_n = x[blocks[0]], x_n[blocks[0]]
+        residual = np.zeros_like(x)
+        jacobian = np.zeros((x.size, x.size))
+
+        residual[blocks[0]] = (
+            self.mass_operators[0] @ (q_m - q_m_n) / dt
+            + stiffness @ q_m
+            + stiffness_lift
+        )
+        jacobian[blocks[0], blocks[0]] = self.mass_operators[0] / dt + stiffness
+
+        for i, V_t in enumerate(self.bases[1:]):
+            block = blocks[i + 1]
+            q_t, q_t_n = x[block], x_n[block]
+            indices = self.deim_indices[i]
+            k, p, n = nodal_rates[i]
+            c_m = V_m[indices] @ q_m + self.lift[indices]
+            c_t = V_t[indices] @ q_t
+            rate = k * c_m * (n - c_t) - p * c_t
+
+            residual[blocks[0]] += self.coupling_operators[i] @ (q_t - q_t_n) / dt
+            jacobian[blocks[0], block] = self.coupling_operators[i] / dt
+
+            E = self.deim_operators[i]
+            residual[block] = self.mass_operators[i + 1] @ (q_t - q_t_n) / dt - E @ rate
+            jacobian[block, blocks[0]] = -E @ ((k * (n - c_t))[:, None] * V_m[indices])
+            jacobian[block, block] = self.mass_operators[i + 1] / dt - E @ (
+                (-k * c_m - p)[:, None] * V_t[indices]
+            )
+        return residual, jacobian
+
+    def compute_derived_quantities(self, x, blocks, t):
+        """Reconstructs the fields and computes the derived quantities of the
+        simulation. The functions of the derived quantities are restored
+        afterwards.
+
+        Args:
+            x (numpy.ndarray): the reduced coefficients
+            blocks (list): the slices of the coefficients of each field
+            t (float): the time (s)
+        """
+        if self.fields is None:
+            self.fields = [f.Function(self.V) for _ in self.bases]
+        for i, (V, function) in enumerate(zip(self.bases, self.fields)):
+            values = V @ x[blocks[i]]
+            if i == 0:
+                values = values + self.lift
+            function.vector().set_local(values)
+            function.vector().apply("insert")
+
+        mobile = self.fields[0]
+        label_to_function = {
+            "solute": mobile,
+            "0": mobile,
+            0: mobile,
+            "T": self.simulation.T.T,
+            "retention": sum(self.fields),
+        }
+        for trap, function in zip(self.traps, self.fields[1:]):
+            label_to_function[trap.id] = function
+            label_to_function[str(trap.id)] = function
+
+        self.derived_quantities["t"].append(t)
+        for export in self.simulation.exports:
+            if isinstance(export, festim.DerivedQuantities):
+                for quantity in export:
+                    function = quantity.function
+                    quantity.function = label_to_function[quantity.field]
+                    try:
+                        if isinstance(
+                            quantity, (festim.MaximumVolume, festim.MinimumVolume)
+                        ):
+                            value = quantity.compute(export.volume_markers)
+                        else:
+                            value = quantity.compute()
+                    finally:
+                        quantity.function = function
+                    self.derived_quantities.setdefault(quantity.title, []).append(value)
+
+    def compute_errors(self):
+        """Compares the derived quantities of the last reduced run with the
+        ones of the full model
+
+        Returns:
+            dict: the maximum error relative to the maximum absolute value
+                of the full model, for each derived quantity title
+        """
+        errors = {}
+        for export in self.simulation.exports:
+            if isinstance(export, festim.DerivedQuantities):
+                for quantity in export:
+                    reference = np.array(quantity.data)
+                    reduced = np.interp(
+                        quantity.t,
+                        self.derived_quantities["t"],
+                        self.derived_quantities[quantity.title],
+                    )
+                    scale = np.max(np.abs(reference))
+                    error = np.max(np.abs(reduced - reference))
+                    errors[quantity.title] = error / scale if scale > 0 else error
+        return errors
+
+
+def pod_basis(matrix, tolerance, max_rank=None):
+    """Computes the POD basis of a snapshot matrix
+
+    Args:
+        matrix (numpy.ndarray): the snapshots (one per column)
+        tolerance (float): relative energy (sum of the squared singular
+            values) neglected
+        max_rank (int, optional): maximum number of modes. Defaults to None.
+
+    Returns:
+        numpy.ndarray: the orthonormal modes (one per column)
+    """
+    U, s, _ = np.linalg.svd(matrix, full_matrices=False)
+    energy = np.cumsum(s**2)
+    if energy[-1] == 0:
+        rank = 1
+    else:
+        rank = int(np.searchsorted(energy / energy[-1], 1 - tolerance)) + 1
+    if max_rank is not None:
+        rank = min(rank, max_rank)
+    return U[:, : min(rank, U.shape[1])]
+
+
+def deim_indices(basis):
+    """Selects the DEIM interpolation indices of a basis with the greedy
+    algorithm
+
+    Args:
+        basis (numpy.ndarray): the basis (one mode per column)
+
+    Returns:
+        numpy.ndarray: the indices
+    """
+    indices = [int(np.argmax(np.abs(basis[:, 0])))]
+    for l in range(1, basis.shape[1]):
+        coefficients = np.linalg.solve(basis[indices, :l], basis[indices, l])
+        residual = basis[:, l] - basis[:, :l] @ coefficients
+        indices.append(int(np.argmax(np.abs(residual))))
+    return np.array(indices)
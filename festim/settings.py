@@ -1,3 +1,6 @@
+import warnings
+
+
 class Settings:
     """
     Args:
@@ -17,17 +20,79 @@ class Settings:
             Defaults to False.
         traps_element_type (str, optional): Finite element used for traps.
             If traps densities are discontinuous (eg. different materials)
-            "DG" is recommended. Defaults to "CG".
-        update_jacobian (bool, optional): If set to False, the Jacobian of
-            the formulation will be computed only once at the beggining.
-            Else it will be computed at each time step. Defaults to True.
+            "DG" is recommended. Only "CG" is available with condense_traps
+            and operator_splitting. Defaults to "CG".
+        condense_traps (bool, optional): If set to True, the trap
+            concentrations are eliminated locally from the H transport
+            problem (only the mobile concentration is solved for) and
+            recovered pointwise after each solve. Traps cannot have sources
+            or DirichletBC. Defaults to False.
+        operator_splitting (str, optional): If set to "lie" or "strang",
+            the transient H transport problem is split: the diffusion of
+            mobile particles is solved implicitly and the trapping kinetics
+            are integrated pointwise at the nodes after ("lie", first order)
+            or on both sides ("strang", second order) of the diffusion step.
+            Combined with lagged_jacobian, the factorization of the
+            diffusion operator is reused. Traps cannot have sources.
+            Defaults to None.
+        newton_predictor (str, optional): If set to "linear" or
+            "quadratic", the initial guess of each time step (including
+            retries after a rejection) is extrapolated in time from the two
+            or three last accepted solutions. Not used with
+            operator_splitting. Defaults to None.
+        pseudo_transient_continuation (bool, optional): If set to True, the
+            steady state problem is solved with pseudo-transient
+            continuation: pseudo time steps with a growing stepsize are
+            solved before switching to the Newton solver near convergence.
+            Only for steady state simulations. Defaults to False.
+        pseudo_stepsize (float, optional): the initial pseudo time step of
+            the pseudo-transient continuation (s). Defaults to 1.
+        cache_linear_operators (bool, optional): If set to True, the matrix
+            of the terms of the H transport problem that are linear in the
+            concentrations (time derivative, diffusion, detrapping) is
+            assembled once and reused until the stepsize or the temperature
+            change. Only the trapping, flux and source terms are assembled
+            at each Newton iteration. Defaults to False.
+        precompute_rates (bool, optional): If set to True, the Boltzmann
+            factors exp(-E/k_B/T) of the diffusion coefficients and of the
+            trapping and detrapping rates are computed at the nodes of the
+            temperature once per time step (once per run if the
+            temperature is steady) instead of at every quadrature point of
+            every assembly. Opt-in since the nodal interpolation of the
+            factors is an approximation. If the temperature doesn't depend
+            on the position (eg. a TDS ramp), the factors are always
+            scalars, whatever this setting. Defaults to False.
+        update_jacobian (bool, optional): Deprecated, the Jacobian form is
+            always derived once and reused. Use lagged_jacobian to reuse the
+            assembled Jacobian. Defaults to True.
+        lagged_jacobian (bool, optional): If set to True, the assembled
+            Jacobian of the H transport problem (and its factorization or
+            preconditioner) is reused across Newton iterations and time
+            steps. It is only reassembled when the residual contraction
+            rate exceeds max_contraction_rate or after a step rejection.
+            Defaults to False.
+        max_contraction_rate (float, optional): ratio between two
+            consecutive Newton residual norms above which a lagged
+            Jacobian is reassembled. Defaults to 0.5.
         linear_solver (str, optional): linear solver method for the newton solver,
             options can be viewed by print(list_linear_solver_methods()).
             More information can be found at: https://fenicsproject.org/pub/tutorial/html/._ftut1017.html.
             Defaults to None, for the newton solver this is: "umfpack".
         preconditioner (str, optional): preconditioning method for the newton solver,
             options can be viewed by print(list_krylov_solver_preconditioners()).
+            If "fieldsplit", the H transport problem is solved with GMRES and
+            a PETSc fieldsplit preconditioner (AMG on the solute, local
+            solves on the traps), linear_solver is then ignored.
             Defaults to "default".
+        nonlinear_solver (str, optional): nonlinear solver used for the
+            H transport problem, "newton" (fenics.NewtonSolver) or "snes"
+            (fenics.PETScSNESSolver). Defaults to "newton".
+        line_search (str, optional): line search of the "snes" nonlinear
+            solver ("basic", "bt", "cp", "l2" or "nleqerr").
+            Defaults to "bt".
+        nonnegative_concentrations (bool, optional): if True, the "snes"
+            nonlinear solver enforces all the concentrations to be positive
+            (variational inequality solver). Defaults to False.
 
     Attributes:
         transient (bool): transient or steady state sim
@@ -41,9 +106,24 @@ class Settings:
         maximum_iterations (int): maximum iterations allowed for
             the solver to converge
         traps_element_type (str): Finite element used for traps.
-        update_jacobian (bool):
+        condense_traps (bool): local elimination of the traps
+        operator_splitting (str): operator splitting of the diffusion and
+            trapping kinetics
+        newton_predictor (str): extrapolation of the initial guess of
+            transient steps
+        pseudo_transient_continuation (bool): pseudo-transient continuation
+            of steady state problems
+        pseudo_stepsize (float): initial pseudo time step
+        update_jacobian (bool): deprecated, has no effect
+        lagged_jacobian (bool): reuse the assembled Jacobian
+        max_contraction_rate (float): contraction rate above which a lagged
+            Jacobian is reassembled
         linear_solver (str): linear solver method for the newton solver
         precondtitioner (str): preconditioning method for the newton solver
+        nonlinear_solver (str): nonlinear solver of the H transport problem
+        line_search (str): line search of the "snes" nonlinear solver
+        nonnegative_concentrations (bool): enforce positive concentrations
+            with the "snes" nonlinear solver
     """
 
     def __init__(
@@ -59,6 +139,18 @@ class Settings:
         update_jacobian=True,
         linear_solver=None,
         preconditioner="default",
+        lagged_jacobian=False,
+        max_contraction_rate=0.5,
+        nonlinear_solver="newton",
+        line_search="bt",
+        nonnegative_concentrations=False,
+        condense_traps=False,
+        operator_splitting=None,
+        newton_predictor=None,
+        pseudo_transient_continuation=False,
+        pseudo_stepsize=1.0,
+        cache_linear_operators=False,
+        precompute_rates=False,
     ):
         # TODO maybe transient and final_time are redundant
         self.transient = transient
@@ -71,6 +163,23 @@ class Settings:
         self.maximum_iterations = maximum_iterations
 
         self.traps_element_type = traps_element_type
+        self.condense_traps = condense_traps
+        self.operator_splitting = operator_splitting
+        self.newton_predictor = newton_predictor
+        self.pseudo_transient_continuation = pseudo_transient_continuation
+        self.pseudo_stepsize = pseudo_stepsize
+        self.cache_linear_operators = cache_linear_operators
+        self.precompute_rates = precompute_rates
+        if not update_jacobian:
+            warnings.warn(
+                "update_jacobian will be deprecated in a future release, please use lagged_jacobian instead",
+                DeprecationWarning,
+            )
         self.update_jacobian = update_jacobian
         self.linear_solver = linear_solver
         self.preconditioner = preconditioner
+        self.lagged_jacobian = lagged_jacobian
+        self.max_contraction_rate = max_contraction_rate
+        self.nonlinear_solver = nonlinear_solver
+        self.line_search = line_search
+        self.nonnegative_concentrations = nonnegative_concentrations
@@ -21,12 +21,37 @@ class Stepsize:
             raised. Defaults to None.
         milestones (list, optional): list of times by which the simulation must
             pass. Defaults to None.
+        scheme (str, optional): time integration scheme, "backward_euler"
+            (first order) or "bdf2" (second order, variable stepsize
+            backward differentiation formula). The first step of "bdf2" is a
+            backward Euler step. Defaults to "backward_euler".
+        error_tolerance (float, optional): if not None, the stepsize is
+            controlled by the estimated local truncation error instead of
+            the number of Newton iterations. The error is estimated by
+            comparing the solution with an extrapolation of the previous
+            solutions (linear with backward Euler, quadratic with bdf2) and
+            normalised by error_tolerance times the maximum of the
+            solution. Steps with a normalised error above 1
+            are rejected and the next stepsize is chosen with a PI rule.
+            Cannot be used with stepsize_change_ratio. Defaults to None.
+        safety_factor (float, optional): safety factor of the error
+            controller. Defaults to 0.9.
 
     Attributes:
         adaptive_stepsize (dict): contains the parameters for adaptive stepsize
+        error_control (dict): contains the parameters of the error
+            controller
+        previous_error (float): the normalised error of the previous
+            accepted step
         value (fenics.Constant): value of dt
         milestones (list): list of times by which the simulation must
             pass.
+        scheme (str): time integration scheme
+        previous_value (fenics.Constant): value of the previous accepted
+            stepsize, used by the "bdf2" scheme
+        history_available (fenics.Constant): 1 once a step has been
+            accepted (the solutions of the two previous steps are then
+            known), else 0
 
     Example::
 
@@ -47,7 +72,17 @@ class Stepsize:
         max_stepsize=None,
         dt_min=None,
         milestones=None,
+        scheme="backward_euler",
+        error_tolerance=None,
+        safety_factor=0.9,
     ) -> None:
+        if scheme not in ["backward_euler", "bdf2"]:
+            raise ValueError(
+                "Unknown scheme {}, accepted values are backward_euler and bdf2".format(
+                    scheme
+                )
+            )
+        self.scheme = scheme
         self.adaptive_stepsize = None
         if stepsize_change_ratio is not None:
             if t_stop or stepsize_stop_max:
@@ -61,6 +96,18 @@ class Stepsize:
                 "max_stepsize": max_stepsize,
                 "dt_min": dt_min,
             }
+        self.error_control = None
+        if error_tolerance is not None:
+            if stepsize_change_ratio is not None:
+                raise ValueError(
+                    "stepsize_change_ratio and error_tolerance cannot be used together"
+                )
+            self.error_control = {
+                "tolerance": error_tolerance,
+                "safety_factor": safety_factor,
+                "max_stepsize": max_stepsize,
+                "dt_min": dt_min,
+            }
         self.initial_value = initial_value
         self.value = None
         self.milestones = milestones
@@ -81,16 +128,55 @@ class Stepsize:
         """Creates a fenics.Constant object initialised with self.initial_value
         and stores it in self.value"""
         self.value = f.Constant(self.initial_value, name="dt")
+        self.previous_value = f.Constant(1.0, name="dt_n")
+        self.history_available = f.Constant(0.0)
+        self.previous_error = None
+
+    def time_difference(self, u, u_n, u_nm1=None):
+        """Returns the time difference of u, the discrete time derivative
+        being time_difference(u, u_n, u_nm1) / self.value
+
+        Args:
+            u (ufl.Expr): the value at the current step
+            u_n (ufl.Expr): the value at the previous step
+            u_nm1 (ufl.Expr, optional): the value two steps before, only
+                used by the "bdf2" scheme. If None, the backward Euler
+                formula is used. Defaults to None.
+
+        Returns:
+            ufl.Expr: the time difference
+        """
+        if self.scheme == "backward_euler" or u_nm1 is None:
+            return u - u_n
+        # ratio between the current and previous stepsizes, set to zero
+        # before the first accepted step (backward Euler)
+        w = self.history_available * self.value / self.previous_value
+        return (1 + 2 * w) / (1 + w) * u - (1 + w) * u_n + w**2 / (1 + w) * u_nm1
+
+    def store_previous_value(self, value):
+        """Stores the value of the stepsize of an accepted step, called
+        once the previous solutions have been updated
+
+        Args:
+            value (float): the stepsize of the accepted step
+        """
+        self.previous_value.assign(value)
+        self.history_available.assign(1.0)
 
-    def adapt(self, t, nb_it, converged):
+    def adapt(self, t, nb_it, converged, error=None):
         """Changes the stepsize based on convergence.
 
         Args:
             t (float): current time.
             nb_it (int): number of iterations the solver required to converge.
             converged (bool): True if the solver converged, else False.
+            error (float, optional): the normalised local error estimate of
+                the step, only used if self.error_control is not None.
+                Defaults to None.
         """
-        if self.adaptive_stepsize:
+        if self.error_control:
+            self.adapt_to_error(t, converged, error)
+        elif self.adaptive_stepsize:
             change_ratio = self.adaptive_stepsize["stepsize_change_ratio"]
             dt_min = self.adaptive_stepsize["dt_min"]
             max_stepsize = self.adaptive_stepsize["max_stepsize"]
@@ -118,6 +204,54 @@ class Stepsize:
             ):
                 self.value.assign((next_milestone - t))
 
+    def adapt_to_error(self, t, converged, error):
+        """Changes the stepsize based on the normalised local error with a
+        PI rule, k being the order of the scheme (1 for backward Euler, 2
+        for bdf2):
+        dt_new = dt * safety * (1/error)**(0.7/(k+1)) * previous_error**(0.4/(k+1))
+        If the step is rejected (error > 1), only the integral part is used.
+        If the solver did not converge, the stepsize is halved.
+
+        Args:
+            t (float): current time.
+            converged (bool): True if the solver converged, else False.
+            error (float): the normalised local error estimate of the step.
+                If None (no estimate available), the stepsize is kept.
+
+        Raises:
+            ValueError: if the stepsize is below dt_min
+        """
+        safety = self.error_control["safety_factor"]
+        dt_min = self.error_control["dt_min"]
+        max_stepsize = self.error_control["max_stepsize"]
+        min_ratio, max_ratio = 0.2, 5
+        # the local error is O(dt**(k+1))
+        k = 2 if self.scheme == "bdf2" else 1
+
+        if not converged:
+            ratio = 0.5
+        elif error is None:
+            ratio = 1
+        elif error > 1:
+            ratio = max(min_ratio, safety * error ** (-1 / (k + 1)))
+        else:
+            error = max(error, 1e-10)
+            ratio = safety * error ** (-0.7 / (k + 1))
+            if self.previous_error is not None:
+                ratio *= self.previous_error ** (0.4 / (k + 1))
+            ratio = min(max(ratio, min_ratio), max_ratio)
+            self.previous_error = error
+
+        self.value.assign(float(self.value) * ratio)
+        if dt_min is not None and float(self.value) < dt_min:
+            raise ValueError("stepsize reached minimal value")
+
+        if callable(max_stepsize):
+            max_stepsize = max_stepsize(t)
+        if max_stepsize is not None:
+            if float(self.value) > max_stepsize:
+                self.value.assign(max_stepsize)
+
     def next_milestone(self, current_time: float):
         """Returns the next milestone that the simulation must pass.
         Returns None if there are no more milestones.
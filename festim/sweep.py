@@ -0,0 +1,202 @@
+import festim
+import fenics as f
+import concurrent.futures
+import multiprocessing
+import os
+
+# environment variables controlling the number of threads of the linear
+# algebra libraries
+THREAD_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
+
+class Sweep:
+    """Runs an ensemble of simulations (one per parameter set) in a pool of
+    processes and collects their derived quantities in one table.
+
+    The worker processes are started with the "spawn" method so the factory
+    must be importable (defined at the top level of a module, and the
+    script calling run() protected by ``if __name__ == "__main__":``).
+    Under mpirun (several MPI processes), the simulations are not
+    distributed on sub-communicators since the meshes and the solvers are
+    created on MPI.comm_world: they are run one after the other, each one
+    in parallel on all the processes.
+    With precompile, only the forms of the first parameter set are
+    compiled before starting the workers. Parameter sets changing the
+    structure of the forms (eg. the number of traps or the expression of
+    the temperature) are compiled by the workers.
+
+    Args:
+        factory (callable): function returning a festim.Simulation (not
+            initialised) from the keyword arguments of a parameter set
+        parameter_sets (list): list of dicts of keyword arguments of
+            factory
+        max_workers (int, optional): maximum number of worker processes.
+            Defaults to None (number of processors).
+        threads_per_worker (int, optional): number of threads of the linear
+            algebra libraries (BLAS, OpenMP) in each worker. Defaults to 1.
+        output_folder (str, optional): if not None, the files exported by
+            the run i are written in output_folder/run_i so that runs don't
+            overwrite each other's exports. Defaults to None.
+        precompile (bool, optional): if True, the simulation of the first
+            parameter set is precompiled before starting the workers so
+            that they don't all compile the same forms at once. Defaults to
+            True.
+
+    Attributes:
+        table (list): one dict per computed time of each run, with the run
+            index ("run"), the parameters, the time ("t") and the derived
+            quantities (with their title as key)
+
+    Example::
+
+        def factory(T):
+            my_model = F.Simulation()
+            ...
+            my_model.T = T
+            return my_model
+
+        if __name__ == "__main__":
+            table = F.run_ensemble(factory, [{"T": T} for T in [400, 500, 600]])
+    """
+
+    def __init__(
+        self,
+        factory,
+        parameter_sets,
+        max_workers=None,
+        threads_per_worker=1,
+        output_folder=None,
+        precompile=True,
+    ):
+        self.factory = factory
+        self.parameter_sets = parameter_sets
+        self.max_workers = max_workers
+        self.threads_per_worker = threads_per_worker
+        self.output_folder = output_folder
+        self.precompile = precompile
+        self.table = []
+
+    def run(self, callback=None):
+        """Runs all the simulations. The table is filled as the runs finish.
+
+        Args:
+            callback (callable, optional): function called with the rows of
+                each finished run. Defaults to None.
+
+        Returns:
+            list: the table
+        """
+        self.table = []
+        if f.MPI.size(f.MPI.comm_world) > 1:
+            for index, parameters in enumerate(self.parameter_sets):
+                rows = run_one(self.factory, index, parameters, self.output_folder)
+                self.add_rows(rows, callback)
+            return self.table
+
+        if self.precompile and len(self.parameter_sets) > 0:
+            simulation = self.factory(**self.parameter_sets[0])
+            if self.output_folder is not None:
+                move_exports(simulation, os.path.join(self.output_folder, "run_0"))
+            festim.precompile(simulation, verbose=False)
+
+        # environment variables are inherited by the workers
+        previous_values = {name: os.environ.get(name) for name in THREAD_VARIABLES}
+        os.environ.update(
+            {name: str(self.threads_per_worker) for name in THREAD_VARIABLES}
+        )
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        run_one, self.factory, index, parameters, self.output_folder
+                    )
+                    for index, parameters in enumerate(self.parameter_sets)
+                ]
+                for future in concurrent.futures.as_completed(futures):
+                    self.add_rows(future.result(), callback)
+        finally:
+            for name, value in previous_values.items():
+                if value is None:
+                    os.environ.pop(name)
+                else:
+                    os.environ[name] = value
+        return self.table
+
+    def add_rows(self, rows, callback=None):
+        self.table += rows
+        if callback is not None:
+            callback(rows)
+
+
+def run_ensemble(factory, parameter_sets, callback=None, **kwargs):
+    """Runs an ensemble of simulations in a pool of processes, see
+    festim.Sweep
+
+    Args:
+        factory (callable): function returning a festim.Simulation (not
+            initialised) from the keyword arguments of a parameter set
+        parameter_sets (list): list of dicts of keyword arguments of
+            factory
+        callback (callable, optional): function called with the rows of
+            each finished run. Defaults to None.
+        **kwargs: other arguments of festim.Sweep
+
+    Returns:
+        list: the table of derived quantities (see festim.Sweep)
+    """
+    return Sweep(factory, parameter_sets, **kwargs).run(callback=callback)
+
+
+def run_one(factory, index, parameters, output_folder=None):
+    """Creates, initialises and runs one simulation of an ensemble
+
+    Args:
+        factory (callable): function returning a festim.Simulation from the
+            keyword arguments parameters
+        index (int): the index of the run
+        parameters (dict): the keyword arguments of factory
+        output_folder (str, optional): if not None, the exports are written
+            in output_folder/run_{index}. Defaults to None.
+
+    Returns:
+        list: the rows of the derived quantities of the run
+    """
+    simulation = factory(**parameters)
+    if output_folder is not None:
+        move_exports(simulation, os.path.join(output_folder, "run_{}".format(index)))
+    simulation.initialise()
+    simulation.run()
+
+    rows = []
+    for export in simulation.exports:
+        if isinstance(export, festim.DerivedQuantities):
+            for i, t in enumerate(export.t):
+                row = {"run": index, **parameters, "t": t}
+                for quantity in export:
+                    row[quantity.title] = quantity.data[i]
+                rows.append(row)
+    return rows
+
+
+def move_exports(simulation, folder):
+    """Prefixes the relative paths of the files exported by a simulation
+    with a folder
+
+    Args:
+        simulation (festim.Simulation): the simulation
+        folder (str): the folder
+    """
+    for export in simulation.exports:
+        if isinstance(export, festim.XDMFExport):
+            if export.folder is None:
+                export.folder = folder
+            elif not os.path.isabs(export.folder):
+                export.folder = os.path.join(folder, export.folder)
+            # the file is created with the path when the export is created
+            export.define_xdmf_file()
+        elif getattr(export, "filename", None) is not None:
+            if not os.path.isabs(export.filename):
+                export.filename = os.path.join(folder, export.filename)
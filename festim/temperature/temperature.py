@@ -1,5 +1,7 @@
+from festim import k_B, x, y, z, t
 import sympy as sp
 import fenics as f
+import numpy as np
 
 
 class Temperature:
@@ -16,6 +18,19 @@ class Temperature:
         value (sp.Add, int, float): the expression of temperature
         expression (fenics.Expression): the expression of temperature as a
             fenics object
+        evaluator (callable): the value lambdified with numpy, called with
+            the coordinates and the time
+        dof_coordinates (numpy.ndarray): the coordinates (x, y, z) of the
+            local degrees of freedom of T
+        uniform_value (float): the current value of a spatially uniform
+            temperature, None if the temperature depends on the position
+        backups (list): preallocated copies of the functions returned by
+            state_functions(), used to roll back rejected time steps
+        precompute_rates (bool): if True, the Boltzmann factors returned
+            by boltzmann_factor() are precomputed at the nodes of T if the
+            temperature depends on the position
+        boltzmann_factors (dict): the precomputed Boltzmann factors
+            (fenics.Function) mapped to their activation energy
 
     Usage:
         >>> import festim as F
@@ -28,6 +43,12 @@ class Temperature:
         self.T_n = None
         self.value = value
         self.expression = None
+        self.evaluator = None
+        self.dof_coordinates = None
+        self.uniform_value = None
+        self.backups = None
+        self.precompute_rates = False
+        self.boltzmann_factors = {}
 
     def create_functions(self, mesh):
         """Creates functions self.T, self.T_n
@@ -42,15 +63,125 @@ class Temperature:
         self.T.assign(f.interpolate(self.expression, V))
         self.T_n.assign(self.T)
 
+        self.evaluator = sp.lambdify([x, y, z, t], self.value, "numpy")
+        coordinates = V.tabulate_dof_coordinates()[: self.T.vector().local_size()]
+        self.dof_coordinates = np.zeros((coordinates.shape[0], 3))
+        self.dof_coordinates[:, : coordinates.shape[1]] = coordinates
+        if self.is_uniform():
+            self.uniform_value = float(self.evaluator(0, 0, 0, 0))
+
     def update(self, t):
-        """Updates T_n, expression, and T with respect to time
+        """Updates T_n, expression, and T with respect to time. T is
+        evaluated in place at the coordinates of its degrees of freedom
+        with the lambdified value. Nothing is done if the value doesn't
+        depend on time.
 
         Args:
             t (float): the time
         """
+        if self.is_steady_state():
+            return
         self.T_n.assign(self.T)
         self.expression.t = t
-        self.T.assign(f.interpolate(self.expression, self.T.function_space()))
+        if self.uniform_value is not None:
+            self.uniform_value = float(self.evaluator(0, 0, 0, t))
+            values = self.uniform_value
+        else:
+            values = self.evaluator(*self.dof_coordinates.T, t)
+        self.T.vector().set_local(
+            np.broadcast_to(values, self.dof_coordinates.shape[:1]).astype(float)
+        )
+        self.T.vector().apply("insert")
+        self.update_boltzmann_factors()
+
+    def state_functions(self):
+        """Returns the functions defining the state of the temperature
+
+        Returns:
+            list: the fenics.Function objects to back up
+        """
+        return [self.T, self.T_n]
+
+    def backup(self):
+        """Copies the state of the temperature in self.backups, to be called
+        before update(). The backups are only allocated once."""
+        functions = self.state_functions()
+        if self.backups is None:
+            self.backups = [f.Function(u.function_space()) for u in functions]
+        for backup, u in zip(self.backups, functions):
+            backup.assign(u)
+
+    def restore(self):
+        """Restores the state stored by backup()"""
+        for backup, u in zip(self.backups, self.state_functions()):
+            u.assign(backup)
+        if self.uniform_value is not None:
+            self.uniform_value = self.T.vector().max()
+        self.update_boltzmann_factors()
+
+    def close(self):
+        """Releases the resources held by the temperature (eg. open
+        files), called at the end of Simulation.run()"""
+        pass
+
+    def boltzmann_factor(self, E):
+        """Returns the Boltzmann factor exp(-E/k_B/T) of an Arrhenius law.
+        If the temperature is spatially uniform and E is a number, the
+        factor is a fenics.Constant (a scalar during assembly) updated by
+        update_boltzmann_factors() when T changes. This is exact and always
+        done.
+        Otherwise, if self.precompute_rates is True and E is a number, the
+        factor is a fenics.Function computed at the nodes of T with numpy,
+        so that the exponential is not evaluated at every quadrature point
+        of every assembly.
+
+        Args:
+            E (float): the activation energy (eV)
+
+        Returns:
+            ufl.core.expr.Expr, fenics.Function or fenics.Constant: the
+                Boltzmann factor
+        """
+        uniform = self.uniform_value is not None
+        if not isinstance(E, (int, float)) or not (self.precompute_rates or uniform):
+            return f.exp(-E / k_B / self.T)
+        if E not in self.boltzmann_factors:
+            if uniform:
+                factor = f.Constant(1.0)
+            else:
+                factor = f.Function(self.T.function_space())
+            self.boltzmann_factors[E] = factor
+            self.update_boltzmann_factor(E, factor)
+        return self.boltzmann_factors[E]
+
+    def update_boltzmann_factor(self, E, factor):
+        """Computes a Boltzmann factor at the nodes of T
+
+        Args:
+            E (float): the activation energy (eV)
+            factor (fenics.Function or fenics.Constant): the Boltzmann
+                factor
+        """
+        if isinstance(factor, f.Constant):
+            factor.assign(np.exp(-E / k_B / self.uniform_value))
+            return
+        T_values = self.T.vector().get_local()
+        factor.vector().set_local(np.exp(-E / k_B / T_values))
+        factor.vector().apply("insert")
+
+    def update_boltzmann_factors(self):
+        """Updates all the precomputed Boltzmann factors, to be called
+        when T has changed"""
+        for E, factor in self.boltzmann_factors.items():
+            self.update_boltzmann_factor(E, factor)
 
     def is_steady_state(self):
-        return "t" not in sp.printing.ccode(self.value)
+        return t not in sp.sympify(self.value).free_symbols
+
+    def is_uniform(self):
+        """Checks if the temperature is spatially uniform
+
+        Returns:
+            bool: True if the value doesn't depend on x, y or z, else False
+        """
+        return not {x, y, z} & sp.sympify(self.value).free_symbols
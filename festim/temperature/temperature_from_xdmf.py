@@ -1,32 +1,60 @@
 from festim.temperature.temperature import Temperature
-from festim.helpers import extract_xdmf_labels
+from festim.helpers import extract_xdmf_labels, extract_xdmf_times
 import fenics as f
+import bisect
 
 
 class TemperatureFromXDMF(Temperature):
     """
-    Temperature read from an XDMF file
+    Temperature read from an XDMF file.
+    In transient simulations, if the file contains several checkpoints, the
+    temperature is interpolated linearly in time between the two
+    checkpoints surrounding the current time (and is constant before the
+    first checkpoint and after the last one). The checkpoints are read
+    lazily and only a bounded window of them is kept in memory.
+    Otherwise, the last checkpoint is used.
 
     Args:
         filename (str): The temperature file. Must end in ".xdmf"
         label (str): How the checkpoints have been labelled
+        max_snapshots (int, optional): maximum number of checkpoints kept
+            in memory (at least 2). Defaults to 2.
 
     Attributes:
         filename (str): name of the temperature file
         label (str): How the checkpoints have been labelled
+        times (list): the times of the checkpoints
+        transient (bool): if False, the last checkpoint is used whatever
+            the time. Set from the settings of the simulation.
+        max_snapshots (int): maximum number of checkpoints kept in memory
+        snapshots (dict): the checkpoints in memory (fenics.Function) mapped
+            to their index
+
+    Note:
+        The XDMF file stays open while checkpoints are read lazily. It is
+        closed by close() at the end of Simulation.run() (or right away if
+        the temperature is steady state) and reopened if another
+        checkpoint is needed afterwards.
     """
 
-    def __init__(self, filename, label) -> None:
+    def __init__(self, filename, label, max_snapshots=2) -> None:
         super().__init__()
 
         self.filename = filename
         self.label = label
+        if max_snapshots < 2:
+            raise ValueError("max_snapshots must be greater than or equal to 2")
+        self.max_snapshots = max_snapshots
+        self.transient = True
+        self.snapshots = {}
+        self._file = None
 
         # check labels match
         if self.label not in extract_xdmf_labels(self.filename):
             raise ValueError(
                 "Coudln't find label: {} in {}".format(self.label, self.filename)
             )
+        self.times = extract_xdmf_times(self.filename)
 
     def create_functions(self, mesh):
         """Creates functions self.T, self.T_n
@@ -35,18 +63,80 @@ class TemperatureFromXDMF(Temperature):
         """
         V = f.FunctionSpace(mesh.mesh, "CG", 1)
         self.T = f.Function(V, name="T")
+        self.T_n = f.Function(V, name="T_n")
 
-        f.XDMFFile(self.filename).read_checkpoint(self.T, self.label, -1)
+        self.close()
+        self.snapshots = {}
+        if self.is_steady_state():
+            with f.XDMFFile(self.filename) as file:
+                file.read_checkpoint(self.T, self.label, -1)
+        else:
+            self.interpolate(0)
 
-        self.T_n = f.Function(V, name="T_n")
         self.T_n.assign(self.T)
 
     def update(self, t):
-        """Allows for the use of this class in transient h transport cases,
-        refer to issue #499
+        """Updates T_n and interpolates T at t between the checkpoints.
+        Nothing is done if the temperature is steady state.
+
+        Args:
+            t (float): the time
+        """
+        if self.is_steady_state():
+            return
+        self.T_n.assign(self.T)
+        self.interpolate(t)
+        self.update_boltzmann_factors()
+
+    def interpolate(self, t):
+        """Sets T to the linear interpolation at t of the two checkpoints
+        surrounding t and discards the checkpoints outside of the window
+
+        Args:
+            t (float): the time
         """
-        pass
+        index = bisect.bisect_right(self.times, t) - 1
+        index = min(max(index, 0), len(self.times) - 2)
+        t_a, t_b = self.times[index], self.times[index + 1]
+        weight = min(max((t - t_a) / (t_b - t_a), 0), 1)
+
+        for i in list(self.snapshots):
+            if not index <= i < index + self.max_snapshots:
+                del self.snapshots[i]
+        T_a, T_b = self.snapshot(index), self.snapshot(index + 1)
+
+        # T = (1 - weight) T_a + weight T_b
+        self.T.vector().zero()
+        self.T.vector().axpy(1 - weight, T_a.vector())
+        self.T.vector().axpy(weight, T_b.vector())
+
+    def snapshot(self, index):
+        """Returns a checkpoint, read from the file if it isn't in memory
+
+        Args:
+            index (int): the index of the checkpoint
+
+        Returns:
+            fenics.Function: the checkpoint
+        """
+        if index not in self.snapshots:
+            if self._file is None:
+                self._file = f.XDMFFile(self.filename)
+            snapshot = f.Function(self.T.function_space())
+            self._file.read_checkpoint(snapshot, self.label, index)
+            self.snapshots[index] = snapshot
+        return self.snapshots[index]
+
+    def close(self):
+        """Closes the XDMF file if it is open"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
     def is_steady_state(self):
-        # TemperatureFromXDMF is always steady state
-        return True
+        # TemperatureFromXDMF is steady state in steady simulations or if
+        # the file has only one checkpoint
+        return not self.transient or len(self.times) < 2
+
+    def is_uniform(self):
+        return False
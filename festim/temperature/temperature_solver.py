@@ -1,5 +1,6 @@
 import festim
 import fenics as f
+import numpy as np
 import sympy as sp
 
 
@@ -24,10 +25,47 @@ class HeatTransferProblem(festim.Temperature):
         preconditioner (str, optional): preconditioning method for the newton solver,
             options can be veiwed by print(list_krylov_solver_preconditioners()).
             Defaults to "default".
+        stepsize (float, optional): if not None, the transient heat
+            transfer problem is solved with its own stepsize (s) (backward
+            Euler) and the temperature seen by the hydrogen transport is
+            interpolated linearly in time between two heat steps. If None,
+            the heat transfer problem is solved at each time step of the
+            simulation. Defaults to None.
+        steady_state_tolerance (float, optional): if not None, the heat
+            transfer problem stops being solved when the relative change of
+            the temperature over a heat step is below this tolerance and
+            the steady-state residual (the form without the time derivative)
+            is below absolute_tolerance. It is solved again when the sources
+            or the boundary conditions have changed (when the variation of
+            the residual exceeds absolute_tolerance). Defaults to None.
 
     Attributes:
         F (fenics.Form): the variational form of the heat transfer problem
+        F_steady (fenics.Form): the variational form without the time
+            derivative, used to check that a steady state is reached
+        J (fenics.Form): the Jacobian of F, None if the problem is linear
+        problem (festim.Problem or festim.SplitProblem): the nonlinear
+            problem, created once in create_functions() and reused for every
+            solve. If the problem is linear, it is a festim.SplitProblem
+            with a lagged Jacobian so that the factorization is reused and
+            each solve only needs a back-substitution.
         v_T (fenics.TestFunction): the test function
+        T_nm1 (fenics.Function): the temperature two timesteps before, only
+            used by the "bdf2" time scheme
+        T_heat (fenics.Function): the solution of the heat transfer problem
+            (T if stepsize is None)
+        T_heat_n (fenics.Function): the previous solution of the heat
+            transfer problem (T_n if stepsize is None)
+        t_heat (float): the time of T_heat (s), only used if stepsize is not
+            None
+        t_heat_n (float): the time of T_heat_n (s), only used if stepsize is
+            not None
+        heat_dt (festim.Stepsize): the stepsize of the heat transfer problem,
+            only used if stepsize is not None
+        steady (bool): True if the heat transfer problem has reached a
+            steady state and is not solved anymore
+        nb_heat_solves (int): the number of solves of the heat transfer
+            problem
         newton_solver (fenics.NewtonSolver): Newton solver for solving the nonlinear problem
         initial_condition (festim.InitialCondition): the initial condition
         sub_expressions (list): contains time dependent fenics.Expression to
@@ -46,6 +84,8 @@ class HeatTransferProblem(festim.Temperature):
         maximum_iterations=30,
         linear_solver=None,
         preconditioner="default",
+        stepsize=None,
+        steady_state_tolerance=None,
     ) -> None:
         super().__init__()
         self.transient = transient
@@ -55,9 +95,26 @@ class HeatTransferProblem(festim.Temperature):
         self.maximum_iterations = maximum_iterations
         self.linear_solver = linear_solver
         self.preconditioner = preconditioner
+        self.stepsize = stepsize
+        self.steady_state_tolerance = steady_state_tolerance
 
         self.F = 0
+        self.F_steady = 0
+        self.J = None
+        self.problem = None
         self.v_T = None
+        self.T_nm1 = None
+        self.T_heat = None
+        self.T_heat_n = None
+        self.t_heat = 0
+        self.t_heat_n = 0
+        self.heat_dt = None
+        self.steady = False
+        self.nb_heat_solves = 0
+        self._residual = None
+        self._frozen_residual = None
+        self._steady_residual = None
+        self._backup_state = None
         self.sources = []
         self.boundary_conditions = []
         self.sub_expressions = []
@@ -106,6 +163,18 @@ class HeatTransferProblem(festim.Temperature):
         self.T = f.Function(V, name="T")
         self.T_n = f.Function(V, name="T_n")
         self.v_T = f.TestFunction(V)
+        self.t_heat = self.t_heat_n = 0
+        self.steady = False
+        self.nb_heat_solves = 0
+        if self.transient and self.stepsize is not None:
+            self.T_heat = f.Function(V, name="T_heat")
+            self.T_heat_n = f.Function(V, name="T_heat_n")
+            self.heat_dt = festim.Stepsize(self.stepsize)
+            dt = self.heat_dt
+        else:
+            self.T_heat, self.T_heat_n = self.T, self.T_n
+        if self.transient and dt.scheme == "bdf2":
+            self.T_nm1 = f.Function(V, name="T_nm1")
         if self.transient and self.initial_condition is None:
             raise AttributeError(
                 "Initial condition is required for transient heat transfer simulations"
@@ -129,20 +198,16 @@ class HeatTransferProblem(festim.Temperature):
 
         if not self.newton_solver:
             self.define_newton_solver()
+        self.define_problem()
 
         if not self.transient:
             print("Solving stationary heat equation")
-            dT = f.TrialFunction(self.T.function_space())
-            JT = f.derivative(self.F, self.T, dT)
-            problem = festim.Problem(JT, self.F, self.dirichlet_bcs)
-
-            f.begin(
-                "Solving nonlinear variational problem."
-            )  # Add message to fenics logs
-            self.newton_solver.solve(problem, self.T.vector())
-            f.end()
-
+            self.solve()
             self.T_n.assign(self.T)
+        elif self.stepsize is not None:
+            self.T.assign(self.T_n)
+            self.T_heat.assign(self.T_n)
+            self.T_heat_n.assign(self.T_n)
 
     def define_variational_problem(self, materials, mesh, dt=None):
         """Create a variational form for heat transfer problem
@@ -155,10 +220,11 @@ class HeatTransferProblem(festim.Temperature):
         """
 
         print("Defining variational problem heat transfers")
-        T, T_n = self.T, self.T_n
+        T, T_n = self.T_heat, self.T_heat_n
         v_T = self.v_T
 
         self.F = 0
+        F_transient = 0
         for mat in materials:
             thermal_cond = mat.thermal_cond
             if callable(thermal_cond):  # if thermal_cond is a function
@@ -176,7 +242,8 @@ class HeatTransferProblem(festim.Temperature):
                     rho = rho(T)
                 # Transien term
                 for vol in subdomains:
-                    self.F += rho * cp * (T - T_n) / dt.value * v_T * mesh.dx(vol)
+                    dT = dt.time_difference(T, T_n, self.T_nm1)
+                    F_transient += rho * cp * dT / dt.value * v_T * mesh.dx(vol)
             # Diffusion term
             for vol in subdomains:
                 if mesh.type == "cartesian":
@@ -212,7 +279,7 @@ class HeatTransferProblem(festim.Temperature):
         # Boundary conditions
         for bc in self.boundary_conditions:
             if isinstance(bc, festim.FluxBC):
-                bc.create_form(self.T, solute=None)
+                bc.create_form(T, solute=None)
 
                 # TODO: maybe that's not necessary
                 self.sub_expressions += bc.sub_expressions
@@ -220,6 +287,9 @@ class HeatTransferProblem(festim.Temperature):
                 for surf in bc.surfaces:
                     self.F += -bc.form * self.v_T * mesh.ds(surf)
 
+        self.F_steady = self.F
+        self.F = F_transient + self.F_steady
+
     def define_newton_solver(self):
         """Creates the Newton solver and sets its parameters"""
         self.newton_solver = f.NewtonSolver(f.MPI.comm_world)
@@ -242,13 +312,48 @@ class HeatTransferProblem(festim.Temperature):
         self.dirichlet_bcs = []
         for bc in self.boundary_conditions:
             if isinstance(bc, festim.DirichletBC) and bc.field == "T":
-                bc.create_expression(self.T)
+                bc.create_expression(self.T_heat)
                 for surf in bc.surfaces:
                     bci = f.DirichletBC(V, bc.expression, surface_markers, surf)
                     self.dirichlet_bcs.append(bci)
                 self.sub_expressions += bc.sub_expressions
                 self.sub_expressions.append(bc.expression)
 
+    def define_problem(self):
+        """Creates the problem solved at each time step. If F is linear in
+        T (the Jacobian doesn't depend on T, eg. with constant thermal_cond,
+        heat_capacity and rho and linear boundary conditions), a
+        festim.SplitProblem with a lagged Jacobian is used: the matrix is
+        only assembled (and factorized) again when its coefficients change
+        (eg. the stepsize), and the Newton solver converges in one
+        iteration.
+        """
+        dT = f.TrialFunction(self.T_heat.function_space())
+        J = f.derivative(self.F, self.T_heat, dT)
+        if self.T_heat not in J.coefficients():
+            self.J = None
+            self.problem = festim.SplitProblem(
+                self.T_heat, self.F, 0, self.dirichlet_bcs, lagged_jacobian=True
+            )
+        else:
+            self.J = J
+            self.problem = festim.Problem(self.J, self.F, self.dirichlet_bcs)
+
+    def is_linear(self):
+        """Returns True if the heat transfer problem is linear in T"""
+        return isinstance(self.problem, festim.SplitProblem)
+
+    def solve(self):
+        """Solves the heat transfer problem with the Newton solver"""
+        if self.is_linear():
+            self.problem.reset_residual_norms()
+            self.problem.check_linear_operator()
+        # Add message to fenics logs
+        f.begin("Solving nonlinear variational problem.")
+        self.newton_solver.solve(self.problem, self.T_heat.vector())
+        f.end()
+        self.nb_heat_solves += 1
+
     def update(self, t):
         """Updates T_n, and T with respect to time by solving the heat transfer
         problem
@@ -256,20 +361,151 @@ class HeatTransferProblem(festim.Temperature):
         Args:
             t (float): the time
         """
-        if self.transient:
+        if not self.transient:
+            return
+        if self.stepsize is not None:
+            self.update_multi_rate(t)
+            self.update_boltzmann_factors()
+            return
+
+        festim.update_expressions(self.sub_expressions, t)
+        if self.steady and not self.forcing_has_changed():
+            return
+        self.steady = False
+        # Solve heat transfers
+        self.solve()
+        change = self.relative_change()
+
+        if self.T_nm1 is not None:
+            self.T_nm1.assign(self.T_n)
+        self.T_n.assign(self.T)
+        self.check_steady_state(change)
+        self.update_boltzmann_factors()
+
+    def update_multi_rate(self, t):
+        """Solves the heat transfer problem with its own stepsize until t
+        (or until a steady state is reached) and interpolates the
+        temperature linearly in time between the last two heat steps
+
+        Args:
+            t (float): the time
+        """
+        self.T_n.assign(self.T)
+        if self.steady:
             festim.update_expressions(self.sub_expressions, t)
-            # Solve heat transfers
-            dT = f.TrialFunction(self.T.function_space())
-            JT = f.derivative(self.F, self.T, dT)  # Define the Jacobian
-            problem = festim.Problem(JT, self.F, self.dirichlet_bcs)
+            if not self.forcing_has_changed():
+                self.t_heat_n = self.t_heat = t
+                return
+            self.steady = False
+
+        while self.t_heat < t and not np.isclose(self.t_heat, t, atol=0):
+            self.T_heat_n.assign(self.T_heat)
+            self.t_heat_n = self.t_heat
+            self.t_heat += self.stepsize
+            festim.update_expressions(self.sub_expressions, self.t_heat)
+            self.solve()
+            self.check_steady_state(self.relative_change())
+            if self.steady:
+                self.t_heat_n = self.t_heat = t
+                self.T.assign(self.T_heat)
+                return
+
+        # T = (1 - w) T_heat_n + w T_heat
+        w = (t - self.t_heat_n) / (self.t_heat - self.t_heat_n)
+        self.T.vector().zero()
+        self.T.vector().axpy(1 - w, self.T_heat_n.vector())
+        self.T.vector().axpy(w, self.T_heat.vector())
+
+    def relative_change(self):
+        """Computes the relative change of the temperature over the last
+        heat step
+
+        Returns:
+            float: max(|T_heat - T_heat_n|) / max(|T_heat|)
+        """
+        change = (self.T_heat.vector() - self.T_heat_n.vector()).norm("linf")
+        return change / max(self.T_heat.vector().norm("linf"), f.DOLFIN_EPS)
 
-            f.begin(
-                "Solving nonlinear variational problem."
-            )  # Add message to fenics logs
-            self.newton_solver.solve(problem, self.T.vector())
-            f.end()
+    def check_steady_state(self, change):
+        """Freezes the heat transfer problem if the relative change of the
+        temperature is below steady_state_tolerance and the steady-state
+        residual is below absolute_tolerance. The residual (without time
+        variation) is then stored to detect later changes of the sources or
+        boundary conditions.
 
-            self.T_n.assign(self.T)
+        Args:
+            change (float): the relative change of the temperature
+        """
+        if self.steady_state_tolerance is None or change >= self.steady_state_tolerance:
+            return
+        if self.steady_state_residual() > self.absolute_tolerance:
+            return
+        self.steady = True
+        self.T_heat_n.assign(self.T_heat)
+        if self.T_nm1 is not None:
+            self.T_nm1.assign(self.T_heat)
+        if self._frozen_residual is None:
+            self._frozen_residual = f.PETScVector()
+            self._residual = f.PETScVector()
+        self.problem.F(self._frozen_residual, self.T_heat.vector())
+
+    def steady_state_residual(self):
+        """Computes the residual of the heat transfer problem without the
+        time derivative, a small change of the temperature over one step
+        being not enough to ensure a steady state (eg. slow transients or
+        small stepsizes)
+
+        Returns:
+            float: the l2 norm of the steady-state residual at T_heat
+        """
+        if self._steady_residual is None:
+            self._steady_residual = f.PETScVector()
+        f.assemble(self.F_steady, tensor=self._steady_residual)
+        for bc in self.dirichlet_bcs:
+            bc.apply(self._steady_residual, self.T_heat.vector())
+        return self._steady_residual.norm("l2")
+
+    def forcing_has_changed(self):
+        """Checks if the sources or boundary conditions have changed since
+        the heat transfer problem was frozen, from the variation of the
+        residual at the frozen temperature
+
+        Returns:
+            bool: True if the l2 norm of the variation exceeds
+                absolute_tolerance, else False
+        """
+        self.problem.F(self._residual, self.T_heat.vector())
+        self._residual.axpy(-1.0, self._frozen_residual)
+        return self._residual.norm("l2") > self.absolute_tolerance
+
+    def state_functions(self):
+        """Returns the functions defining the state of the temperature
+
+        Returns:
+            list: the fenics.Function objects to back up
+        """
+        functions = [self.T, self.T_n]
+        if self.T_nm1 is not None:
+            functions.append(self.T_nm1)
+        if self.T_heat is not self.T:
+            functions += [self.T_heat, self.T_heat_n]
+        return functions
+
+    def backup(self):
+        """Copies the state of the temperature and of the heat transfer
+        problem, to be called before update()"""
+        super().backup()
+        self._backup_state = (self.t_heat, self.t_heat_n)
+
+    def restore(self):
+        """Restores the state stored by backup(). A frozen heat transfer
+        problem is unfrozen (it will be solved at the next update)."""
+        self.t_heat, self.t_heat_n = self._backup_state
+        self.steady = False
+        super().restore()
 
     def is_steady_state(self):
         return not self.transient
+
+    def is_uniform(self):
+        return False
@@ -42,6 +42,75 @@ def test_default_dt_min_value():
     my_problem.update(t, dt)
 
 
+def test_update_records_rejections():
+    """Checks that update() returns the time of the step and records the
+    number of rejections when the step is accepted at the first attempt"""
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    dt = festim.Stepsize(initial_value=0.5)
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-9, final_time=1
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+
+    t = my_problem.update(0.5, dt)
+    u_backup = my_problem.u_backup
+    t = my_problem.update(1, dt)
+
+    assert t == 1
+    assert my_problem.nb_rejections == [0, 0]
+    assert my_problem.u_backup is u_backup
+
+
+def test_update_rejected_step_restores_temperature():
+    """Checks that a step rejected in update() called directly rolls back
+    the temperature (backed up by update()) before solving again with a
+    smaller stepsize"""
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    dt = festim.Stepsize(initial_value=0.5, stepsize_change_ratio=2)
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-9, final_time=1
+    )
+    my_temperature = festim.Temperature(300 + 10 * festim.t)
+    my_temperature.create_functions(festim.Mesh(mesh))
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), my_temperature, my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+
+    # the first attempt doesn't converge
+    solve_step = my_problem.solve_step
+    attempts = []
+
+    def failing_solve_step(stepsize):
+        attempts.append(stepsize)
+        if len(attempts) == 1:
+            return 10, False
+        return solve_step(stepsize)
+
+    my_problem.solve_step = failing_solve_step
+    t = my_problem.update(0.5, dt)
+
+    assert my_problem.nb_rejections == [1]
+    assert t < 0.5
+    assert my_temperature.T(0.5) == pytest.approx(300 + 10 * t)
+    assert my_temperature.T_n(0.5) == pytest.approx(300)
+
+
 def test_solve_once_jacobian_is_none():
     """Checks that solve_once() works when the jacobian (J) is None (defaults)"""
     # build
@@ -188,3 +257,283 @@ class Test_solve_once_with_custom_solver:
         problem_2.solve_once()
 
         assert (problem_1.u.vector() == problem_2.u.vector()).all()
+
+
+def test_problem_is_reused_between_solves():
+    """Checks that solve_once() creates the festim.Problem only once and
+    reuses it for the following solves"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, maximum_iterations=50
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+
+    # run
+    my_problem.solve_once()
+    problem = my_problem.problem
+    my_problem.u_n.assign(my_problem.u)
+    _, converged = my_problem.solve_once()
+
+    # test
+    assert converged
+    assert my_problem.problem is problem
+
+
+def test_lagged_jacobian_gives_same_solution():
+    """Checks that solving with a lagged Jacobian converges to the same
+    solution as the standard Newton solver"""
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    solutions = []
+    for lagged in [False, True]:
+        my_settings = festim.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            maximum_iterations=50,
+            lagged_jacobian=lagged,
+        )
+        my_problem = festim.HTransportProblem(
+            festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+        )
+        my_problem.define_newton_solver()
+        my_problem.u = f.Function(V)
+        my_problem.u_n = f.Function(V)
+        my_problem.v = f.TestFunction(V)
+        my_problem.F = (
+            (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+            + (1 + my_problem.u**2) * my_problem.v * f.dx
+            + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+        )
+        for _ in range(3):
+            _, converged = my_problem.solve_once()
+            assert converged
+            my_problem.u_n.assign(my_problem.u)
+        solutions.append(my_problem.u.vector()[:])
+
+    assert solutions[0] == pytest.approx(solutions[1], rel=1e-6)
+
+
+def test_update_jacobian_deprecated():
+    """Checks that update_jacobian=False warns and doesn't change the
+    Newton solver"""
+    with pytest.deprecated_call():
+        my_settings = festim.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            update_jacobian=False,
+        )
+
+    assert not my_settings.lagged_jacobian
+
+
+@pytest.mark.parametrize("line_search", ["basic", "bt", "cp"])
+@pytest.mark.parametrize("nonnegative_concentrations", [True, False])
+def test_solve_once_snes(line_search, nonnegative_concentrations):
+    """Checks that solve_once() works with the PETSc SNES solver"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        nonlinear_solver="snes",
+        line_search=line_search,
+        nonnegative_concentrations=nonnegative_concentrations,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        - 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+    # run
+    nb_it, converged = my_problem.solve_once()
+
+    # test
+    assert isinstance(my_problem.newton_solver, f.PETScSNESSolver)
+    assert converged
+    assert my_problem.u.vector().min() >= 0
+
+
+def test_snes_records_residual_norms_of_iterations():
+    """Checks that with the SNES solver, the residual norms are recorded
+    once per nonlinear iteration and not for the line search trials"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        nonlinear_solver="snes",
+        line_search="cp",
+        lagged_jacobian=True,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + (1 + my_problem.u**2) * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+    # run
+    nb_it, converged = my_problem.solve_once()
+
+    # test
+    assert converged
+    assert len(my_problem.problem.residual_norms) == nb_it + 1
+
+
+def test_snes_keeps_concentrations_positive():
+    """Checks that the SNES solver with nonnegative_concentrations keeps the
+    solution positive when the unconstrained solution is negative"""
+    # build
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=50,
+        nonlinear_solver="snes",
+        nonnegative_concentrations=True,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.define_newton_solver()
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.v = f.TestFunction(V)
+    my_problem.F = (
+        (my_problem.u - my_problem.u_n) * my_problem.v * f.dx
+        + 1 * my_problem.v * f.dx
+        + f.dot(f.grad(my_problem.u), f.grad(my_problem.v)) * f.dx
+    )
+    # run
+    my_problem.solve_once()
+
+    # test
+    assert my_problem.u.vector().min() >= 0
+
+
+def test_wrong_nonlinear_solver():
+    """Checks that a ValueError is raised for an unknown nonlinear_solver"""
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        nonlinear_solver="coucou",
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    with pytest.raises(ValueError, match="Unknown nonlinear_solver"):
+        my_problem.define_newton_solver()
+
+
+@pytest.mark.parametrize(
+    "newton_predictor,accepted_stepsizes",
+    [("linear", [1, 0.5]), ("quadratic", [1, 0.5]), ("quadratic", [0.5])],
+)
+def test_predictor_extrapolation(newton_predictor, accepted_stepsizes):
+    """Checks that the predictor is exact for a solution linear in time and
+    that the quadratic predictor is exact for a quadratic solution once two
+    steps have been accepted"""
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=10,
+        newton_predictor=newton_predictor,
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.u_nm1 = f.Function(V)
+    my_problem.u_nm2 = f.Function(V)
+    my_problem.accepted_stepsizes = accepted_stepsizes
+
+    quadratic = newton_predictor == "quadratic" and len(accepted_stepsizes) == 2
+
+    def solution(t):
+        return 1 + 2 * t + 3 * t**2 if quadratic else 1 + 2 * t
+
+    t_n = 2
+    times = [t_n, t_n - accepted_stepsizes[-1]]
+    if len(accepted_stepsizes) == 2:
+        times.append(times[-1] - accepted_stepsizes[-2])
+    for u, time in zip([my_problem.u_n, my_problem.u_nm1, my_problem.u_nm2], times):
+        u.assign(f.Constant(solution(time)))
+
+    my_problem.predict(0.3)
+
+    assert my_problem.u(0.5) == pytest.approx(solution(t_n + 0.3))
+
+
+def test_bdf2_local_error_estimate():
+    """Checks that with the bdf2 scheme, the local error estimate of a step
+    with a solution cubic in time is the local error of the variable
+    stepsize BDF2"""
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    my_settings = festim.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=10
+    )
+    my_problem = festim.HTransportProblem(
+        festim.Mobile(), festim.Traps([]), festim.Temperature(200), my_settings, []
+    )
+    my_problem.u = f.Function(V)
+    my_problem.u_n = f.Function(V)
+    my_problem.u_nm1 = f.Function(V)
+    my_problem.u_nm2 = f.Function(V)
+    my_problem.accepted_stepsizes = [0.5, 1]
+    dt = festim.Stepsize(0.3, scheme="bdf2", error_tolerance=1)
+
+    def solution(t):
+        return t**3
+
+    h, h_1, h_2 = 0.3, 1, 0.5
+    t_n = 2
+    times = [t_n, t_n - h_1, t_n - h_1 - h_2]
+    for u, time in zip([my_problem.u_n, my_problem.u_nm1, my_problem.u_nm2], times):
+        u.assign(f.Constant(solution(time)))
+    # local error of BDF2 for u''' = 6
+    local_error = h**2 * (h + h_1) ** 2 / (2 * h + h_1)
+    my_problem.u.assign(f.Constant(solution(t_n + h) + local_error))
+
+    error = my_problem.estimate_local_error(dt)
+
+    expected = local_error / (solution(t_n + h) + local_error)
+    assert error == pytest.approx(expected)
@@ -1,6 +1,8 @@
 import festim
 import pytest
 import fenics as f
+import numpy as np
+import sympy as sp
 
 
 @pytest.mark.parametrize("preconditioner", ["default", "icc"])
@@ -85,3 +87,137 @@ class Test_solve_once_with_custom_solver:
         problem_2.create_functions(materials=materials, mesh=mesh)
 
         assert (problem_1.T.vector() == problem_2.T.vector()).all()
+
+
+def test_linear_heat_transfer_reuses_operator():
+    """
+    Checks that a linear transient heat transfer problem is detected, only
+    assembles its operator once with a constant stepsize and gives the
+    exact solution T = 300 + t of
+    rho cp dT/dt = div(k grad(T)) + 1 with T = 300 + t on the boundaries
+    """
+    mesh = festim.MeshFromRefinements(10, size=1)
+    materials = festim.Materials(
+        [festim.Material(id=1, D_0=1, E_D=0, thermal_cond=1, heat_capacity=1, rho=1)]
+    )
+    mesh.define_measures(materials)
+
+    my_problem = festim.HeatTransferProblem(transient=True, initial_condition=300)
+    my_problem.boundary_conditions = [
+        festim.DirichletBC(surfaces=[1, 2], value=300 + festim.t, field="T")
+    ]
+    my_problem.sources = [festim.Source(value=1, volume=1, field="T")]
+    dt = festim.Stepsize(0.5)
+    my_problem.create_functions(materials=materials, mesh=mesh, dt=dt)
+
+    for t in [0.5, 1, 1.5, 2]:
+        my_problem.update(t)
+
+    assert my_problem.is_linear()
+    assert my_problem.problem.nb_linear_assemblies == 1
+    assert my_problem.T(0.5) == pytest.approx(302)
+
+
+def test_nonlinear_heat_transfer_detected():
+    mesh = festim.MeshFromRefinements(10, size=1)
+    materials = festim.Materials(
+        [festim.Material(id=1, D_0=1, E_D=0, thermal_cond=lambda T: 1 + T)]
+    )
+    mesh.define_measures(materials)
+
+    my_problem = festim.HeatTransferProblem(transient=False)
+    my_problem.boundary_conditions = [
+        festim.DirichletBC(surfaces=[1, 2], value=1, field="T")
+    ]
+    my_problem.create_functions(materials=materials, mesh=mesh)
+
+    assert not my_problem.is_linear()
+    assert my_problem.T(0.5) == pytest.approx(1)
+
+
+def heat_problem(**kwargs):
+    """Returns a transient heat transfer problem on [0, 1] with
+    T = 300 + 100 * (t < 20) on the boundaries and its materials, mesh
+    """
+    mesh = festim.MeshFromRefinements(10, size=1)
+    materials = festim.Materials(
+        [festim.Material(id=1, D_0=1, E_D=0, thermal_cond=1, heat_capacity=1, rho=1)]
+    )
+    mesh.define_measures(materials)
+
+    my_problem = festim.HeatTransferProblem(
+        transient=True, initial_condition=300, **kwargs
+    )
+    my_problem.boundary_conditions = [
+        festim.DirichletBC(
+            surfaces=[1, 2],
+            value=300 + 100 * sp.Piecewise((1, festim.t < 20), (0, True)),
+            field="T",
+        )
+    ]
+    return my_problem, materials, mesh
+
+
+def test_heat_transfer_steady_state_detected():
+    """
+    Checks that the heat transfer problem stops being solved when it reaches
+    a steady state and is solved again when the boundary conditions change
+    """
+    my_problem, materials, mesh = heat_problem(steady_state_tolerance=1e-6)
+    my_problem.create_functions(materials=materials, mesh=mesh, dt=festim.Stepsize(1))
+
+    t = 0
+    while not my_problem.steady:
+        t += 1
+        my_problem.update(t)
+    assert t < 20
+    nb_solves = my_problem.nb_heat_solves
+    assert my_problem.T(0.5) == pytest.approx(400, rel=1e-4)
+
+    my_problem.update(t + 0.5)
+    assert my_problem.nb_heat_solves == nb_solves
+
+    my_problem.update(25)
+    assert not my_problem.steady
+    assert my_problem.nb_heat_solves == nb_solves + 1
+
+
+def test_heat_transfer_not_frozen_with_small_stepsize():
+    """
+    Checks that the heat transfer problem isn't considered steady when the
+    relative change of the temperature over a (small) step is below the
+    tolerance while the temperature is still far from the steady state
+    """
+    my_problem, materials, mesh = heat_problem(steady_state_tolerance=1e-3)
+    my_problem.create_functions(
+        materials=materials, mesh=mesh, dt=festim.Stepsize(1e-6)
+    )
+
+    for i in range(1, 4):
+        my_problem.update(i * 1e-6)
+        assert my_problem.relative_change() < 1e-3
+        assert not my_problem.steady
+    assert my_problem.steady_state_residual() > my_problem.absolute_tolerance
+
+
+def test_heat_transfer_multi_rate():
+    """
+    Checks that with its own stepsize the heat transfer problem is only
+    solved at its time steps and that the temperature is interpolated in
+    time in between
+    """
+    my_problem, materials, mesh = heat_problem(stepsize=0.1)
+    my_problem.create_functions(materials=materials, mesh=mesh, dt=festim.Stepsize(1))
+
+    my_problem.update(0.05)
+    assert my_problem.nb_heat_solves == 1
+    assert my_problem.t_heat == pytest.approx(0.1)
+    expected = (my_problem.T_heat.vector() + my_problem.T_heat_n.vector()) / 2
+    assert np.allclose(my_problem.T.vector()[:], expected[:])
+
+    my_problem.update(0.1)
+    assert my_problem.nb_heat_solves == 1
+    assert np.allclose(my_problem.T.vector()[:], my_problem.T_heat.vector()[:])
+
+    my_problem.update(1)
+    assert my_problem.nb_heat_solves == 10
@@ -171,3 +171,62 @@ def test_error_raised_when_henry_and_traps():
 
     with pytest.raises(NotImplementedError):
         my_sim.initialise()
+
+
+def chemical_pot_model(chemical_pot):
+    """Returns a 1 material simulation with a transient temperature, a
+    solubility depending on temperature and a recombination flux
+
+    Args:
+        chemical_pot (bool): the chemical_pot setting
+    """
+    my_model = festim.Simulation()
+    my_model.mesh = festim.MeshFromVertices(np.linspace(0, 1, 101))
+    my_model.materials = festim.Material(id=1, D_0=1, E_D=0, S_0=2, E_S=0.5)
+    my_model.T = festim.Temperature(500 + 100 * festim.t)
+    my_model.boundary_conditions = [
+        festim.DirichletBC(surfaces=[1], value=1, field=0),
+        festim.RecombinationFlux(Kr_0=1, E_Kr=0, order=2, surfaces=[2]),
+    ]
+    my_model.settings = festim.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        chemical_pot=chemical_pot,
+    )
+    my_model.dt = festim.Stepsize(0.1)
+    return my_model
+
+
+def test_chemical_pot_flux_transient_temperature():
+    """Checks that with a transient temperature and one material, the
+    concentration with chemical_pot matches the one without (the solubility
+    in the recombination flux is the one of the current temperature)"""
+    reference = chemical_pot_model(chemical_pot=False)
+    reference.initialise()
+    reference.run()
+
+    my_model = chemical_pot_model(chemical_pot=True)
+    my_model.initialise()
+    my_model.run()
+
+    for x in [0, 0.5, 1]:
+        assert my_model.mobile.post_processing_solution(x) == pytest.approx(
+            reference.mobile.post_processing_solution(x), rel=1e-4
+        )
+
+
+def test_chemical_pot_post_processing_transient_temperature():
+    """Checks that the cached solver converting theta to concentration
+    uses the solubility of the current temperature"""
+    my_model = chemical_pot_model(chemical_pot=True)
+    my_model.initialise()
+    my_model.run()
+
+    assert isinstance(my_model.mobile.post_processing_solver, fenics.LocalSolver)
+    T = 500 + 100 * my_model.t
+    S = 2 * np.exp(-0.5 / festim.k_B / T)
+    for x in [0, 0.5, 1]:
+        assert my_model.mobile.post_processing_solution(x) == pytest.approx(
+            my_model.mobile.solution(x) * S, rel=1e-6
+        )
@@ -495,6 +495,89 @@ class TestFestimProblem:
 
         assert (A1.array() == A2.array()).all()
 
+    def test_lagged_jacobian_is_not_reassembled(self):
+        """
+        Checks that a lagged festim.Problem only reassembles the LHS of Ax=b
+        when the Jacobian is flagged as outdated
+        """
+        problem = F.Problem(self.J, self.s, [], lagged_jacobian=True)
+        A = f.PETScMatrix()
+        expected = f.PETScMatrix()
+        self.assembler.assemble(expected)
+
+        problem.J(A, self.x)
+        A.zero()
+        problem.J(A, self.x)
+        assert (A.array() == 0).all()
+
+        problem.jacobian_outdated = True
+        problem.J(A, self.x)
+        assert (A.array() == expected.array()).all()
+
+    def test_lagged_jacobian_reassembled_when_contraction_is_slow(self):
+        """
+        Checks that a lagged festim.Problem reassembles the LHS of Ax=b when
+        the residual norms don't decrease fast enough
+        """
+        problem = F.Problem(
+            self.J, self.s, [], lagged_jacobian=True, max_contraction_rate=0.5
+        )
+        A = f.PETScMatrix()
+        problem.J(A, self.x)
+        A.zero()
+
+        problem.residual_norms = [1.0, 0.9]
+        problem.J(A, self.x)
+        assert not (A.array() == 0).all()
+
+
+class TestSplitProblem:
+    """Checks that festim.SplitProblem assembles the same system as the
+    unsplit form and only reassembles its linear operator when needed"""
+
+    mesh = f.UnitIntervalMesh(8)
+    V = f.FunctionSpace(mesh, "CG", 1)
+    v = f.TestFunction(V)
+    k = f.Constant(2.0)
+
+    def problems(self):
+        u = f.Function(self.V)
+        u.vector()[:] = np.linspace(1, 2, self.V.dim())
+        F_linear = self.k * f.dot(f.grad(u), f.grad(self.v)) * f.dx + self.v * f.dx
+        F_nonlinear = u**2 * self.v * f.dx
+        problem = F.Problem(
+            f.derivative(F_linear + F_nonlinear, u), F_linear + F_nonlinear, []
+        )
+        split_problem = F.SplitProblem(u, F_linear, F_nonlinear, [])
+        return u, problem, split_problem
+
+    def test_same_system(self):
+        u, problem, split_problem = self.problems()
+        b, b_split = f.PETScVector(), f.PETScVector()
+        A, A_split = f.PETScMatrix(), f.PETScMatrix()
+        problem.F(b, u.vector())
+        split_problem.F(b_split, u.vector())
+        problem.J(A, u.vector())
+        split_problem.J(A_split, u.vector())
+
+        assert b_split.get_local() == pytest.approx(b.get_local())
+        assert A_split.array() == pytest.approx(A.array())
+
+    def test_linear_operator_reassembled_when_constant_changes(self):
+        u, _, split_problem = self.problems()
+        b, A = f.PETScVector(), f.PETScMatrix()
+        for _ in range(2):
+            split_problem.check_linear_operator()
+            split_problem.F(b, u.vector())
+            split_problem.J(A, u.vector())
+        assert split_problem.nb_linear_assemblies == 1
+
+        self.k.assign(3.0)
+        split_problem.check_linear_operator()
+        split_problem.F(b, u.vector())
+        assert split_problem.nb_linear_assemblies == 2
+        self.k.assign(2.0)
+
 
 class TestWarningsCustomSolver:
     """
@@ -850,3 +933,707 @@ def test_soret_surface_flux_mass_balance(coordinates, surface_flux_class):
 
     assert not np.isclose(flux_left.data[0], 0)
     assert np.isclose(np.abs(flux_left.data[0]), np.abs(flux_right.data[0]), rtol=1e-2)
+
+
+@pytest.mark.parametrize("nonlinear_solver", ["newton", "snes"])
+def test_fieldsplit_preconditioner_gives_same_results(nonlinear_solver):
+    """Checks that the fieldsplit preconditioner preset gives the same
+    concentrations as the default direct solver on a model with two traps"""
+
+    def run(preconditioner):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 50))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = [
+            F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1),
+            F.Trap(k_0=2, E_k=0, p_0=0.5, E_p=0, materials=1, density=2),
+        ]
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=1,
+            preconditioner=preconditioner,
+            nonlinear_solver=nonlinear_solver,
+        )
+        my_model.dt = F.Stepsize(0.1)
+        my_model.initialise()
+        my_model.run()
+        return my_model.h_transport_problem.u.vector()[:]
+
+    reference = run("default")
+    fieldsplit = run("fieldsplit")
+
+    assert np.allclose(reference, fieldsplit, rtol=1e-6, atol=1e-8)
+
+
+def test_condensed_traps_retention():
+    """Checks that condensing the traps gives a retention close to the one
+    obtained with the traps solved as global fields"""
+
+    def run(condense_traps):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 200))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = [
+            F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1),
+            F.Trap(k_0=2, E_k=0, p_0=0.5, E_p=0, materials=1, density=2),
+        ]
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=1,
+            condense_traps=condense_traps,
+        )
+        my_model.dt = F.Stepsize(0.01)
+        total_trap_1 = F.TotalVolume(field=1, volume=1)
+        total_trap_2 = F.TotalVolume(field=2, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap_1, total_trap_2])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap_1.data[-1], total_trap_2.data[-1]
+
+    reference = run(condense_traps=False)
+    condensed = run(condense_traps=True)
+
+    assert condensed == pytest.approx(reference, rel=1e-2)
+
+
+def test_condensed_traps_with_sources_raise_error():
+    """Checks that an error is raised when a trap with a source is condensed"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices([0, 1, 2])
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+    my_model.sources = [F.Source(value=1, volume=1, field=1)]
+    my_model.T = 300
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        condense_traps=True,
+    )
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(NotImplementedError, match="cannot be condensed"):
+        my_model.initialise()
+
+
+@pytest.mark.parametrize(
+    "local_traps", [{"condense_traps": True}, {"operator_splitting": "lie"}]
+)
+def test_local_traps_dirichlet_bc_on_trap_raise_error(local_traps):
+    """Checks that an error is raised when a DirichletBC is set on a trap
+    removed from the function space"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices([0, 1, 2])
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=1)]
+    my_model.T = 300
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        **local_traps,
+    )
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(NotImplementedError, match="DirichletBC on traps"):
+        my_model.initialise()
+
+
+@pytest.mark.parametrize(
+    "local_traps", [{"condense_traps": True}, {"operator_splitting": "lie"}]
+)
+def test_local_traps_dg_element_raise_error(local_traps):
+    """Checks that an error is raised when traps removed from the function
+    space have DG elements"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices([0, 1, 2])
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+    my_model.T = 300
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        traps_element_type="DG",
+        **local_traps,
+    )
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(NotImplementedError, match="traps_element_type DG"):
+        my_model.initialise()
+
+
+@pytest.mark.parametrize("operator_splitting", ["lie", "strang"])
+def test_operator_splitting_retention(operator_splitting):
+    """Checks that splitting diffusion and trapping kinetics gives a
+    retention close to the one obtained with the coupled problem"""
+
+    def run(operator_splitting):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 200))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = [
+            F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1),
+            F.Trap(k_0=2, E_k=0, p_0=0.5, E_p=0, materials=1, density=2),
+        ]
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=1,
+            operator_splitting=operator_splitting,
+        )
+        my_model.dt = F.Stepsize(0.01)
+        total_trap_1 = F.TotalVolume(field=1, volume=1)
+        total_trap_2 = F.TotalVolume(field=2, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap_1, total_trap_2])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap_1.data[-1], total_trap_2.data[-1]
+
+    reference = run(operator_splitting=None)
+    split = run(operator_splitting=operator_splitting)
+
+    assert split == pytest.approx(reference, rel=5e-2)
+
+
+def test_operator_splitting_time_dependent_density():
+    """Checks that with operator splitting, a time dependent trap density
+    is evaluated at the current time"""
+
+    def run(operator_splitting):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 100))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = F.Trap(
+            k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1 + F.t
+        )
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=1,
+            operator_splitting=operator_splitting,
+        )
+        my_model.dt = F.Stepsize(0.01)
+        total_trap = F.TotalVolume(field=1, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap.data[-1]
+
+    reference = run(operator_splitting=None)
+    split = run(operator_splitting="lie")
+
+    assert split == pytest.approx(reference, rel=5e-2)
+
+
+def test_strang_splitting_error_controlled_stepsize():
+    """Checks that the local error of a Strang splitting step is estimated
+    from the solution at the beginning of the step and not from u_n
+    modified by the first half step"""
+
+    def run(stepsize, operator_splitting):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 100))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=1,
+            operator_splitting=operator_splitting,
+        )
+        my_model.dt = stepsize
+        total_trap = F.TotalVolume(field=1, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap.data[-1]
+
+    reference = run(F.Stepsize(1e-3), None)
+    retention = run(F.Stepsize(1e-3, error_tolerance=1e-3), "strang")
+
+    assert retention == pytest.approx(reference, rel=5e-2)
+
+
+def test_operator_splitting_wrong_value_raises_error():
+    """Checks that an error is raised for an unknown operator splitting"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices([0, 1, 2])
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+    my_model.T = 300
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        operator_splitting="foo",
+    )
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(ValueError, match="Unknown operator_splitting"):
+        my_model.initialise()
+
+
+def test_bdf2_more_accurate_than_backward_euler():
+    """Checks that with a large stepsize the bdf2 scheme is closer than
+    backward Euler to a reference computed with a small stepsize"""
+
+    def run(stepsize, scheme):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 100))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=0.5
+        )
+        my_model.dt = F.Stepsize(stepsize, scheme=scheme)
+        total_trap = F.TotalVolume(field=1, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap.data[-1]
+
+    reference = run(1e-3, "backward_euler")
+    error_euler = abs(run(0.05, "backward_euler") - reference)
+    error_bdf2 = abs(run(0.05, "bdf2") - reference)
+
+    assert error_bdf2 < error_euler
+
+
+def test_error_controlled_stepsize():
+    """Checks that the error controlled stepsize gives a retention close to
+    a reference computed with a small constant stepsize, and that the
+    stepsize is increased"""
+
+    def run(stepsize):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 100))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+        my_model.T = 300
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=2
+        )
+        my_model.dt = stepsize
+        total_trap = F.TotalVolume(field=1, volume=1)
+        derived_quantities = F.DerivedQuantities([total_trap])
+        my_model.exports = [derived_quantities]
+        my_model.initialise()
+        my_model.run()
+        return total_trap.data[-1], len(derived_quantities.t)
+
+    reference, _ = run(F.Stepsize(1e-3))
+    retention, nb_steps = run(F.Stepsize(1e-3, error_tolerance=1e-3))
+
+    assert retention == pytest.approx(reference, rel=1e-2)
+    assert nb_steps < 2000
+
+
+def test_rejected_steps_keep_temperature_consistent():
+    """Checks that when steps are rejected, the time is reduced accordingly
+    and the temperature is rolled back and evaluated at the new time"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 50))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=1e3, E_k=0, p_0=1e-3, E_p=0, materials=1, density=1)
+    my_model.T = F.Temperature(300 + F.t)
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=10, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        maximum_iterations=3,
+        final_time=20,
+    )
+    my_model.dt = F.Stepsize(10, stepsize_change_ratio=2, dt_min=1e-6)
+    my_model.initialise()
+    my_model.run()
+
+    assert len(my_model.h_transport_problem.nb_rejections) > 0
+    assert my_model.t == pytest.approx(20)
+    assert my_model.T.T(0.5) == pytest.approx(300 + my_model.t)
+
+
+@pytest.mark.parametrize("newton_predictor", ["linear", "quadratic"])
+def test_newton_predictor_same_solution(newton_predictor):
+    """Checks that the extrapolated initial guess doesn't change the
+    solution of a TDS-like ramp"""
+
+    def run(newton_predictor):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1e-6, 100))
+        my_model.materials = F.Material(id=1, D_0=1e-7, E_D=0.2)
+        my_model.traps = F.Trap(
+            k_0=1e-17, E_k=0.2, p_0=1e13, E_p=1, materials=1, density=1e26
+        )
+        my_model.initial_conditions = [F.InitialCondition(field=1, value=1e26)]
+        my_model.T = F.Temperature(300 + 10 * F.t)
+        my_model.boundary_conditions = [
+            F.DirichletBC(surfaces=[1, 2], value=0, field=0)
+        ]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e10,
+            relative_tolerance=1e-10,
+            final_time=50,
+            newton_predictor=newton_predictor,
+        )
+        my_model.dt = F.Stepsize(0.5)
+        total_trap = F.TotalVolume(field=1, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap.data
+
+    reference = run(None)
+    predicted = run(newton_predictor)
+
+    assert np.allclose(predicted, reference, rtol=1e-6)
+
+
+def test_pseudo_transient_continuation_steady_state():
+    """Checks that the pseudo-transient continuation converges to the
+    steady state obtained with a single Newton solve"""
+
+    def run(pseudo_transient_continuation):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 100))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+        my_model.traps = [
+            F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1),
+            F.Trap(k_0=2, E_k=0, p_0=0.5, E_p=0, materials=1, density=2),
+        ]
+        my_model.T = 300
+        my_model.boundary_conditions = [
+            F.DirichletBC(surfaces=[1], value=1, field=0),
+            F.DirichletBC(surfaces=[2], value=0.1, field=0),
+        ]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            transient=False,
+            pseudo_transient_continuation=pseudo_transient_continuation,
+            pseudo_stepsize=1e-2,
+        )
+        total_trap = F.TotalVolume(field=2, volume=1)
+        my_model.exports = [F.DerivedQuantities([total_trap])]
+        my_model.initialise()
+        my_model.run()
+        return total_trap.data[-1]
+
+    assert run(True) == pytest.approx(run(False), rel=1e-8)
+
+
+def test_pseudo_transient_continuation_transient_raises_error():
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices([0, 1, 2])
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.T = 300
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10,
+        relative_tolerance=1e-10,
+        final_time=1,
+        pseudo_transient_continuation=True,
+    )
+    my_model.dt = F.Stepsize(0.1)
+    with pytest.raises(AttributeError, match="only available for steady state"):
+        my_model.initialise()
+
+
+def test_continuation_over_time_dependent_bc():
+    """Checks the continuation over festim.t with a steady diffusion
+    problem: c = (1 + t) (1 - x)"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 50))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.T = 300
+    my_model.boundary_conditions = [
+        F.DirichletBC(surfaces=[1], value=1 + F.t, field=0),
+        F.DirichletBC(surfaces=[2], value=0, field=0),
+    ]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, transient=False
+    )
+    total = F.TotalVolume(field=0, volume=1)
+    my_model.exports = [F.DerivedQuantities([total])]
+    my_model.initialise()
+
+    table = F.run_continuation(my_model, values=[0, 1, 2, 3])
+
+    assert [row["parameter"] for row in table] == [0, 1, 2, 3]
+    for row in table:
+        assert row[total.title] == pytest.approx((1 + row["parameter"]) / 2)
+
+
+def test_continuation_over_constant():
+    """Checks the continuation over a fenics.Constant trapping rate with a
+    uniform mobile concentration: c_t = k n c_m / (k c_m + p)"""
+    k_0 = f.Constant(1)
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 20))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=k_0, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+    my_model.T = 300
+    my_model.boundary_conditions = [
+        F.DirichletBC(surfaces=[1, 2], value=1, field=0),
+    ]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, transient=False
+    )
+    total_trap = F.TotalVolume(field=1, volume=1)
+    my_model.exports = [F.DerivedQuantities([total_trap])]
+    my_model.initialise()
+
+    table = F.run_continuation(my_model, values=[1, 2, 3], parameter=k_0)
+
+    for row in table:
+        k = row["parameter"]
+        assert row[total_trap.title] == pytest.approx(k / (k + 1))
+
+
+def test_continuation_halvings_are_bounded(monkeypatch):
+    """Checks that the continuation stops when the parameter can't be
+    reached, even if the intermediate steps converge"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 10))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.T = 300
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, transient=False
+    )
+    my_model.initialise()
+
+    parameter = {"value": 0}
+    solved_values = []
+
+    def solve_once():
+        solved_values.append(parameter["value"])
+        # the solver only converges below 1.5
+        return 1, parameter["value"] < 1.5
+
+    monkeypatch.setattr(my_model.h_transport_problem, "solve_once", solve_once)
+
+    with pytest.raises(ValueError, match="failed to converge for parameter 2"):
+        F.run_continuation(
+            my_model,
+            values=[1, 2],
+            parameter=lambda value: parameter.update(value=value),
+            maximum_halvings=3,
+        )
+    assert len(solved_values) < 20
+
+
+def test_continuation_transient_raises_error():
+    my_model = F.Simulation()
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=1
+    )
+    with pytest.raises(ValueError, match="only available for steady state"):
+        F.run_continuation(my_model, values=[1, 2])
+
+
+def ensemble_factory(D_0):
+    """Factory used by test_run_ensemble (must be importable by the workers)"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 20))
+    my_model.materials = F.Material(id=1, D_0=D_0, E_D=0)
+    my_model.T = 300
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=1
+    )
+    my_model.dt = F.Stepsize(0.1)
+    my_model.exports = [
+        F.DerivedQuantities(
+            [F.TotalVolume(field="solute", volume=1)], filename="derived.csv"
+        )
+    ]
+    return my_model
+
+
+def test_run_ensemble(tmpdir):
+    """Checks that the ensemble runs give the same derived quantities as the
+    serial runs and write their exports in separate folders"""
+    parameter_sets = [{"D_0": 1}, {"D_0": 2}, {"D_0": 0.5}]
+    finished_runs = []
+
+    table = F.run_ensemble(
+        ensemble_factory,
+        parameter_sets,
+        callback=finished_runs.append,
+        max_workers=2,
+        output_folder=str(tmpdir),
+    )
+
+    assert len(finished_runs) == 3
+    for index, parameters in enumerate(parameter_sets):
+        my_model = ensemble_factory(**parameters)
+        my_model.exports[0].filename = None
+        my_model.initialise()
+        my_model.run()
+        total = my_model.exports[0][0]
+
+        rows = [row for row in table if row["run"] == index]
+        assert [row["D_0"] for row in rows] == [parameters["D_0"]] * len(rows)
+        assert [row["t"] for row in rows] == pytest.approx(my_model.exports[0].t)
+        assert [row[total.title] for row in rows] == pytest.approx(total.data)
+        assert os.path.exists(tmpdir.join("run_{}".format(index), "derived.csv"))
+
+
+def rom_model():
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 101))
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0.1)
+    my_model.traps = F.Trap(
+        k_0=1, E_k=0.1, p_0=1e3, E_p=0.5, density=2, materials=my_model.materials
+    )
+    my_model.T = 400 + 100 * F.t
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=2
+    )
+    my_model.dt = F.Stepsize(0.02)
+    my_model.exports = [
+        F.DerivedQuantities(
+            [
+                F.TotalVolume(field="solute", volume=1),
+                F.TotalVolume(field=1, volume=1),
+                F.HydrogenFlux(surface=2),
+            ]
+        )
+    ]
+    return my_model
+
+
+def test_reduced_order_model():
+    """Checks that the reduced order model reproduces the derived quantities
+    of the full model it was built from"""
+    my_model = rom_model()
+    my_model.initialise()
+    trap = my_model.traps[0]
+    sub_expressions = list(trap.sub_expressions)
+    rom = F.ReducedOrderModel(my_model)
+    rom.collect_snapshots()
+    rom.build(tolerance=1e-10)
+    functions = [quantity.function for quantity in my_model.exports[0]]
+
+    assert rom.bases[0].shape[1] < len(rom.times)
+    results = rom.run()
+    assert results["t"] == pytest.approx(rom.times[1:])
+    for error in rom.compute_errors().values():
+        assert error < 1e-2
+    # the modes are zero on the DirichletBC
+    assert np.abs(rom.bases[0][rom.lift_dofs]).max() == 0
+    assert rom.fields[0](0) == pytest.approx(1)
+    # the full model is left untouched
+    assert len(trap.sub_expressions) == len(sub_expressions)
+    assert all(a is b for a, b in zip(trap.sub_expressions, sub_expressions))
+    assert not hasattr(trap, "nodal_properties")
+    for quantity, function in zip(my_model.exports[0], functions):
+        assert quantity.function is function
+
+
+def test_reduced_order_model_steady_raises_error():
+    my_model = rom_model()
+    my_model.settings.transient = False
+    my_model.settings.final_time = None
+    my_model.dt = None
+    my_model.initialise()
+    with pytest.raises(NotImplementedError, match="transient"):
+        F.ReducedOrderModel(my_model)
+
+
+def test_reduced_order_model_heat_transfer_raises_error():
+    my_model = rom_model()
+    my_model.T = F.HeatTransferProblem(transient=False)
+    my_model.materials[0].thermal_cond = 1
+    my_model.boundary_conditions.append(
+        F.DirichletBC(surfaces=[1, 2], value=400, field="T")
+    )
+    my_model.initialise()
+    with pytest.raises(NotImplementedError, match="HeatTransferProblem"):
+        F.ReducedOrderModel(my_model)
+
+
+@pytest.mark.parametrize("chemical_pot", [False, True])
+def test_cache_linear_operators_same_solution(chemical_pot):
+    """Checks that caching the matrix of the linear terms doesn't change the
+    solution, and that it is only assembled once with a constant
+    temperature and stepsize"""
+
+    def run(cache_linear_operators):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 50))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0, S_0=2, E_S=0)
+        my_model.traps = F.Trap(
+            k_0=1, E_k=0, p_0=1, E_p=0, density=1, materials=my_model.materials
+        )
+        my_model.T = 500
+        my_model.boundary_conditions = [
+            F.DirichletBC(surfaces=[1], value=1, field=0),
+            F.RecombinationFlux(Kr_0=1, E_Kr=0, order=2, surfaces=[2]),
+        ]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=1,
+            chemical_pot=chemical_pot,
+            cache_linear_operators=cache_linear_operators,
+        )
+        my_model.dt = F.Stepsize(0.1)
+        my_model.initialise()
+        my_model.run()
+        return my_model
+
+    reference = run(False)
+    cached = run(True)
+
+    assert isinstance(cached.h_transport_problem.problem, F.SplitProblem)
+    assert cached.h_transport_problem.problem.nb_linear_assemblies == 1
+    assert cached.h_transport_problem.u.vector().get_local() == pytest.approx(
+        reference.h_transport_problem.u.vector().get_local()
+    )
+
+
+def test_precompute_rates_close_solution():
+    """Checks that precomputing the Arrhenius rates at the nodes of the
+    temperature gives a solution close to the one with exact rates"""
+
+    def run(precompute_rates):
+        my_model = F.Simulation()
+        my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 200))
+        my_model.materials = F.Material(id=1, D_0=1, E_D=0.2)
+        my_model.traps = F.Trap(
+            k_0=1, E_k=0.2, p_0=1e3, E_p=0.6, density=1, materials=my_model.materials
+        )
+        my_model.T = 500 + 200 * F.x + 50 * F.t
+        my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+        my_model.settings = F.Settings(
+            absolute_tolerance=1e-10,
+            relative_tolerance=1e-10,
+            final_time=2,
+            precompute_rates=precompute_rates,
+        )
+        my_model.dt = F.Stepsize(0.1)
+        total = F.TotalVolume(field="retention", volume=1)
+        my_model.exports = [F.DerivedQuantities([total])]
+        my_model.initialise()
+        my_model.run()
+        return my_model, total
+
+    _, reference = run(False)
+    my_model, precomputed = run(True)
+
+    assert sorted(my_model.T.boltzmann_factors) == [0.2, 0.6]
+    assert precomputed.data == pytest.approx(reference.data, rel=1e-3)
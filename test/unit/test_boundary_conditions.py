@@ -529,6 +529,113 @@ def test_mass_flux():
     my_BC.create_form(T, c)
 
 
+@pytest.mark.parametrize("chemical_pot", [True, False])
+def test_dirichletbc_boundary_values_vectorised(chemical_pot):
+    """Checks that the values of a DirichletBC created from a Python
+    expression are computed at the boundary dofs and updated when the time
+    is set, consistently with the point evaluation of the expression
+    """
+    mesh = fenics.UnitIntervalMesh(10)
+    V = fenics.FunctionSpace(mesh, "P", 1)
+    vm = fenics.MeshFunction("size_t", mesh, 1, 1)
+    sm = fenics.MeshFunction("size_t", mesh, 0, 0)
+    fenics.CompiledSubDomain("near(x[0], 0)").mark(sm, 1)
+    T = fenics.Function(V)
+    T.assign(fenics.Constant(300))
+    my_mats = festim.Materials([festim.Material(1, 1, 0, S_0=2, E_S=0.1)])
+
+    def func(T, prm1):
+        return 2 * T + fenics.exp(prm1)
+
+    my_bc = festim.CustomDirichlet(surfaces=1, function=func, prm1=1 + festim.t)
+    my_bc.create_dirichletbc(
+        V,
+        T,
+        surface_markers=sm,
+        chemical_pot=chemical_pot,
+        materials=my_mats,
+        volume_markers=vm,
+    )
+    expressions = list(my_bc.sub_expressions) + [my_bc.expression]
+    u = fenics.Function(V)
+
+    for i in range(3):
+        T.assign(fenics.Constant(300 + 100 * i))
+        for expr in expressions:
+            expr.t = i
+
+        my_bc.dirichlet_bc[0].apply(u.vector())
+        expected = 2 * (300 + 100 * i) + np.exp(1 + i)
+        if chemical_pot:
+            expected /= 2 * np.exp(-0.1 / festim.k_B / (300 + 100 * i))
+        assert u(0) == pytest.approx(expected)
+        assert my_bc.expression(0) == pytest.approx(expected)
+
+
+def test_dirichletbc_boundary_values_not_vectorised():
+    """Checks that a Python function branching on the temperature is
+    evaluated node by node and that other errors are not hidden by the
+    fallback"""
+    mesh = fenics.UnitIntervalMesh(10)
+    V = fenics.FunctionSpace(mesh, "P", 1)
+    sm = fenics.MeshFunction("size_t", mesh, 0, 0)
+    fenics.CompiledSubDomain("near(x[0], 0)").mark(sm, 1)
+    T = fenics.Function(V)
+    T.assign(fenics.Constant(600))
+
+    def func(T):
+        if T > 500:
+            return 2 * T
+        return T
+
+    my_bc = festim.CustomDirichlet(surfaces=1, function=func)
+    my_bc.create_dirichletbc(V, T, surface_markers=sm)
+    u = fenics.Function(V)
+    my_bc.dirichlet_bc[0].apply(u.vector())
+    assert u(0) == pytest.approx(1200)
+
+    def wrong_func(T):
+        raise RuntimeError("wrong function")
+
+    my_bc = festim.CustomDirichlet(surfaces=1, function=wrong_func)
+    with pytest.raises(RuntimeError, match="wrong function"):
+        my_bc.create_dirichletbc(V, T, surface_markers=sm)
+
+
+def test_dirichlet_laws_ufl_and_numpy():
+    """Checks that the built-in Dirichlet laws still accept ufl objects and
+    that their numpy versions give the same values on arrays
+    """
+    from festim.boundary_conditions.dirichlets.sieverts_bc import (
+        sieverts_law,
+        sieverts_law_numpy,
+    )
+    from festim.boundary_conditions.dirichlets.henrys_bc import (
+        henrys_law,
+        henrys_law_numpy,
+    )
+    from festim.boundary_conditions.dirichlets.dc_imp import dc_imp, dc_imp_numpy
+
+    mesh = fenics.UnitIntervalMesh(5)
+    V = fenics.FunctionSpace(mesh, "P", 1)
+    T = fenics.interpolate(fenics.Constant(300), V)
+    T_values = np.array([300.0, 400.0, 500.0])
+    cases = [
+        (sieverts_law, sieverts_law_numpy, dict(S_0=2, E_S=0.1, pressure=1e3)),
+        (henrys_law, henrys_law_numpy, dict(H_0=2, E_H=0.1, pressure=1e3)),
+        (
+            dc_imp,
+            dc_imp_numpy,
+            dict(phi=1e20, R_p=1e-9, D_0=1e-7, E_D=0.2, Kr_0=1e-30, E_Kr=0.5),
+        ),
+    ]
+    for ufl_law, numpy_law, prms in cases:
+        ufl_value = fenics.assemble(ufl_law(T, **prms) * fenics.dx(domain=mesh))
+        assert ufl_value == pytest.approx(numpy_law(300.0, **prms))
+        expected = [ufl_law(T_value, **prms) for T_value in T_values]
+        assert np.allclose(numpy_law(T_values, **prms), expected)
+
+
 def test_string_for_field_in_dirichletbc():
     """Test catching issue #462"""
     # build
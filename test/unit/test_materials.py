@@ -2,6 +2,7 @@ import festim as F
 from fenics import *
 import pytest
 import warnings
+import numpy as np
 
 
 def test_find_material_from_id():
@@ -282,6 +283,48 @@ def test_create_properties():
         assert S(cell.midpoint().x()) == mf[cell] + 6
 
 
+def test_update_properties():
+    """
+    Checks that the properties fields are updated in place when the
+    temperature changes, including temperature dependent thermal properties
+    """
+    mesh = UnitIntervalMesh(10)
+    T = Function(FunctionSpace(mesh, "CG", 1))
+    T.assign(Constant(300))
+    materials = F.Materials(
+        [F.Material(1, D_0=2, E_D=0.5, thermal_cond=lambda T: 1 + 2 * T)]
+    )
+    vm = MeshFunction("size_t", mesh, 1, 1)
+    materials.create_properties(vm, T)
+    D = materials.D
+    thermal_cond = materials.thermal_cond
+
+    assert D(0.5) == pytest.approx(2 * np.exp(-0.5 / F.k_B / 300))
+    assert thermal_cond(0.5) == pytest.approx(601)
+
+    T.assign(Constant(600))
+    materials.update_properties()
+
+    assert materials.D is D
+    assert D(0.5) == pytest.approx(2 * np.exp(-0.5 / F.k_B / 600))
+    assert thermal_cond(0.5) == pytest.approx(1201)
+
+
+def test_create_properties_unmatched_subdomain():
+    """
+    Checks that a ValueError naming the subdomain is raised when a subdomain
+    of the volume markers has no material
+    """
+    mesh = UnitIntervalMesh(10)
+    T = Constant(300)
+    materials = F.Materials([F.Material(1, D_0=2, E_D=0.5)])
+    vm = MeshFunction("size_t", mesh, 1, 1)
+    CompiledSubDomain("x[0] > 0.5").mark(vm, 3)
+
+    with pytest.raises(ValueError, match="Couldn't find ID 3"):
+        materials.create_properties(vm, T)
+
+
 def test_E_S_without_S_0():
     with pytest.raises(ValueError, match="S_0 cannot be None"):
         F.Material(1, 1, 1, S_0=None, E_S=1)
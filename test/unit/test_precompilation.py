@@ -0,0 +1,64 @@
+import festim as F
+import pytest
+
+
+def simulation():
+    """Defines a small transient model"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices([0, 1, 2, 3])
+    my_model.materials = F.Material(id=1, D_0=1, E_D=0)
+    my_model.traps = F.Trap(k_0=1, E_k=0, p_0=1, E_p=0, materials=1, density=1)
+    my_model.T = 300 + F.t
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=1
+    )
+    my_model.dt = F.Stepsize(0.5)
+    my_model.exports = [F.DerivedQuantities([F.SurfaceFlux(field=0, surface=1)])]
+    return my_model
+
+
+def test_precompile_returns_timings():
+    """Checks that precompile returns (label, duration) tuples sorted by
+    decreasing duration and labels the H transport forms"""
+    timings = F.precompile(simulation(), verbose=False)
+
+    durations = [duration for _, duration in timings]
+    assert durations == sorted(durations, reverse=True)
+    labels = [label for label, _ in timings]
+    assert "H transport residual" in labels
+    assert "H transport Jacobian" in labels
+
+
+def test_precompiled_simulation_can_run():
+    """Checks that a simulation can be run after being precompiled"""
+    my_model = simulation()
+    F.precompile(my_model, verbose=False)
+    my_model.initialise()
+    my_model.run()
+
+
+def test_command_line(tmpdir):
+    """Checks that the command line finds the simulation defined in a script
+    and doesn't execute the code protected by __name__ == '__main__'"""
+    script = tmpdir.join("script.py")
+    script.write(
+        "import festim as F\n"
+        "my_model = F.Simulation(\n"
+        "    mesh=F.MeshFromVertices([0, 1, 2]),\n"
+        "    materials=F.Material(id=1, D_0=1, E_D=0),\n"
+        "    temperature=300,\n"
+        "    settings=F.Settings(1e-10, 1e-10, transient=False),\n"
+        ")\n"
+        "if __name__ == '__main__':\n"
+        "    raise RuntimeError('should not be executed')\n"
+    )
+    F.precompilation.main([str(script)])
+
+
+def test_command_line_wrong_name(tmpdir):
+    """Checks that an error is raised if the simulation name isn't found"""
+    script = tmpdir.join("script.py")
+    script.write("a = 1\n")
+    with pytest.raises(ValueError, match="Couldn't find festim.Simulation"):
+        F.precompilation.main([str(script), "--name", "my_model"])
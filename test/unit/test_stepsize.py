@@ -1,6 +1,7 @@
 import festim
 import pytest
 import numpy as np
+import fenics as f
 
 
 class TestAdapt:
@@ -130,3 +131,94 @@ def test_hit_stepsize_max_with_t_stop(time):
     )
     max_stepsize = lambda t: 1 if t >= 1 else None
     assert my_stepsize.adaptive_stepsize["max_stepsize"](time) == max_stepsize(time)
+
+
+def test_wrong_scheme_raises_error():
+    with pytest.raises(ValueError, match="Unknown scheme"):
+        festim.Stepsize(1, scheme="foo")
+
+
+def test_time_difference_backward_euler():
+    """Checks that the backward Euler time difference is u - u_n, even
+    when u_nm1 is given"""
+    stepsize = festim.Stepsize(1)
+    u, u_n, u_nm1 = f.Constant(3), f.Constant(1), f.Constant(0)
+    assert stepsize.time_difference(u, u_n, u_nm1).equals(u - u_n)
+
+
+@pytest.mark.parametrize("dt_n,dt", [(1, 1), (1, 2), (0.5, 0.2)])
+def test_time_difference_bdf2_exact_for_quadratic(dt_n, dt):
+    """Checks that the variable stepsize BDF2 derivative of t**2 is exact"""
+    stepsize = festim.Stepsize(dt, scheme="bdf2")
+    stepsize.store_previous_value(dt_n)
+    t = 2.0
+    values = [f.Constant(time**2) for time in [t, t - dt, t - dt - dt_n]]
+    derivative = stepsize.time_difference(*values) / stepsize.value
+    assert float(derivative) == pytest.approx(2 * t)
+
+
+def test_time_difference_bdf2_first_step_is_backward_euler():
+    stepsize = festim.Stepsize(0.5, scheme="bdf2")
+    u, u_n, u_nm1 = f.Constant(3), f.Constant(1), f.Constant(10)
+    assert float(stepsize.time_difference(u, u_n, u_nm1)) == pytest.approx(2)
+
+
+class TestAdaptToError:
+    @pytest.fixture
+    def my_stepsize(self):
+        return festim.Stepsize(initial_value=1, error_tolerance=1e-3, dt_min=1e-3)
+
+    def test_stepsize_decreases_on_rejection(self, my_stepsize):
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=4)
+        assert float(my_stepsize.value) == pytest.approx(0.9 * 4 ** (-1 / 2))
+
+    def test_stepsize_increases_for_small_error(self, my_stepsize):
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=0.1)
+        assert float(my_stepsize.value) > 1
+
+    def test_stepsize_increase_is_bounded(self, my_stepsize):
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=0)
+        assert float(my_stepsize.value) == pytest.approx(5)
+
+    def test_stepsize_halved_if_not_converged(self, my_stepsize):
+        my_stepsize.adapt(t=1, nb_it=30, converged=False, error=None)
+        assert float(my_stepsize.value) == pytest.approx(0.5)
+
+    def test_stepsize_kept_without_estimate(self, my_stepsize):
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=None)
+        assert float(my_stepsize.value) == pytest.approx(1)
+
+    def test_previous_error_used(self, my_stepsize):
+        """Checks the proportional part of the PI rule"""
+        my_stepsize.previous_error = 0.5
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=0.5)
+        expected = 0.9 * 0.5 ** (-0.35) * 0.5**0.2
+        assert float(my_stepsize.value) == pytest.approx(expected)
+
+    def test_stepsize_reaches_minimal_size(self, my_stepsize):
+        my_stepsize.value.assign(1e-3)
+        with pytest.raises(ValueError, match="stepsize reached minimal value"):
+            my_stepsize.adapt(t=1, nb_it=2, converged=True, error=100)
+
+    def test_bdf2_exponents(self):
+        """Checks that the exponents of the PI rule are those of a second
+        order scheme with bdf2"""
+        my_stepsize = festim.Stepsize(
+            initial_value=1, error_tolerance=1e-3, scheme="bdf2"
+        )
+        my_stepsize.previous_error = 0.5
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=0.5)
+        expected = 0.9 * 0.5 ** (-0.7 / 3) * 0.5 ** (0.4 / 3)
+        assert float(my_stepsize.value) == pytest.approx(expected)
+
+    def test_max_stepsize(self):
+        my_stepsize = festim.Stepsize(
+            initial_value=1, error_tolerance=1e-3, max_stepsize=2
+        )
+        my_stepsize.adapt(t=1, nb_it=2, converged=True, error=0)
+        assert float(my_stepsize.value) == 2
+
+
+def test_error_tolerance_and_change_ratio_raise_error():
+    with pytest.raises(ValueError, match="cannot be used together"):
+        festim.Stepsize(1, stepsize_change_ratio=1.1, error_tolerance=1e-3)
@@ -0,0 +1,72 @@
+import festim as F
+import numpy as np
+import os
+import pytest
+
+
+def tiny_factory(D_0):
+    """Factory used by test_run_ensemble_outputs (must be importable by the
+    workers)"""
+    my_model = F.Simulation()
+    my_model.mesh = F.MeshFromVertices(np.linspace(0, 1, 5))
+    my_model.materials = F.Material(id=1, D_0=D_0, E_D=0)
+    my_model.T = 300
+    my_model.boundary_conditions = [F.DirichletBC(surfaces=[1], value=1, field=0)]
+    my_model.settings = F.Settings(
+        absolute_tolerance=1e-10, relative_tolerance=1e-10, final_time=0.2
+    )
+    my_model.dt = F.Stepsize(0.1)
+    my_model.exports = [
+        F.DerivedQuantities(
+            [F.TotalVolume(field="solute", volume=1)], filename="derived.csv"
+        )
+    ]
+    return my_model
+
+
+def test_move_exports():
+    """Checks that the relative paths of the exports are moved to the
+    folder and the absolute paths are kept"""
+    my_model = F.Simulation()
+    absolute_filename = os.path.abspath("out.csv")
+    my_model.exports = [
+        F.XDMFExport("solute"),
+        F.XDMFExport("retention", folder="results"),
+        F.DerivedQuantities([F.TotalVolume("solute", 1)], filename="totals.csv"),
+        F.DerivedQuantities([F.TotalVolume("solute", 1)], filename=absolute_filename),
+        F.DerivedQuantities([F.TotalVolume("solute", 1)]),
+    ]
+
+    F.sweep.move_exports(my_model, "run_0")
+
+    assert my_model.exports[0].folder == "run_0"
+    assert my_model.exports[1].folder == os.path.join("run_0", "results")
+    assert my_model.exports[2].filename == os.path.join("run_0", "totals.csv")
+    assert my_model.exports[3].filename == absolute_filename
+    assert my_model.exports[4].filename is None
+
+
+def test_run_ensemble_outputs(tmpdir):
+    """Checks that run_ensemble runs two tiny cases and that each run has
+    its rows in the table and its own exported file"""
+    parameter_sets = [{"D_0": 1}, {"D_0": 10}]
+
+    table = F.run_ensemble(
+        tiny_factory, parameter_sets, max_workers=2, output_folder=str(tmpdir)
+    )
+
+    totals = []
+    for index, parameters in enumerate(parameter_sets):
+        rows = [row for row in table if row["run"] == index]
+        assert [row["D_0"] for row in rows] == [parameters["D_0"]] * 2
+        assert [row["t"] for row in rows] == pytest.approx([0.1, 0.2])
+
+        filename = tmpdir.join("run_{}".format(index), "derived.csv")
+        data = np.loadtxt(filename, delimiter=",", skiprows=1)
+        title = [key for key in rows[0] if key not in ["run", "D_0", "t"]][0]
+        assert data[:, 0] == pytest.approx([row["t"] for row in rows])
+        assert data[:, 1] == pytest.approx([row[title] for row in rows])
+        totals.append(data[-1, 1])
+
+    # more hydrogen has diffused with the larger diffusivity
+    assert totals[1] > totals[0]
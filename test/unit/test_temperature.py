@@ -264,6 +264,100 @@ def test_temperature_from_xdmf(tmpdir):
     assert temperature.is_steady_state()
 
 
+def write_temperature_checkpoints(T_file):
+    """Writes checkpoints of a uniform temperature (300 K at t=0, 400 K at
+    t=1, 600 K at t=2 and 700 K at t=3) and returns the mesh
+
+    Args:
+        T_file (str): the XDMF filename
+
+    Returns:
+        festim.Mesh: the mesh
+    """
+    mesh = fenics.UnitIntervalMesh(10)
+    V = fenics.FunctionSpace(mesh, "CG", 1)
+    T = fenics.Function(V)
+    for i, (time, value) in enumerate([(0, 300), (1, 400), (2, 600), (3, 700)]):
+        T.assign(fenics.Constant(value))
+        fenics.XDMFFile(T_file).write_checkpoint(
+            T, "T", time, fenics.XDMFFile.Encoding.HDF5, append=i > 0
+        )
+    my_mesh = festim.Mesh()
+    my_mesh.mesh = mesh
+    return my_mesh
+
+
+def test_temperature_from_xdmf_interpolated_in_time(tmpdir):
+    """
+    Checks that a TemperatureFromXDMF with several checkpoints is
+    interpolated linearly in time and only keeps a bounded number of
+    checkpoints in memory
+
+    Args:
+        tmpdir (os.PathLike): path to the pytest temporary folder
+    """
+    T_file = str(tmpdir.join("T.xdmf"))
+    my_mesh = write_temperature_checkpoints(T_file)
+
+    temperature = festim.TemperatureFromXDMF(T_file, "T", max_snapshots=2)
+    temperature.create_functions(my_mesh)
+
+    assert not temperature.is_steady_state()
+    assert temperature.T(0.5) == pytest.approx(300)
+    for time, expected in [(0.5, 350), (1.5, 500), (2, 600), (5, 700)]:
+        temperature.update(time)
+        assert temperature.T(0.5) == pytest.approx(expected)
+        assert len(temperature.snapshots) <= 2
+
+
+def test_temperature_from_xdmf_steady_uses_last_checkpoint(tmpdir):
+    """
+    Checks that in a steady simulation a TemperatureFromXDMF with several
+    checkpoints uses the last one
+
+    Args:
+        tmpdir (os.PathLike): path to the pytest temporary folder
+    """
+    T_file = str(tmpdir.join("T.xdmf"))
+    my_mesh = write_temperature_checkpoints(T_file)
+
+    temperature = festim.TemperatureFromXDMF(T_file, "T")
+    temperature.transient = False
+    temperature.create_functions(my_mesh)
+
+    assert temperature.is_steady_state()
+    assert temperature.T(0.5) == pytest.approx(700)
+
+
+def test_temperature_from_xdmf_close(tmpdir):
+    """
+    Checks that the XDMF file of a TemperatureFromXDMF is closed by close()
+    (or right away in steady state) and reopened if another checkpoint is
+    needed
+
+    Args:
+        tmpdir (os.PathLike): path to the pytest temporary folder
+    """
+    T_file = str(tmpdir.join("T.xdmf"))
+    my_mesh = write_temperature_checkpoints(T_file)
+
+    temperature = festim.TemperatureFromXDMF(T_file, "T")
+    temperature.create_functions(my_mesh)
+    assert temperature._file is not None
+
+    temperature.close()
+    assert temperature._file is None
+    temperature.update(2.5)
+    assert temperature.T(0.5) == pytest.approx(650)
+    temperature.close()
+    assert temperature._file is None
+
+    steady_temperature = festim.TemperatureFromXDMF(T_file, "T")
+    steady_temperature.transient = False
+    steady_temperature.create_functions(my_mesh)
+    assert steady_temperature._file is None
+
+
 def test_heat_transfer_default_solver():
     """
     Tests that the default parameters for the Newton solver
@@ -284,3 +378,108 @@ def test_heat_transfer_default_solver():
 
     for key in default_settings.keys():
         assert default_settings[key] == heat_solver.newton_solver.parameters[key]
+
+
+def test_temperature_restore():
+    """Checks that the temperature restored after an update is the one
+    before the update"""
+    my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+    my_T = festim.Temperature(300 + 10 * festim.t)
+    my_T.create_functions(my_mesh)
+    my_T.update(1)
+
+    my_T.backup()
+    my_T.update(2)
+    my_T.restore()
+
+    assert my_T.T(0.5) == pytest.approx(310)
+    assert my_T.T_n(0.5) == pytest.approx(300)
+
+
+def test_temperature_backups_allocated_once():
+    my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+    my_T = festim.Temperature(300 + 10 * festim.t)
+    my_T.create_functions(my_mesh)
+
+    my_T.backup()
+    backups = my_T.backups
+    my_T.update(1)
+    my_T.backup()
+
+    assert all(a is b for a, b in zip(my_T.backups, backups))
+
+
+def test_boltzmann_factor_updated_with_temperature():
+    """Checks that the precomputed Boltzmann factors are computed at the
+    nodes of T and updated when T changes"""
+    my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+    my_T = festim.Temperature(300 + 10 * festim.t)
+    my_T.create_functions(my_mesh)
+    my_T.precompute_rates = True
+    factor = my_T.boltzmann_factor(0.5)
+
+    assert my_T.boltzmann_factor(0.5) is factor
+    assert factor(0.5) == pytest.approx(np.exp(-0.5 / festim.k_B / 300))
+    my_T.update(1)
+    assert factor(0.5) == pytest.approx(np.exp(-0.5 / festim.k_B / 310))
+
+
+def test_boltzmann_factor_not_precomputed_by_default():
+    my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+    my_T = festim.Temperature(300 + 10 * festim.x)
+    my_T.create_functions(my_mesh)
+
+    factor = my_T.boltzmann_factor(0.5)
+
+    assert not isinstance(factor, fenics.Function)
+    assert my_T.boltzmann_factors == {}
+
+
+def test_temperature_update_matches_interpolation():
+    """Checks that the vectorised update gives the interpolation of the
+    expression"""
+    my_mesh = festim.Mesh(fenics.UnitSquareMesh(5, 5))
+    my_T = festim.Temperature(300 + 10 * festim.x * festim.y + festim.t**2)
+    my_T.create_functions(my_mesh)
+    my_T.update(3)
+
+    my_T.expression.t = 3
+    expected = fenics.interpolate(my_T.expression, my_T.T.function_space())
+    assert my_T.T.vector().get_local() == pytest.approx(expected.vector().get_local())
+    assert my_T.T_n(0.5, 0.5) == pytest.approx(302.5)
+
+
+def test_steady_temperature_not_updated():
+    my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+    my_T = festim.Temperature(300 + 10 * festim.x)
+    my_T.create_functions(my_mesh)
+    assert my_T.T(0.5) == pytest.approx(305)
+    # a steady temperature is not evaluated again
+    my_T.T.vector()[:] = 0
+
+    my_T.update(1)
+
+    assert my_T.T(0.5) == pytest.approx(0)
+
+
+def test_uniform_temperature_boltzmann_factor_is_constant():
+    """Checks that the Boltzmann factors of a spatially uniform temperature
+    are scalars updated with the temperature, without precompute_rates"""
+    my_mesh = festim.Mesh(fenics.UnitIntervalMesh(10))
+    my_T = festim.Temperature(300 + 8 * festim.t)
+    my_T.create_functions(my_mesh)
+    factor = my_T.boltzmann_factor(0.5)
+
+    assert my_T.is_uniform()
+    assert isinstance(factor, fenics.Constant)
+    my_T.update(10)
+    assert my_T.uniform_value == pytest.approx(380)
+    assert my_T.T(0.5) == pytest.approx(380)
+    assert float(factor) == pytest.approx(np.exp(-0.5 / festim.k_B / 380))
+
+
+@pytest.mark.parametrize(
+    "value,uniform", [(300, True), (300 + festim.t, True), (300 + festim.x, False)]
+)
+def test_temperature_is_uniform(value, uniform):
+    assert festim.Temperature(value).is_uniform() == uniform
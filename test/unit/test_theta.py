@@ -253,3 +253,28 @@ def test_post_processing_solution_to_concentration_henry():
     assert f.errornorm(
         my_theta.post_processing_solution, expected_concentration
     ) == pytest.approx(0)
+
+
+def test_post_processing_solution_to_concentration_dg_local_solver():
+    """Checks that in a DG1 function space the conversion uses a cached
+    local solver and follows the changes of theta"""
+    mesh = f.UnitIntervalMesh(10)
+    V = f.FunctionSpace(mesh, "DG", 1)
+    S = 3
+    materials = festim.Materials([festim.Material(1, 1, 0, S, E_S=0)])
+    vm = f.MeshFunction("size_t", mesh, 1, 1)
+    dx = f.Measure("dx", domain=mesh, subdomain_data=vm)
+    my_theta = festim.Theta()
+    my_theta.S = S
+    my_theta.solution = f.interpolate(f.Expression("1 + x[0]", degree=1), V)
+    my_theta.create_form_post_processing(V, materials, dx)
+
+    my_theta.post_processing_solution_to_concentration()
+    solver = my_theta.post_processing_solver
+    assert isinstance(solver, f.LocalSolver)
+    assert my_theta.post_processing_solution(0.25) == pytest.approx(S * 1.25)
+
+    my_theta.solution.assign(f.interpolate(f.Expression("2 * x[0]", degree=1), V))
+    my_theta.post_processing_solution_to_concentration()
+    assert my_theta.post_processing_solver is solver
+    assert my_theta.post_processing_solution(0.25) == pytest.approx(S * 0.5)